@@ -1,8 +1,10 @@
 from collections.abc import Generator
 
+from fastapi import HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
+from app.services.matching_service import MatchingWeights, get_weight_profile
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -12,3 +14,13 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_matching_weights(
+    profile: str | None = Query(None, description="Profil de pondération : default, local ou remote"),
+) -> MatchingWeights:
+    """Resolve the weight profile requested for a matching call."""
+    try:
+        return get_weight_profile(profile)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -38,9 +38,17 @@ def list_candidates(
 def boolean_search_candidates(
     db: Annotated[Session, Depends(deps.get_db)],
     user_id: UUID = Query(..., description="Identifiant du recruteur"),
-    query: str = Query(..., min_length=1, description="Requête booléenne"),
+    query: str = Query(
+        ...,
+        min_length=1,
+        description="Requête booléenne ; champs : title:, skill:, city:, country:, lang:, company:, school:",
+    ),
     page: int = Query(1, ge=1, description="Numéro de la page (commence à 1)"),
     size: int = Query(10, ge=1, le=100, description="Nombre d'éléments par page"),
+    cursor: str | None = Query(
+        None,
+        description="Curseur renvoyé par la page précédente (remplace page) ; vide pour une première page sans comptage exact",
+    ),
 ) -> CandidateSearchResponse:
     """Search candidates using boolean operators and nested expressions."""
     # cache_key = make_cache_key("boolean_search_candidates", user_id, query)
@@ -49,7 +57,7 @@ def boolean_search_candidates(
     #     return cached[1]
     service = CandidateService(db)
     try:
-        results = service.search_by_boolean_query(query=query, user_id=user_id, page=page, size=size)
+        results = service.search_by_boolean_query(query=query, user_id=user_id, page=page, size=size, cursor=cursor)
         # APP_CACHE.set(cache_key, results)
         return results
     except ValueError as exc:
@@ -79,6 +87,10 @@ def normal_search_candidates(
     query: str = Query(..., min_length=1, description="Requête par mots-clés"),
     page: int = Query(1, ge=1, description="Numéro de la page (commence à 1)"),
     size: int = Query(10, ge=1, le=100, description="Nombre d'éléments par page"),
+    cursor: str | None = Query(
+        None,
+        description="Curseur renvoyé par la page précédente (remplace page) ; vide pour une première page sans comptage exact",
+    ),
 ) -> CandidateSearchResponse:
     """Search candidates using simple keywords across all profile fields."""
     
@@ -92,7 +104,7 @@ def normal_search_candidates(
     service = CandidateService(db)
     
     try:
-        results = service.search_by_normal_query(query=query, user_id=user_id, page=page, size=size)
+        results = service.search_by_normal_query(query=query, user_id=user_id, page=page, size=size, cursor=cursor)
         # APP_CACHE.set(cache_key, results) 
         return results
     except ValueError as exc:
@@ -15,10 +15,12 @@ from pypdf import PdfReader
 from app.api.v1 import deps
 from app.schemas import (
     CandidateRecommendationsResponse,
+    MatchingBatchRequest,
+    MatchingBatchResponse,
     MatchingScoreRequest,
     MatchingScoreResponse,
 )
-from app.services.matching_service import MatchingService
+from app.services.matching_service import MatchingService, MatchingWeights
 from google import genai
 
 
@@ -35,11 +37,13 @@ OUTPUT_DIR = "./"
 def compute_matching_score(
     payload: MatchingScoreRequest,
     db: Annotated[Session, Depends(deps.get_db)],
+    weights: Annotated[MatchingWeights, Depends(deps.get_matching_weights)],
+    explain: bool = Query(False),
 ):
     #-> MatchingScoreResponse
     """Compute a compatibility score between one job offer and one candidate using his profile in the database."""
-    service = MatchingService(db)
-    result = service.score_candidate_for_offer(payload.candidate_id, payload.offer_id)
+    service = MatchingService(db, weights=weights)
+    result = service.score_candidate_for_offer(payload.candidate_id, payload.offer_id, explain=explain)
     if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,6 +51,22 @@ def compute_matching_score(
         )
     return result
 
+@router.post(
+    "/matching/batch",
+    response_model=MatchingBatchResponse,
+    tags=["matching"],
+)
+def compute_matching_scores_batch(
+    payload: MatchingBatchRequest,
+    db: Annotated[Session, Depends(deps.get_db)],
+    weights: Annotated[MatchingWeights, Depends(deps.get_matching_weights)],
+    explain: bool = Query(False),
+) -> MatchingBatchResponse:
+    """Score every listed candidate against every listed offer in one request."""
+    service = MatchingService(db, weights=weights)
+    return service.score_pairs(payload.candidate_ids, payload.offer_ids, explain=explain)
+
+
 @router.post(
     '/matching/cv/job_offer',
     response_model=MatchingScoreResponse,
@@ -110,13 +130,15 @@ async def compute_matching_score_cv(
 )
 def get_recommendations(
     db: Annotated[Session, Depends(deps.get_db)],
+    weights: Annotated[MatchingWeights, Depends(deps.get_matching_weights)],
     candidate_id: UUID = Query(..., alias="candidateId"),
     k: int = Query(10, ge=1, le=50),
+    explain: bool = Query(False),
 ) -> CandidateRecommendationsResponse:
     """Return the top-k offers ranked for the provided candidate based on his profil."""
 
-    service = MatchingService(db)
-    response = service.recommend_offers_for_candidate(candidate_id, k)
+    service = MatchingService(db, weights=weights)
+    response = service.recommend_offers_for_candidate(candidate_id, k, explain=explain)
     if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -8,8 +8,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.api.v1 import deps
-from app.schemas import JobOfferSearchResponse, SearchCreate
+from app.schemas import (
+    JobOfferSearchResponse,
+    SearchCreate,
+    SearchFacetCount,
+    SearchFacets,
+    SearchSuggestion,
+)
 from app.services.search_service import SearchService
+from app.services.suggestion_index import SUGGESTIONS, SUGGESTION_TYPES
 from app.models.enums import (
     ContractType,
     ExperienceLevel,
@@ -18,6 +25,7 @@ from app.models.enums import (
     SearchType,
 )
 from app.utils.cache import APP_CACHE, make_cache_key
+from app.utils.pagination import Page
 
 router = APIRouter()
 
@@ -53,6 +61,31 @@ def _parse_search_offes_filters(
 
 SearchFilters = Annotated[SearchCreate, Depends(_parse_search_offes_filters)]
 
+
+def _build_page_response(result: Page, size: int) -> JobOfferSearchResponse:
+    """Wrap one page of offers already sliced by the database."""
+    facets = None
+    if result.facets is not None:
+        facets = SearchFacets(
+            **{
+                name: [SearchFacetCount(value=value, count=count) for value, count in values]
+                for name, values in result.facets.items()
+            }
+        )
+    return JobOfferSearchResponse(
+        content=result.items,
+        page=result.page,
+        size=size,
+        total_elements=result.total,
+        total_pages=(result.total + size - 1) // size,
+        first=result.page == 0,
+        last=result.next_cursor is None,
+        next_cursor=result.next_cursor,
+        total_is_estimate=result.total_is_estimate,
+        facets=facets,
+    )
+
+
 @router.get(
     "/recherches/offres",
     response_model=JobOfferSearchResponse,
@@ -64,6 +97,14 @@ def search_offers(
     user_id: UUID | None = Query(default=None),
     page: int = Query(default=0, ge=0),
     size: int = Query(default=10, ge=1),
+    cursor: str | None = Query(
+        default=None,
+        description="Curseur renvoyé par la page précédente (remplace page) ; vide pour une première page sans comptage exact",
+    ),
+    facets: bool = Query(
+        default=False,
+        description="Inclure les nombres d'offres par type de contrat, pays, ville et langue",
+    ),
 ) -> JobOfferSearchResponse:
     """Search job offers by payload or contextually for a candidate."""
     
@@ -73,44 +114,56 @@ def search_offers(
     #     return cached[1]
 
     service = SearchService(db)
-    if user_id is None:
-        offers = service.search_by_payload(filters)
-    else:
-        offers = service.search_for_candidate_by_user(user_id, filters)
-
-        if offers is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Candidat introuvable",
+    try:
+        if user_id is None:
+            result = service.search_by_payload(filters, page, size, cursor, facets)
+        else:
+            result = service.search_for_candidate_by_user(
+                user_id, filters, page, size, cursor, facets
             )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
 
-    total_elements = len(offers)
-    if size <= 0:
-        paged_offers = offers
-        total_pages = 0 if total_elements == 0 else 1
-        first = True
-        last = True
-    else:
-        start = page * size
-        end = start + size
-        paged_offers = offers[start:end]
-        total_pages = (total_elements + size - 1) // size
-        first = page == 0
-        last = page >= max(total_pages - 1, 0)
-
-    response = JobOfferSearchResponse(
-        content=paged_offers,
-        page=page,
-        size=size,
-        total_elements=total_elements,
-        total_pages=total_pages,
-        first=first,
-        last=last,
-    )
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidat introuvable",
+        )
+
+    response = _build_page_response(result, size)
     # APP_CACHE.set(cache_key, response)
     return response
 
 
+@router.get(
+    "/recherches/suggest",
+    response_model=list[SearchSuggestion],
+    tags=["recherches"],
+)
+def suggest(
+    q: str = Query(..., min_length=1, description="Début du texte saisi"),
+    limit: int = Query(default=10, ge=1, le=50),
+    types: list[str] | None = Query(
+        default=None,
+        description="Types de suggestions : title, tag, skill, city",
+    ),
+) -> list[SearchSuggestion]:
+    """Complete the search box from offer titles, tags, skills and cities."""
+    unknown = set(types or ()) - set(SUGGESTION_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Type de suggestion inconnu : {', '.join(sorted(unknown))}",
+        )
+    return [
+        SearchSuggestion(value=suggestion.value, type=suggestion.type)
+        for suggestion in SUGGESTIONS.suggest(q, limit, types)
+    ]
+
+
 @router.get(
     "/recherches/offres/recommandations",
     response_model=JobOfferSearchResponse,
@@ -130,35 +183,13 @@ def recommend_offers_from_history(
         return cached[1]
 
     service = SearchService(db)
-    offers = service.recommend_offers_from_search_history(user_id, history_limit)
-    if offers is None:
+    result = service.recommend_offers_from_search_history(user_id, history_limit, page, size)
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Utilisateur introuvable",
         )
 
-    total_elements = len(offers)
-    if size <= 0:
-        paged_offers = offers
-        total_pages = 0 if total_elements == 0 else 1
-        first = True
-        last = True
-    else:
-        start = page * size
-        end = start + size
-        paged_offers = offers[start:end]
-        total_pages = (total_elements + size - 1) // size
-        first = page == 0
-        last = page >= max(total_pages - 1, 0)
-
-    response = JobOfferSearchResponse(
-        content=paged_offers,
-        page=page,
-        size=size,
-        total_elements=total_elements,
-        total_pages=total_pages,
-        first=first,
-        last=last,
-    )
+    response = _build_page_response(result, size)
     APP_CACHE.set(cache_key, response)
     return response
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.api.v1 import deps
 from app.schemas import SourcingSearchResponse
-from app.services.matching_service import MatchingService
+from app.services.matching_service import MatchingService, MatchingWeights
 from app.utils.cache import APP_CACHE, make_cache_key
 
 
@@ -22,17 +22,19 @@ router = APIRouter()
 )
 def search_candidates_for_offer(
     db: Annotated[Session, Depends(deps.get_db)],
+    weights: Annotated[MatchingWeights, Depends(deps.get_matching_weights)],
     offer_id: UUID = Query(..., alias="offerId"),
     limit: int = Query(10, ge=1, le=50),
+    explain: bool = Query(False),
 ) -> SourcingSearchResponse:
     """Rank candidates for a specific offer and return the best matches."""
-    cache_key = make_cache_key("search_candidates_for_offer", offer_id, limit)
+    cache_key = make_cache_key("search_candidates_for_offer", offer_id, limit, explain=explain, weights=weights.as_dict())
     cached = APP_CACHE.get(cache_key)
     if cached[0]:
         return cached[1]
 
-    service = MatchingService(db)
-    response = service.rank_candidates_for_offer(offer_id, limit)
+    service = MatchingService(db, weights=weights)
+    response = service.rank_candidates_for_offer(offer_id, limit, explain=explain)
     if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
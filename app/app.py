@@ -15,6 +15,7 @@ from app.api.v1.routers import (
 )
 from app.db.init_db import init_db
 from app.db.session import SessionLocal
+from app.services.matching_parallel import PARALLEL_RANKER
 
 app = FastAPI(title="IRELIS Module IA", version="0.1.0")
 
@@ -49,6 +50,12 @@ def startup_event() -> None:
         db.close()
 
 
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    """Stop the parallel matching workers, if any were forked."""
+    PARALLEL_RANKER.shutdown()
+
+
 @app.get("/health", tags=["health"])  # lightweight uptime probe
 async def health_check() -> dict[str, str]:
     """Simple endpoint consumed by uptime monitors to verify service health."""
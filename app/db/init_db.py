@@ -4,9 +4,63 @@ from sqlalchemy import text
 
 from app.db import base  # noqa: F401 imported for side-effects
 from app.db.base import Base
+from app.utils.search_filters import SEARCH_TRGM_ENABLED
 
 logger = logging.getLogger(__name__)
 
+# (index, table, column) served by app.utils.search_filters.trigram_text().
+TRIGRAM_INDEXES = (
+    ("ix_job_offer_title_trgm", "job_offer", "title"),
+    ("ix_job_offer_country_trgm", "job_offer", "work_country_location"),
+    ("ix_job_offer_cities_city_trgm", "job_offer_cities", "city"),
+    ("ix_tag_name_trgm", "tag", "name"),
+    ("ix_candidates_professional_title_trgm", "candidates", "professional_title"),
+    ("ix_skill_name_trgm", "skill", "name"),
+)
+
+# (table, entity type, column holding the entity id) of the child and link
+# rows whose changes leave the candidate's or offer's updated_at untouched.
+# A job_preferences_id is resolved to its candidate.
+CHANGE_LOG_TRIGGERS = (
+    ("job_offer_tags", "offer", "job_offer_id"),
+    ("job_offer_cities", "offer", "job_offer_id"),
+    ("job_offer_languages", "offer", "job_offer_id"),
+    ("skill", "candidate", "candidate_id"),
+    ("language", "candidate", "candidate_id"),
+    ("experience", "candidate", "candidate_id"),
+    ("education", "candidate", "candidate_id"),
+    ("job_preferences", "candidate", "candidate_id"),
+    ("job_preferences_sectors", "candidate", "job_preferences_id"),
+    ("job_preferences_contract_types", "candidate", "job_preferences_id"),
+)
+
+_LOG_ENTITY_CHANGE = """
+CREATE OR REPLACE FUNCTION log_entity_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed jsonb[] := '{}';
+    data jsonb;
+    owner_id uuid;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        changed := array_append(changed, to_jsonb(OLD));
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        changed := array_append(changed, to_jsonb(NEW));
+    END IF;
+    FOREACH data IN ARRAY changed LOOP
+        owner_id := (data ->> TG_ARGV[1])::uuid;
+        IF TG_ARGV[1] = 'job_preferences_id' THEN
+            SELECT candidate_id INTO owner_id FROM job_preferences WHERE id = owner_id;
+        END IF;
+        IF owner_id IS NOT NULL THEN
+            INSERT INTO entity_changes (entity_type, entity_id) VALUES (TG_ARGV[0], owner_id);
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END
+$$
+"""
+
 
 def init_db(db: Session) -> None:
     """Create database tables if they do not exist."""
@@ -23,4 +77,64 @@ def init_db(db: Session) -> None:
         
     bind = db.get_bind()
     Base.metadata.create_all(bind=bind)
+    _init_change_log(db)
+
+    if SEARCH_TRGM_ENABLED:
+        _init_trigram_indexes(db)
     logger.info("Default admin user created")
+
+
+def _init_change_log(db: Session) -> None:
+    """Log child and link row changes into ``entity_changes`` with triggers."""
+    try:
+        db.execute(text(_LOG_ENTITY_CHANGE))
+        for table, entity_type, column in CHANGE_LOG_TRIGGERS:
+            name = f"trg_{table}_entity_change"
+            db.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+            db.execute(
+                text(
+                    f"CREATE TRIGGER {name} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                    f"FOR EACH ROW EXECUTE FUNCTION log_entity_change('{entity_type}', '{column}')"
+                )
+            )
+        db.commit()
+        logger.info("Entity change log triggers enabled")
+    except Exception as e:
+        # The in-process indexes then only see these changes at their full rebuilds.
+        logger.error(f"Could not create entity change log triggers: {e}")
+        db.rollback()
+
+
+def _init_trigram_indexes(db: Session) -> None:
+    """Enable pg_trgm and index the columns searched with trigram similarity.
+
+    Every trigram search calls ``immutable_unaccent()``, so a failure here
+    stops the startup instead of failing each search request later.
+    """
+    try:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # unaccent() is only STABLE; index expressions need an IMMUTABLE
+        # function, which the two-argument form with a fixed dictionary is.
+        db.execute(
+            text(
+                "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text "
+                "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS "
+                "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+            )
+        )
+        for name, table, column in TRIGRAM_INDEXES:
+            db.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                    f"USING gin (lower(immutable_unaccent({column})) gin_trgm_ops)"
+                )
+            )
+        db.commit()
+        logger.info("pg_trgm indexes enabled")
+    except Exception as e:
+        logger.error(f"Could not create pg_trgm indexes: {e}")
+        db.rollback()
+        raise RuntimeError(
+            "pg_trgm mode is enabled (SEARCH_TRGM_ENABLED or OFFER_SEARCH_ENGINE=trgm) "
+            "but its database setup failed; fix it or disable the mode"
+        ) from e
@@ -1,10 +1,36 @@
 import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 engine = create_engine(DATABASE_URL, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+T = TypeVar("T")
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Session for work outside a request (e.g. background refreshes)."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_in_session(work: Callable[[Session], T]) -> T:
+    """Run ``work`` with its own session, committed on success."""
+    with session_scope() as db:
+        return work(db)
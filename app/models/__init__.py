@@ -10,15 +10,19 @@ from .entities import (
     ChatbotUnmatchedQuestion,
     Education,
     EmailOtp,
+    EntityChange,
     Experience,
     JobOffer,
     JobOfferCity,
     JobOfferLanguage,
+    JobOfferSearchDocument,
     JobOfferTag,
     JobPreferences,
     JobPreferencesContractType,
     JobPreferencesSector,
     Language,
+    MatchScore,
+    MatchScoreState,
     Recruiter,
     RequiredDocument,
     SavedJobOffer,
@@ -44,15 +48,19 @@ __all__ = [
     "ChatbotUnmatchedQuestion",
     "Education",
     "EmailOtp",
+    "EntityChange",
     "Experience",
     "JobOffer",
     "JobOfferCity",
     "JobOfferLanguage",
+    "JobOfferSearchDocument",
     "JobOfferTag",
     "JobPreferences",
     "JobPreferencesContractType",
     "JobPreferencesSector",
     "Language",
+    "MatchScore",
+    "MatchScoreState",
     "Recruiter",
     "RequiredDocument",
     "SavedJobOffer",
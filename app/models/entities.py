@@ -18,7 +18,7 @@ from sqlalchemy import (
     text,
     case,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID, OID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, OID, TSVECTOR, UUID
 from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 
@@ -802,4 +802,118 @@ class Message(Base):
     is_read = Column(Boolean, default=False)
 
     sender = relationship("User", foreign_keys=[sender_id])
-    receiver = relationship("User", foreign_keys=[receiver_id])
\ No newline at end of file
+    receiver = relationship("User", foreign_keys=[receiver_id])
+
+#! ======================================================================
+#! Journal des modifications
+#! ======================================================================
+class EntityChange(Base):
+    """One change to a candidate or an offer that left its ``updated_at`` untouched.
+
+    Rows are written by the triggers ``init_db`` installs on child and link
+    tables (skills, educations, offer tags, cities...), so the in-process
+    indexes polling ``updated_at`` also see those changes.
+    """
+
+    __tablename__ = "entity_changes"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    changed_at = Column(
+        DateTime(timezone=True),
+        server_default=text("clock_timestamp()"),
+        nullable=False,
+    )
+
+    __table_args__ = (Index("ix_entity_changes_type_changed_at", entity_type, changed_at),)
+
+
+#! ======================================================================
+#! Scores de matching matérialisés
+#! ======================================================================
+class MatchScore(Base):
+    __tablename__ = "match_scores"
+
+    offer_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("job_offer.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    candidate_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("candidates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    score = Column(Float, nullable=False)
+    matched_skills = Column(ARRAY(String(255)), nullable=False, default=list)
+    coverage = Column(Float, nullable=False)
+    title_similarity = Column(Float, nullable=False)
+    geo_fit = Column(Float, nullable=False)
+    seniority = Column(Float, nullable=False)
+    language = Column(Float, nullable=False)
+    salary = Column(Float, nullable=False)
+    profile_focus = Column(Float, nullable=False)
+    computed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_match_scores_offer_score", offer_id, score.desc()),
+        Index("ix_match_scores_candidate_score", candidate_id, score.desc()),
+    )
+
+
+class MatchScoreState(Base):
+    """Materialization status of one offer or candidate in ``match_scores``.
+
+    Every row of the other side missing from ``match_scores`` for this subject
+    scores at most ``floor``; a NULL floor means every row is stored.
+    """
+
+    __tablename__ = "match_score_states"
+
+    subject_type = Column(String(20), primary_key=True)
+    subject_id = Column(UUID(as_uuid=True), primary_key=True)
+    floor = Column(Float)
+    weights_key = Column(String(255), nullable=False)
+    computed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+#! ======================================================================
+#! Index plein texte des offres
+#! ======================================================================
+class JobOfferSearchDocument(Base):
+    """Unaccented ``tsvector`` of an offer's title, tags and description.
+
+    ``unaccent`` is not immutable and the description lives in a large
+    object, so the document cannot be an expression index on ``job_offer``;
+    the application keeps this side table up to date instead.
+    """
+
+    __tablename__ = "job_offer_search"
+
+    offer_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("job_offer.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    document = Column(TSVECTOR, nullable=False)
+    indexed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_job_offer_search_document", document, postgresql_using="gin"),
+    )
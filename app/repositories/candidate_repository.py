@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import os
+import threading
 from ast import stmt
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import String, cast, or_, and_
+from sqlalchemy import ColumnElement, String, and_, bindparam, cast, func, or_
 from sqlalchemy.orm import Session, selectinload
 
 from app.models import (
@@ -17,7 +22,47 @@ from app.models import (
     Sector,
     Skill,
 )
-from app.utils.boolean_query import BooleanQueryParser
+from app.repositories.change_log_repository import CANDIDATE_ENTITY, changed_entity_ids
+from app.utils.boolean_query import BooleanQueryParser, Node, parse_query, term_pattern
+from app.utils.pagination import Page, SortKey, paginate
+from app.utils.search_filters import (
+    SEARCH_TRGM_ENABLED,
+    fuzzy_contains,
+    language_names,
+    normalize,
+    trigram_text,
+    word_similarity,
+)
+
+
+class BooleanPlanCache:
+    """LRU of optimized boolean query expressions, keyed by canonical query string.
+
+    Reusing the same expression object also lets SQLAlchemy reuse its
+    compiled SQL from the statement cache.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, ColumnElement | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, ColumnElement | None]:
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def set(self, key: str, expression: ColumnElement | None) -> None:
+        with self._lock:
+            self._entries[key] = expression
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+BOOLEAN_PLANS = BooleanPlanCache(max_entries=int(os.getenv("BOOLEAN_PLAN_CACHE_SIZE", "512")))
 
 
 class CandidateRepository:
@@ -28,9 +73,10 @@ class CandidateRepository:
         self.db = db
         self._boolean_parser = BooleanQueryParser()
 
-    def _query_with_relationships(self):
-        """Base query including the relationships needed by services."""
-        return self.db.query(Candidate).options(
+    @staticmethod
+    def _relationship_options():
+        """Relationships needed by services."""
+        return (
             selectinload(Candidate.skills),
             selectinload(Candidate.languages),
             selectinload(Candidate.educations),
@@ -40,6 +86,41 @@ class CandidateRepository:
             selectinload(Candidate.saved_job_offers),
         )
 
+    def _query_with_relationships(self):
+        """Base query including the relationships needed by services."""
+        return self.db.query(Candidate).options(*self._relationship_options())
+
+    def _search_page(
+        self,
+        query,
+        page: int,
+        size: int,
+        cursor: str | None,
+        relevance=None,
+    ) -> Page:
+        """Load one (1-based) page of search results, best matches then newest profiles first."""
+        keys = [SortKey(Candidate.created_at, descending=True), SortKey(Candidate.id)]
+        if relevance is not None:
+            keys.insert(0, SortKey(relevance, descending=True))
+        return paginate(
+            query,
+            keys,
+            size,
+            page=page,
+            cursor=cursor,
+            first_page=1,
+            options=self._relationship_options(),
+        )
+
+    def _query_for_matching(self):
+        """Lighter base query loading only what the matching features need."""
+        return self.db.query(Candidate).options(
+            selectinload(Candidate.skills),
+            selectinload(Candidate.languages),
+            selectinload(Candidate.experiences),
+            selectinload(Candidate.job_preferences),
+        )
+
     def list(self) -> list[Candidate]:
         """Return all candidates with their relationships eagerly loaded."""
         return self._query_with_relationships().all()
@@ -52,6 +133,71 @@ class CandidateRepository:
             .first()
         )
 
+    def list_for_matching(self, candidate_ids: Iterable[UUID] | None = None) -> list[Candidate]:
+        """Return candidates (optionally restricted to ids) for feature extraction."""
+        query = self._query_for_matching()
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(list(candidate_ids)))
+        return query.all()
+
+    def list_for_search_index(self, candidate_ids: Iterable[UUID] | None = None) -> list[Candidate]:
+        """Return candidates (optionally restricted to ids) with every field the boolean search reads."""
+        query = self.db.query(Candidate).options(
+            selectinload(Candidate.skills),
+            selectinload(Candidate.languages),
+            selectinload(Candidate.educations),
+            selectinload(Candidate.experiences),
+            selectinload(Candidate.job_preferences)
+            .selectinload(JobPreferences.sectors)
+            .selectinload(JobPreferencesSector.sector),
+            selectinload(Candidate.job_preferences).selectinload(JobPreferences.contract_types),
+        )
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(list(candidate_ids)))
+        return query.all()
+
+    def list_by_ids(self, candidate_ids: list[UUID]) -> list[Candidate]:
+        """Return the given candidates in the given order, skipping unknown ids."""
+        if not candidate_ids:
+            return []
+        found = {
+            candidate.id: candidate
+            for candidate in self._query_with_relationships().filter(Candidate.id.in_(candidate_ids))
+        }
+        return [found[candidate_id] for candidate_id in candidate_ids if candidate_id in found]
+
+    def list_ids(self) -> list[UUID]:
+        """Return every candidate identifier."""
+        return [row[0] for row in self.db.query(Candidate.id).all()]
+
+    def list_ids_updated_since(self, since: datetime) -> list[UUID]:
+        """Return ids of candidates whose profile, child or link rows changed after ``since``.
+
+        Deleted child rows and link rows only show up through the change log.
+        """
+        def _changed(model):
+            return func.coalesce(model.updated_at, model.created_at) > since
+
+        return [
+            row[0]
+            for row in self.db.query(Candidate.id)
+            .filter(
+                or_(
+                    _changed(Candidate),
+                    Candidate.id.in_(changed_entity_ids(CANDIDATE_ENTITY, since)),
+                    Candidate.skills.any(_changed(Skill)),
+                    Candidate.languages.any(_changed(Language)),
+                    Candidate.experiences.any(_changed(Experience)),
+                    Candidate.educations.any(_changed(Education)),
+                    Candidate.job_preferences.has(_changed(JobPreferences)),
+                    Candidate.job_preferences.has(
+                        JobPreferences.sectors.any(JobPreferencesSector.sector.has(_changed(Sector)))
+                    ),
+                )
+            )
+            .all()
+        ]
+
     def get_by_user_id(self, user_id: UUID) -> Candidate | None:
         """Retrieve the candidate linked to the provided user id."""
         return (
@@ -60,29 +206,45 @@ class CandidateRepository:
             .first()
         )
 
-    def search_by_boolean_query(self, query: str, page: int, size: int) -> tuple[int, list[Candidate]]:
-        """Recherche booléenne avec pagination."""
-        expression = self._boolean_parser.build_expression(query, self._term_clause)
+    def search_by_boolean_query(
+        self,
+        query: str,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+    ) -> Page:
+        """Recherche booléenne avec pagination (par page ou par curseur)."""
+        expression = self._boolean_plan(parse_query(query))
         if expression is None:
-            return 0, []
-            
-        query_filtered = self._query_with_relationships().filter(expression)
-        
-        total_elements = query_filtered.count()
-        offset = (page - 1) * size
-        candidates = query_filtered.offset(offset).limit(size).all()
-        
-        return total_elements, candidates
+            return Page(page=page)
 
-    def _term_clause(self, raw_term: str):
+        filtered = self.db.query(Candidate).select_from(Candidate).filter(expression)
+        return self._search_page(filtered, page, size, cursor)
+
+    def _boolean_plan(self, node: Node | None) -> ColumnElement | None:
+        """Filter expression of a parsed query, reused across requests for the same canonical query."""
+        if node is None:
+            return None
+        key = str(node)
+        found, expression = BOOLEAN_PLANS.get(key)
+        if found:
+            return expression
+
+        expression = self._boolean_parser.to_expression(node, self._term_clause)
+        BOOLEAN_PLANS.set(key, expression)
+        return expression
+
+    def _term_clause(self, raw_term: str, field: str | None = None):
         term = (raw_term or "").strip()
         if not term:
             return None
 
-        like_term = term.replace("*", "%")
-        if "%" not in like_term:
-            like_term = f"%{like_term}%"
-        like_term = like_term.replace("%%", "%")
+        pattern = term_pattern(term)
+        if field is not None:
+            return self._field_clause(field, term, pattern)
+
+        # One parameter per term, shared by every column it is matched against.
+        like_term = bindparam("term", pattern, unique=True)
 
         def _cast_like(column):
             return cast(column, String).ilike(like_term)
@@ -164,44 +326,88 @@ class CandidateRepository:
         clauses.extend(job_pref_conditions)
 
         return or_(*clauses)
-    
-    
-    def search_candidates_by_keywords(self, query: str, page: int, size: int) -> tuple[int, list[Candidate]]:
+
+    @staticmethod
+    def _field_clause(field: str, term: str, pattern: str):
+        """Clause of a qualified term (``skill:python``), on its own table only."""
+        if field == "lang" and "*" not in term:
+            # "en", "anglais" and "english" name the same language.
+            language = func.lower(func.trim(Language.language))
+            return Candidate.languages.any(
+                or_(*(language == name for name in sorted(language_names(term))))
+            )
+        if field == "lang":
+            return Candidate.languages.any(Language.language.ilike(pattern))
+
+        if field in ("title", "skill") and SEARCH_TRGM_ENABLED:
+            # Same expression as the trigram indexes created by init_db.
+            def _matches(column):
+                return trigram_text(column).like(normalize(pattern))
+        else:
+            def _matches(column):
+                return column.ilike(pattern)
+
+        if field == "title":
+            return _matches(Candidate.professional_title)
+        if field == "skill":
+            return Candidate.skills.any(_matches(Skill.name))
+        if field == "city":
+            return _matches(Candidate.city)
+        if field == "country":
+            return _matches(Candidate.country)
+        if field == "company":
+            return Candidate.experiences.any(_matches(Experience.company_name))
+        if field == "school":
+            return Candidate.educations.any(_matches(Education.institution))
+        raise ValueError(f"Champ de recherche inconnu : {field}")
+
+    def search_candidates_by_keywords(
+        self,
+        query: str,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+    ) -> Page:
         """Search candidates using standard multi-column keyword matching."""
         
         # 1. Nettoyer et découper la requête en mots-clés
         # Exemple: "Developpeur Python Paris" -> ["Developpeur", "Python", "Paris"]
         tokens = query.strip().split()
         if not tokens:
-            return []
+            return Page(page=page)
 
-        # 2. Préparer la requête de base (avec les chargements de relations habituels)
-        stmt = self._query_with_relationships()
+        # 2. Préparer la requête de base (relations chargées sur la page seulement)
+        stmt = self.db.query(Candidate)
 
         # 3. Construire les conditions dynamiques
         # On veut que CHAQUE mot-clé soit trouvé au moins quelque part (AND global)
         conditions = []
         for token in tokens:
             search_term = f"%{token}%"
+
+            # En mode pg_trgm, titre et compétences tolèrent les fautes de frappe
+            # et sont servis par les index trigrammes.
+            if SEARCH_TRGM_ENABLED:
+                title_condition = fuzzy_contains(Candidate.professional_title, token)
+                skill_condition = fuzzy_contains(Skill.name, token)
+            else:
+                title_condition = Candidate.professional_title.ilike(search_term)
+                skill_condition = Skill.name.ilike(search_term)
             
             # Le mot-clé peut être dans le titre, le nom, la ville, les skills OU les expériences
             token_condition = or_(
-                Candidate.professional_title.ilike(search_term),
+                title_condition,
                 Candidate.first_name.ilike(search_term),
                 Candidate.last_name.ilike(search_term),
                 Candidate.city.ilike(search_term),
                 Candidate.country.ilike(search_term),
                 Candidate.presentation.ilike(search_term),
-                Candidate.skills.any(Skill.name.ilike(search_term)),
+                Candidate.skills.any(skill_condition),
                 Candidate.experiences.any(Experience.position.ilike(search_term)),
                 Candidate.experiences.any(Experience.description.ilike(search_term)),
                 Candidate.experiences.any(Experience.company_name.ilike(search_term))
             )
             conditions.append(token_condition)
-            query_filtered = stmt.filter(and_(*conditions))
-            total_elements = query_filtered.count()
-            
-        offset = (page - 1) * size
-        candidates = query_filtered.offset(offset).limit(size).all()
-    
-        return total_elements, candidates
+
+        relevance = word_similarity(query, Candidate.professional_title) if SEARCH_TRGM_ENABLED else None
+        return self._search_page(stmt.filter(and_(*conditions)), page, size, cursor, relevance)
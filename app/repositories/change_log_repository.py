@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models import EntityChange
+
+
+CANDIDATE_ENTITY = "candidate"
+OFFER_ENTITY = "offer"
+
+# Polls re-read this much history before their last watermark: a transaction
+# still running at the previous poll commits rows stamped before it.
+WATERMARK_MARGIN = timedelta(seconds=int(os.getenv("CHANGE_WATERMARK_MARGIN_SECONDS", "300")))
+
+# Change log rows older than this are no longer read by any poll.
+_RETENTION = timedelta(days=1)
+
+
+def changed_entity_ids(entity_type: str, since: datetime):
+    """Ids logged in ``entity_changes`` after ``since``, as a subquery."""
+    return select(EntityChange.entity_id).where(
+        EntityChange.entity_type == entity_type,
+        EntityChange.changed_at > since,
+    )
+
+
+class ChangeLogRepository:
+    """Watermarks and housekeeping of the ``entity_changes`` log."""
+
+    def __init__(self, db: Session):
+        """Store session for reuse."""
+        self.db = db
+
+    def watermark(self) -> datetime:
+        """Watermark for the next poll: the database clock before reading, minus the safety margin."""
+        now = self.db.query(func.clock_timestamp(type_=DateTime(timezone=True))).scalar()
+        return now - WATERMARK_MARGIN
+
+    def prune(self) -> None:
+        """Delete the log rows no poll will read again."""
+        cutoff = func.clock_timestamp(type_=DateTime(timezone=True)) - _RETENTION
+        self.db.execute(delete(EntityChange).where(EntityChange.changed_at < cutoff))
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Candidate, JobOffer, MatchScore, MatchScoreState
+
+
+OFFER_SUBJECT = "offer"
+CANDIDATE_SUBJECT = "candidate"
+
+_UPSERT_BATCH_SIZE = 1000
+
+
+class MatchScoreRepository:
+    """Data access helpers for the materialized ``match_scores`` table."""
+
+    def __init__(self, db: Session):
+        """Store session for reuse."""
+        self.db = db
+
+    def top_for_offer(self, offer_id: UUID, limit: int) -> list[MatchScore]:
+        """Return the best stored candidate scores of an offer (index scan)."""
+        return (
+            self.db.query(MatchScore)
+            .filter(MatchScore.offer_id == offer_id)
+            .order_by(MatchScore.score.desc(), MatchScore.candidate_id)
+            .limit(limit)
+            .all()
+        )
+
+    def top_for_candidate(self, candidate_id: UUID, limit: int) -> list[MatchScore]:
+        """Return the best stored offer scores of a candidate (index scan)."""
+        return (
+            self.db.query(MatchScore)
+            .filter(MatchScore.candidate_id == candidate_id)
+            .order_by(MatchScore.score.desc(), MatchScore.offer_id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_state(self, subject_type: str, subject_id: UUID) -> MatchScoreState | None:
+        """Return the materialization state of one subject."""
+        return self.db.get(MatchScoreState, (subject_type, subject_id))
+
+    def floors(self, subject_type: str, weights_key: str) -> dict[UUID, float | None]:
+        """Return ``{subject_id: floor}`` for subjects materialized with ``weights_key``."""
+        rows = self.db.execute(
+            select(MatchScoreState.subject_id, MatchScoreState.floor).where(
+                MatchScoreState.subject_type == subject_type,
+                MatchScoreState.weights_key == weights_key,
+            )
+        )
+        return {subject_id: floor for subject_id, floor in rows}
+
+    def has_other_weights(self, weights_key: str) -> bool:
+        """Tell whether some subject was materialized with other weights."""
+        return self.db.query(
+            select(MatchScoreState.subject_id)
+            .where(MatchScoreState.weights_key != weights_key)
+            .exists()
+        ).scalar()
+
+    def save_state(
+        self,
+        subject_type: str,
+        subject_id: UUID,
+        floor: float | None,
+        weights_key: str,
+    ) -> None:
+        """Insert or refresh the state of one subject."""
+        statement = insert(MatchScoreState).values(
+            subject_type=subject_type,
+            subject_id=subject_id,
+            floor=floor,
+            weights_key=weights_key,
+        )
+        self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[MatchScoreState.subject_type, MatchScoreState.subject_id],
+                set_={
+                    "floor": statement.excluded.floor,
+                    "weights_key": statement.excluded.weights_key,
+                    "computed_at": func.now(),
+                },
+            )
+        )
+
+    def replace_for_offer(self, offer_id: UUID, rows: list[dict]) -> None:
+        """Make ``rows`` the stored scores of an offer."""
+        keep = [row["candidate_id"] for row in rows]
+        self.db.execute(
+            delete(MatchScore).where(
+                MatchScore.offer_id == offer_id,
+                MatchScore.candidate_id.not_in(keep),
+            )
+        )
+        self._upsert(rows)
+
+    def replace_for_candidate(self, candidate_id: UUID, rows: list[dict]) -> None:
+        """Make ``rows`` the stored scores of a candidate."""
+        keep = [row["offer_id"] for row in rows]
+        self.db.execute(
+            delete(MatchScore).where(
+                MatchScore.candidate_id == candidate_id,
+                MatchScore.offer_id.not_in(keep),
+            )
+        )
+        self._upsert(rows)
+
+    def delete_subject(self, subject_type: str, subject_id: UUID) -> None:
+        """Drop the scores and state of a subject that no longer exists."""
+        column = MatchScore.offer_id if subject_type == OFFER_SUBJECT else MatchScore.candidate_id
+        self.db.execute(delete(MatchScore).where(column == subject_id))
+        self.db.execute(
+            delete(MatchScoreState).where(
+                MatchScoreState.subject_type == subject_type,
+                MatchScoreState.subject_id == subject_id,
+            )
+        )
+
+    def delete_orphan_states(self) -> None:
+        """Drop states whose offer or candidate was deleted."""
+        for subject_type, model in ((OFFER_SUBJECT, JobOffer), (CANDIDATE_SUBJECT, Candidate)):
+            self.db.execute(
+                delete(MatchScoreState).where(
+                    MatchScoreState.subject_type == subject_type,
+                    MatchScoreState.subject_id.not_in(select(model.id)),
+                )
+            )
+
+    def clear(self) -> None:
+        """Drop every materialized score and state."""
+        self.db.execute(delete(MatchScore))
+        self.db.execute(delete(MatchScoreState))
+
+    def _upsert(self, rows: list[dict]) -> None:
+        for start in range(0, len(rows), _UPSERT_BATCH_SIZE):
+            statement = insert(MatchScore).values(rows[start:start + _UPSERT_BATCH_SIZE])
+            updated = {
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column not in ("offer_id", "candidate_id")
+            }
+            updated["computed_at"] = func.now()
+            self.db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[MatchScore.offer_id, MatchScore.candidate_id],
+                    set_=updated,
+                )
+            )
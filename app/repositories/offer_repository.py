@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from datetime import datetime
 from uuid import UUID
 
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session, selectinload
 
-from app.models import JobOffer, Recruiter
+from app.models import JobOffer, Recruiter, Tag
+from app.repositories.change_log_repository import OFFER_ENTITY, changed_entity_ids
 
 
 class OfferRepository:
@@ -30,6 +34,43 @@ class OfferRepository:
         """Return every offer with eager-loaded relationships."""
         return self._query().all()
 
+    def list_by_ids(self, offer_ids: Iterable[UUID]) -> list[JobOffer]:
+        """Return the offers matching the given identifiers (unordered)."""
+        ids = list(offer_ids)
+        if not ids:
+            return []
+        return self._query().filter(JobOffer.id.in_(ids)).all()
+
+    def list_for_matching(self, offer_ids: Iterable[UUID] | None = None) -> list[JobOffer]:
+        """Return offers (optionally restricted to ids) for feature extraction."""
+        query = self.db.query(JobOffer).options(
+            selectinload(JobOffer.tags),
+            selectinload(JobOffer.cities),
+            selectinload(JobOffer.languages),
+        )
+        if offer_ids is not None:
+            query = query.filter(JobOffer.id.in_(list(offer_ids)))
+        return query.all()
+
+    def list_ids(self) -> list[UUID]:
+        """Return every offer identifier."""
+        return [row[0] for row in self.db.query(JobOffer.id).all()]
+
+    def list_ids_updated_since(self, since: datetime) -> list[UUID]:
+        """Return ids of offers whose row, tags, tag links, cities or languages changed after ``since``."""
+        return [
+            row[0]
+            for row in self.db.query(JobOffer.id)
+            .filter(
+                or_(
+                    func.coalesce(JobOffer.updated_at, JobOffer.created_at) > since,
+                    JobOffer.id.in_(changed_entity_ids(OFFER_ENTITY, since)),
+                    JobOffer.tags.any(func.coalesce(Tag.updated_at, Tag.created_at) > since),
+                )
+            )
+            .all()
+        ]
+
     def get(self, offer_id: UUID) -> JobOffer | None:
         """Retrieve a single offer by identifier."""
         return self._query().filter(JobOffer.id == offer_id).first()
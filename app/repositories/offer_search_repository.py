@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import JobOffer, JobOfferSearchDocument, JobOfferTag, Tag
+from app.utils.search_filters import TS_CONFIG
+
+
+def _weighted(text, weight: str):
+    """Unaccented, weighted tsvector of a nullable text expression."""
+    vector = func.to_tsvector(TS_CONFIG, func.unaccent(func.coalesce(text, "")))
+    # setweight() takes a "char"; a bound VARCHAR would not resolve.
+    return func.setweight(vector, literal_column(f"'{weight}'"))
+
+
+def _document_expression():
+    """Search document of the current ``JobOffer`` row: title > tags > description."""
+    tags = (
+        select(func.string_agg(Tag.name, " "))
+        .join(JobOfferTag, JobOfferTag.tag_id == Tag.id)
+        .where(JobOfferTag.job_offer_id == JobOffer.id)
+        .scalar_subquery()
+    )
+    return (
+        _weighted(JobOffer.title, "A")
+        .op("||")(_weighted(tags, "B"))
+        .op("||")(_weighted(JobOffer.description, "C"))
+    )
+
+
+class OfferSearchRepository:
+    """Maintenance of the ``job_offer_search`` full-text documents."""
+
+    def __init__(self, db: Session):
+        """Store session for reuse."""
+        self.db = db
+
+    def last_indexed_at(self) -> datetime | None:
+        """Return when the most recent document was written, if any."""
+        return self.db.query(func.max(JobOfferSearchDocument.indexed_at)).scalar()
+
+    def upsert_documents(self, offer_ids: Iterable[UUID] | None = None) -> None:
+        """Rebuild the documents of the given offers, or of every offer."""
+        source = select(JobOffer.id, _document_expression())
+        if offer_ids is not None:
+            offer_ids = list(offer_ids)
+            if not offer_ids:
+                return
+            source = source.where(JobOffer.id.in_(offer_ids))
+        self._upsert(source)
+
+    def index_missing(self) -> None:
+        """Build documents for offers that have none yet."""
+        source = select(JobOffer.id, _document_expression()).where(
+            ~select(JobOfferSearchDocument.offer_id)
+            .where(JobOfferSearchDocument.offer_id == JobOffer.id)
+            .exists()
+        )
+        self._upsert(source)
+
+    def _upsert(self, source) -> None:
+        statement = insert(JobOfferSearchDocument).from_select(
+            [JobOfferSearchDocument.offer_id, JobOfferSearchDocument.document],
+            source,
+        )
+        self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[JobOfferSearchDocument.offer_id],
+                set_={
+                    "document": statement.excluded.document,
+                    "indexed_at": func.now(),
+                },
+            )
+        )
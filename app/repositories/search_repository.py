@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, literal, or_, select, union_all
 from sqlalchemy.orm import Session, selectinload
 
 from app.models import (
@@ -17,18 +18,24 @@ from app.models import (
 )
 from app.models.enums import JobOfferStatus, SearchTarget, SearchType
 from app.utils.search_filters import (
-    apply_text_search,
+    apply_offer_text_search,
     as_list,
     enum_to_str,
     list_to_csv,
+    location_matches,
     normalize,
     parse_datetime,
 )
+from app.utils.pagination import Page, SortKey, paginate
 
 if TYPE_CHECKING:
     from app.schemas import SearchCreate
 
 
+# Facets counted by ``SearchRepository.facet_counts``, in response order.
+FACETS = ("contract_type", "country", "city", "language")
+
+
 class SearchRepository:
     """Data access helpers dedicated to searching job offers."""
 
@@ -36,9 +43,10 @@ class SearchRepository:
         """Store session for reuse."""
         self.db = db
 
-    def _query(self):
-        """Base query returning offers with needed relationships."""
-        return self.db.query(JobOffer).options(
+    @staticmethod
+    def _eager_options():
+        """Relationships needed to map offers to DTOs."""
+        return (
             selectinload(JobOffer.recruiter).selectinload(Recruiter.sector),
             selectinload(JobOffer.applications),
             selectinload(JobOffer.tags),
@@ -47,17 +55,115 @@ class SearchRepository:
             selectinload(JobOffer.required_documents),
         )
 
+    def _page(
+        self,
+        query,
+        relevance,
+        page: int,
+        size: int,
+        cursor: str | None,
+        facets: bool = False,
+    ) -> Page:
+        """Load one page ordered on text relevance, publication date and id.
+
+        ``page`` is zero-based and ignored when a ``cursor`` is given; see
+        :func:`app.utils.pagination.paginate`. With ``facets``, the page also
+        carries the facet counts of every matching offer.
+        """
+        keys = [
+            SortKey(JobOffer.published_at, descending=True),
+            SortKey(JobOffer.id),
+        ]
+        if relevance is not None:
+            keys.insert(0, SortKey(relevance, descending=True))
+        result = paginate(query, keys, size, page=page, cursor=cursor, options=self._eager_options())
+        if facets:
+            result = replace(result, facets=self.facet_counts(query))
+        return result
+
+    def facet_counts(self, query) -> dict[str, list[tuple[str, int]]]:
+        """Count the offers of ``query`` per contract type, country, city and language.
+
+        All facets come from one statement: a UNION ALL of grouped queries
+        over a CTE of the matching ids, which Postgres materializes once. Cities, countries and languages are grouped ignoring
+        case and accents, like the search filters compare them.
+        """
+        matched = (
+            query.with_entities(JobOffer.id.label("offer_id"))
+            .order_by(None)
+            .distinct()
+            .cte("matched_offers")
+        )
+
+        def grouped(name: str, column, target, offer_column, normalized: bool = True):
+            key = func.lower(func.unaccent(column)) if normalized else column
+            return (
+                select(
+                    literal(name).label("facet"),
+                    func.min(column).label("value"),
+                    func.count(func.distinct(matched.c.offer_id)).label("count"),
+                )
+                .select_from(matched.join(target, offer_column == matched.c.offer_id))
+                .where(column.is_not(None))
+                .group_by(key)
+            )
+
+        statement = union_all(
+            grouped(
+                "contract_type", JobOffer.contract_type, JobOffer, JobOffer.id, normalized=False
+            ),
+            grouped("country", JobOffer.work_country_location, JobOffer, JobOffer.id),
+            grouped("city", JobOfferCity.city, JobOfferCity, JobOfferCity.job_offer_id),
+            grouped(
+                "language",
+                JobOfferLanguage.language,
+                JobOfferLanguage,
+                JobOfferLanguage.job_offer_id,
+            ),
+        )
+        counts: dict[str, list[tuple[str, int]]] = {name: [] for name in FACETS}
+        for facet, value, count in self.db.execute(statement):
+            counts[facet].append((value, count))
+        for values in counts.values():
+            values.sort(key=lambda item: (-item[1], item[0]))
+        return counts
+
+    def list_published(self, offer_ids: list[UUID] | None = None) -> list[JobOffer]:
+        """Return published offers (optionally restricted to ids), ready for DTO mapping."""
+        query = self.db.query(JobOffer).options(*self._eager_options())
+        query = query.filter(JobOffer.status == JobOfferStatus.PUBLISHED)
+        if offer_ids is not None:
+            query = query.filter(JobOffer.id.in_(offer_ids))
+        return query.all()
+
+    def list_published_ids(self) -> list[UUID]:
+        """Return the identifiers of every published offer."""
+        return [
+            row[0]
+            for row in self.db.query(JobOffer.id)
+            .filter(JobOffer.status == JobOfferStatus.PUBLISHED)
+            .all()
+        ]
+
     def search_for_candidate(
         self,
         candidate: Candidate,
         payload: "SearchCreate",
         search_filters: dict | None = None,
-    ) -> list[JobOffer]:
-        """Search offers using candidate data combined with optional filters."""
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page:
+        """Search offers using candidate data combined with optional filters.
+
+        Returns the requested (zero-based) page, or the page following
+        ``cursor`` when one is given.
+        """
         filters = search_filters or {}
-        query = self._query()
+        query = self.db.query(JobOffer)
 
-        query = apply_text_search(query, filters.get("query"))
+        query, relevance = apply_offer_text_search(query, filters.get("query"))
 
         candidate_preferences = getattr(candidate, "job_preferences", None)
 
@@ -81,8 +187,7 @@ class SearchRepository:
         if not country:
             country = candidate.country
         if country:
-            normalized_country = normalize(country)
-            query = query.filter(func.lower(func.unaccent(JobOffer.work_country_location)) == normalized_country)
+            query = query.filter(location_matches(JobOffer.work_country_location, country))
 
         city = filters.get("city")
         if not city and candidate_preferences and candidate_preferences.city:
@@ -90,12 +195,7 @@ class SearchRepository:
         if not city:
             city = candidate.city
         if city:
-            normalized_city = normalize(city)
-            query = query.filter(
-                JobOffer.cities.any(
-                    func.lower(func.unaccent(JobOfferCity.city)) == normalized_city
-                )
-            )
+            query = query.filter(JobOffer.cities.any(location_matches(JobOfferCity.city, city)))
 
         skill_names = filters.get("skills")
         if not skill_names:
@@ -126,37 +226,35 @@ class SearchRepository:
                 )
             )
 
-        if payload and payload.query:
-            query = query.order_by(
-                func.lower(func.unaccent(JobOffer.title))
-                .like(f"%{normalize(payload.query)}%")
-                .desc()
-            )
-            
-        return query.all()
+        return self._page(query, relevance, page, size, cursor, facets)
 
-    def search_by_payload(self, payload: "SearchCreate") -> list[JobOffer]:
-        """Search offers using the provided payload filters only."""
-        query = self._query()
+    def search_by_payload(
+        self,
+        payload: "SearchCreate",
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page:
+        """Search offers using the provided payload filters only.
+
+        Returns the requested (zero-based) page, or the page following
+        ``cursor`` when one is given.
+        """
+        query = self.db.query(JobOffer)
         
-        query = apply_text_search(query, getattr(payload, "query", None))
+        query, relevance = apply_offer_text_search(query, getattr(payload, "query", None))
         query = query.filter(JobOffer.status == JobOfferStatus.PUBLISHED)
         
         country = getattr(payload, "country", None)
         
         if country:
-            normalized_country = normalize(country)
-            query = query.filter(func.lower(func.unaccent(JobOffer.work_country_location)) == normalized_country)
+            query = query.filter(location_matches(JobOffer.work_country_location, country))
         
 
         city = getattr(payload, "city", None)
         if city:
-            normalized_city = normalize(city)
-            query = query.filter(
-                JobOffer.cities.any(
-                    func.lower(func.unaccent(JobOfferCity.city)) == normalized_city
-                )
-            )
+            query = query.filter(JobOffer.cities.any(location_matches(JobOfferCity.city, city)))
 
         contract_type = getattr(payload, "type_contrat", None) or getattr(payload, "contract_type", None)
         contract_values = as_list(contract_type)
@@ -180,14 +278,7 @@ class SearchRepository:
         if date_publication:
             query = query.filter(JobOffer.published_at >= date_publication)
 
-        if payload.query:
-            query = query.order_by(
-                func.lower(func.unaccent(JobOffer.title))
-                .like(f"%{normalize(payload.query)}%")
-                .desc()
-            )
-
-        return query.all()
+        return self._page(query, relevance, page, size, cursor, facets)
 
 
     def record_search(self, user_id: UUID, payload: "SearchCreate" | None) -> None:
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import JobOffer, Search, Skill
+from app.models.enums import JobOfferStatus
+
+
+class SuggestionRepository:
+    """Data access helpers feeding the search suggestion index."""
+
+    def __init__(self, db: Session):
+        """Store session for reuse."""
+        self.db = db
+
+    def published_offers(self, offer_ids: Iterable[UUID] | None = None) -> list[JobOffer]:
+        """Return published offers with the tags and cities suggested from them."""
+        query = (
+            self.db.query(JobOffer)
+            .options(selectinload(JobOffer.tags), selectinload(JobOffer.cities))
+            .filter(JobOffer.status == JobOfferStatus.PUBLISHED)
+        )
+        if offer_ids is not None:
+            query = query.filter(JobOffer.id.in_(list(offer_ids)))
+        return query.all()
+
+    def skill_ids(self) -> list[UUID]:
+        """Return the id of every skill."""
+        return [row[0] for row in self.db.query(Skill.id).all()]
+
+    def skill_names(self, since: datetime | None = None) -> list[tuple[UUID, str | None]]:
+        """Return ``(skill_id, name)`` for every skill, or those changed after ``since``."""
+        query = self.db.query(Skill.id, Skill.name)
+        if since is not None:
+            query = query.filter(func.coalesce(Skill.updated_at, Skill.created_at) > since)
+        return [(skill_id, name) for skill_id, name in query.all()]
+
+    def search_counts(self, until: datetime) -> list[tuple[str, str | None, int]]:
+        """Return ``(query, city, count)`` over the searches recorded up to ``until``."""
+        query = (
+            self.db.query(Search.query, Search.city, func.count(Search.id))
+            .filter(Search.created_at <= until)
+            .group_by(Search.query, Search.city)
+        )
+        return [(text, city, count) for text, city, count in query.all()]
+
+    def searches_since(self, since: datetime) -> list[tuple[UUID, str, str | None]]:
+        """Return ``(search_id, query, city)`` of the searches recorded after ``since``."""
+        query = self.db.query(Search.id, Search.query, Search.city).filter(Search.created_at > since)
+        return [(search_id, text, city) for search_id, text, city in query.all()]
@@ -18,10 +18,17 @@ from .entities import (
     JobOfferLanguageRead,
     JobOfferRead,
     JobOfferSearchResponse,
+    SearchFacetCount,
+    SearchFacets,
+    SearchSuggestion,
     JobPreferencesContractTypeRead,
     JobPreferencesRead,
     JobPreferencesSectorLinkRead,
     LanguageRead,
+    MatchingBatchRequest,
+    MatchingBatchResponse,
+    MatchingExplanation,
+    MatchingPairScore,
     MatchingScoreRequest,
     MatchingScoreResponse,
     RecruiterRead,
@@ -83,10 +90,17 @@ __all__ = [
     "JobOfferLanguageRead",
     "JobOfferRead",
     "JobOfferSearchResponse",
+    "SearchFacetCount",
+    "SearchFacets",
+    "SearchSuggestion",
     "JobPreferencesContractTypeRead",
     "JobPreferencesRead",
     "JobPreferencesSectorLinkRead",
     "LanguageRead",
+    "MatchingBatchRequest",
+    "MatchingBatchResponse",
+    "MatchingExplanation",
+    "MatchingPairScore",
     "MatchingScoreRequest",
     "MatchingScoreResponse",
     "RecruiterRead",
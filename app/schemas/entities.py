@@ -115,9 +115,34 @@ class MatchingScoreRequest(BaseModel):
     offer_id: UUID
 
 
+class MatchingExplanation(BaseModel):
+    components: dict[str, float] = Field(default_factory=dict)
+    weights: dict[str, float] = Field(default_factory=dict)
+
+
 class MatchingScoreResponse(BaseModel):
     score: float
     matched_skills: list[str] = Field(default_factory=list)
+    explanation: MatchingExplanation | None = None
+
+
+class MatchingBatchRequest(BaseModel):
+    candidate_ids: list[UUID] = Field(min_length=1, max_length=200)
+    offer_ids: list[UUID] = Field(min_length=1, max_length=200)
+
+
+class MatchingPairScore(BaseModel):
+    candidate_id: UUID
+    offer_id: UUID
+    score: float
+    matched_skills: list[str] = Field(default_factory=list)
+    explanation: MatchingExplanation | None = None
+
+
+class MatchingBatchResponse(BaseModel):
+    results: list[MatchingPairScore] = Field(default_factory=list)
+    missing_candidate_ids: list[UUID] = Field(default_factory=list)
+    missing_offer_ids: list[UUID] = Field(default_factory=list)
 
 
 class CandidateMatch(BaseModel):
@@ -126,6 +151,7 @@ class CandidateMatch(BaseModel):
     score: float
     location: str | None = None
     skills: list[str] = Field(default_factory=list)
+    explanation: MatchingExplanation | None = None
 
 
 class SourcingSearchResponse(BaseModel):
@@ -136,12 +162,30 @@ class JobOfferMatch(BaseModel):
     offer: JobOfferDto
     score: float
     matched_skills: list[str] = Field(default_factory=list)
+    explanation: MatchingExplanation | None = None
 
 
 class CandidateRecommendationsResponse(BaseModel):
     offers: list[JobOfferMatch] = Field(default_factory=list)
 
 
+class SearchFacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class SearchFacets(BaseModel):
+    contract_type: list[SearchFacetCount] = Field(default_factory=list)
+    country: list[SearchFacetCount] = Field(default_factory=list)
+    city: list[SearchFacetCount] = Field(default_factory=list)
+    language: list[SearchFacetCount] = Field(default_factory=list)
+
+
+class SearchSuggestion(BaseModel):
+    value: str
+    type: str
+
+
 class JobOfferSearchResponse(BaseModel):
     content: list[JobOfferDto] = Field(default_factory=list)
     page: int
@@ -150,6 +194,9 @@ class JobOfferSearchResponse(BaseModel):
     total_pages: int
     first: bool
     last: bool
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
+    facets: SearchFacets | None = None
 class CandidateSearchResponse(BaseModel):
     content: list[CandidateDto] = Field(default_factory=list)
     page: int
@@ -158,6 +205,8 @@ class CandidateSearchResponse(BaseModel):
     total_pages: int
     first: bool
     last: bool
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
 class EducationRead(BaseModel):
     id: UUID
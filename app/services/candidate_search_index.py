@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import re
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.db.session import run_in_session
+from app.repositories.candidate_repository import CandidateRepository
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.utils.background import BackgroundRefresher
+from app.utils.boolean_query import And, Node, Not, Term, parse_query, term_pattern
+from app.utils.pagination import Page, decode_cursor, encode_cursor
+from app.utils.search_filters import SEARCH_TRGM_ENABLED, language_names
+
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_BATCH_SIZE = 1000
+
+# Term lookups memoized per snapshot before the memo is reset.
+_MAX_MEMO_ENTRIES = 10_000
+
+# Field of the unqualified terms, matched against every searched column.
+ANY = "any"
+
+
+@dataclass(frozen=True)
+class IndexedCandidate:
+    """Lower-cased searchable values of one candidate, per boolean search field."""
+
+    id: UUID
+    created_at: datetime | None
+    values: dict[str, tuple[str, ...]]
+    # Fields whose SQL clause is NULL rather than false when nothing matches.
+    nullable: frozenset[str]
+
+
+def _text(value) -> str | None:
+    """Value as ``CAST(... AS VARCHAR)`` renders it, lower-cased for ILIKE."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).lower()
+
+
+def index_candidate(candidate) -> IndexedCandidate:
+    """Extract the columns ``CandidateRepository._term_clause`` searches."""
+    direct = [
+        candidate.first_name,
+        candidate.last_name,
+        candidate.professional_title,
+        candidate.presentation,
+        candidate.pitch_mail,
+        candidate.city,
+        candidate.country,
+        candidate.phone_number,
+        candidate.portfolio_url,
+        candidate.linked_in_url,
+    ]
+    related: list = []
+    for experience in candidate.experiences or []:
+        related.extend(
+            (experience.position, experience.company_name, experience.description, experience.is_current)
+        )
+    for education in candidate.educations or []:
+        related.extend((education.institution, education.degree, education.city))
+    for language in candidate.languages or []:
+        related.extend((language.language, language.level))
+    for skill in candidate.skills or []:
+        related.extend((skill.name, skill.level))
+    preferences = candidate.job_preferences
+    if preferences is not None:
+        related.extend(
+            (
+                preferences.desired_position,
+                preferences.city,
+                preferences.country,
+                preferences.availability,
+                preferences.pretentions_salarial,
+            )
+        )
+        related.extend(link.sector.name for link in preferences.sectors or [] if link.sector)
+        related.extend(link.contract_type for link in preferences.contract_types or [])
+
+    fields = {
+        ANY: direct + related,
+        "title": [candidate.professional_title],
+        "skill": [skill.name for skill in candidate.skills or []],
+        "city": [candidate.city],
+        "country": [candidate.country],
+        "lang": [language.language for language in candidate.languages or []],
+        "company": [experience.company_name for experience in candidate.experiences or []],
+        "school": [education.institution for education in candidate.educations or []],
+    }
+    # Columns compared outside an EXISTS make the term unknown when NULL.
+    nullable = {
+        ANY: any(value is None for value in direct),
+        "title": candidate.professional_title is None,
+        "city": candidate.city is None,
+        "country": candidate.country is None,
+    }
+    return IndexedCandidate(
+        id=candidate.id,
+        created_at=candidate.created_at,
+        values={
+            field: tuple(dict.fromkeys(text for text in map(_text, values) if text is not None))
+            for field, values in fields.items()
+        },
+        nullable=frozenset(field for field, is_nullable in nullable.items() if is_nullable),
+    )
+
+
+def _order_key(created_at: datetime | None, candidate_id: UUID) -> tuple:
+    """Creation date descending (missing dates last), then id: the database order."""
+    age = datetime.max - created_at if created_at is not None else timedelta(0)
+    return (created_at is None, age, candidate_id)
+
+
+def _rows(bits: int) -> Iterator[int]:
+    """Set bits of a bitset, lowest (best ranked) first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def _bitset(rows: Iterable[int]) -> int:
+    """Bitset of ``rows``, built in one pass rather than by repeated big-int ORs."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    buffer = bytearray(max(rows) // 8 + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _like_regex(pattern: str) -> re.Pattern:
+    """Regular expression equivalent to a LIKE pattern (``%``, ``_`` and ``\\`` escapes)."""
+    parts: list[str] = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+class _FieldIndex:
+    """Postings of one field: by whole value and by whitespace-separated token.
+
+    Postings are row lists, turned into a bitset only when a query reads
+    them: most values belong to a handful of candidates, and a bitset per
+    value would cost memory and build time quadratic in the candidate count.
+    The values are also kept sorted, forwards and reversed, so the
+    wildcards of ``dev*`` and ``*ops`` resolve to a range of exact values
+    found by bisection instead of a scan.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, Iterable[str]]]):
+        self.values: dict[str, list[int]] = {}
+        self.tokens: dict[str, list[int]] = {}
+        for row, values in rows:
+            tokens = set()
+            for value in values:
+                self.values.setdefault(value, []).append(row)
+                tokens.update(value.split())
+            for token in tokens:
+                self.tokens.setdefault(token, []).append(row)
+        self.sorted_values = sorted(self.values)
+        self.reversed_values = sorted(value[::-1] for value in self.values)
+
+    def matching(self, pattern: str, limit: int | None = None) -> int:
+        """Rows with a value matching the LIKE ``pattern``.
+
+        Raise ValueError when the pattern expands to more than ``limit``
+        values (or tokens).
+        """
+        postings, keys = self._expand(pattern)
+        if limit is not None and len(keys) > limit:
+            raise ValueError(
+                f"Le motif {pattern.replace('%', '*')} correspond à plus de {limit} termes ; précisez-le."
+            )
+        return _bitset(row for key in keys for row in postings[key])
+
+    def _expand(self, pattern: str) -> tuple[dict[str, list[int]], list[str]]:
+        """Postings and keys matching ``pattern``."""
+        wildcards = [index for index, char in enumerate(pattern) if char in "%_"]
+        if "\\" in pattern or not wildcards:
+            return self.values, self._scan(self.values, _like_regex(pattern).fullmatch)
+
+        head = pattern[:wildcards[0]]
+        tail = pattern[wildcards[-1] + 1:]
+        if head or tail:
+            return self.values, self._anchored(pattern, head, tail)
+
+        inner = pattern[1:-1]
+        if wildcards == [0, len(pattern) - 1] and inner:
+            # "%word%" is contained in a value exactly when it is contained
+            # in one of its tokens, and there are far fewer tokens than values.
+            postings = self.values if any(char.isspace() for char in inner) else self.tokens
+            return postings, self._scan(postings, lambda key: inner in key)
+        return self.values, self._scan(self.values, _like_regex(pattern).fullmatch)
+
+    def _anchored(self, pattern: str, head: str, tail: str) -> list[str]:
+        """Values starting with ``head`` and ending with ``tail`` that match ``pattern``.
+
+        Only the smaller of the two ranges (sorted values by head, reversed
+        values by tail) is read.
+        """
+        head_range = tail_range = None
+        if head:
+            head_range = self._prefixed(self.sorted_values, head)
+        if tail:
+            tail_range = self._prefixed(self.reversed_values, tail[::-1])
+
+        if tail_range is None or (
+            head_range is not None and len(head_range) <= len(tail_range)
+        ):
+            keys = [self.sorted_values[index] for index in head_range]
+            exact = pattern == head + "%"
+        else:
+            keys = [self.reversed_values[index][::-1] for index in tail_range]
+            exact = pattern == "%" + tail
+        if exact:
+            return keys
+        regex = _like_regex(pattern)
+        return [key for key in keys if regex.fullmatch(key)]
+
+    @staticmethod
+    def _prefixed(keys: list[str], prefix: str) -> range:
+        """Positions of the sorted ``keys`` starting with ``prefix``."""
+        start = bisect.bisect_left(keys, prefix)
+        return range(start, bisect.bisect_left(keys, prefix + "\U0010ffff", start))
+
+    @staticmethod
+    def _scan(postings: dict[str, list[int]], predicate) -> list[str]:
+        """Keys of ``postings`` satisfying ``predicate``, read one by one."""
+        return [key for key in postings if predicate(key)]
+
+
+class _Snapshot:
+    """Immutable bitset index over every candidate, in the database order."""
+
+    def __init__(self, candidates: Iterable[IndexedCandidate], max_wildcard_terms: int | None = None):
+        self.max_wildcard_terms = max_wildcard_terms
+        self.candidates = sorted(
+            candidates, key=lambda candidate: _order_key(candidate.created_at, candidate.id)
+        )
+        self.keys = [_order_key(candidate.created_at, candidate.id) for candidate in self.candidates]
+        self.all = (1 << len(self.candidates)) - 1
+        rows = list(enumerate(self.candidates))
+        fields = {field for candidate in self.candidates for field in candidate.values}
+        self.fields = {
+            field: _FieldIndex((row, candidate.values.get(field, ())) for row, candidate in rows)
+            for field in fields
+        }
+        self.nullable = {
+            field: _bitset(row for row, candidate in rows if field in candidate.nullable)
+            for field in fields
+        }
+        self._memo: dict[Term, int] = {}
+
+    def term(self, term: Term) -> int:
+        """Rows for which the SQL clause of ``term`` is true."""
+        bits = self._memo.get(term)
+        if bits is None:
+            index = self.fields.get(term.field or ANY)
+            if index is None:
+                bits = 0
+            elif term.field == "lang" and "*" not in term.text:
+                names = language_names(term.text)
+                bits = _bitset(
+                    row
+                    for value, rows in index.values.items()
+                    if value.strip() in names
+                    for row in rows
+                )
+            else:
+                limit = self.max_wildcard_terms if "*" in term.text else None
+                bits = index.matching(term_pattern(term.text), limit)
+            if len(self._memo) >= _MAX_MEMO_ENTRIES:
+                self._memo.clear()
+            self._memo[term] = bits
+        return bits
+
+    def evaluate(self, node: Node) -> tuple[int, int]:
+        """``(true, unknown)`` rows of ``node`` under SQL three-valued logic.
+
+        A term over a NULL column is unknown rather than false, and ``NOT``
+        keeps it unknown, so "-stage" skips those rows exactly as Postgres does.
+        """
+        if isinstance(node, Term):
+            true = self.term(node)
+            return true, self.nullable.get(node.field or ANY, 0) & ~true
+        if isinstance(node, Not):
+            true, unknown = self.evaluate(node.operand)
+            return self.all & ~true & ~unknown, unknown
+
+        results = [self.evaluate(operand) for operand in node.operands]
+        if isinstance(node, And):
+            true, false = self.all, 0
+            for operand_true, operand_unknown in results:
+                true &= operand_true
+                false |= self.all & ~operand_true & ~operand_unknown
+        else:
+            true, false = 0, self.all
+            for operand_true, operand_unknown in results:
+                true |= operand_true
+                false &= self.all & ~operand_true & ~operand_unknown
+        return true, self.all & ~true & ~false
+
+    def page(self, bits: int, page: int, size: int, cursor: str | None) -> tuple[list[UUID], Page]:
+        """Ids of one (1-based) page of matches, sliced like ``paginate`` does on the database."""
+        total = bits.bit_count()
+        if cursor is None:
+            seen = (page - 1) * size
+            remaining = bits
+            skip = seen
+        elif not cursor:
+            seen = 0
+            page = 1
+            remaining = bits
+            skip = 0
+        else:
+            seen, values = decode_cursor(cursor, 2)
+            page = 1 + seen // size
+            position = bisect.bisect_right(self.keys, _order_key(*values))
+            remaining = bits & ~((1 << position) - 1)
+            skip = 0
+
+        rows: list[int] = []
+        for row in _rows(remaining):
+            if skip:
+                skip -= 1
+                continue
+            rows.append(row)
+            if len(rows) > size:
+                break
+        has_more = len(rows) > size
+        rows = rows[:size]
+
+        next_cursor = None
+        if has_more and rows:
+            last = self.candidates[rows[-1]]
+            next_cursor = encode_cursor(seen + len(rows), [last.created_at, last.id])
+        return (
+            [self.candidates[row].id for row in rows],
+            Page(total=total, page=page, next_cursor=next_cursor),
+        )
+
+
+class CandidateSearchIndex:
+    """In-process boolean search over every candidate.
+
+    Each term is resolved against bitset postings of the lower-cased values
+    and tokens of the columns ``CandidateRepository._term_clause`` searches,
+    and the optimized query tree is evaluated with bitset intersection,
+    union and difference, with the order and cursors of the database path.
+    Only the requested page is loaded from the database. Wildcard terms
+    expand to at most ``max_wildcard_terms`` exact values, beyond which the
+    search is rejected as too broad. In pg_trgm mode qualified terms are
+    accent-insensitive, so the database answers instead.
+
+    Matches reflect the last refresh, not the live tables: like the offer
+    search index, a background thread polls ``updated_at`` and the
+    ``entity_changes`` log (educations, sector and contract-type links...)
+    at most once per interval, reloads the changed candidates and swaps the
+    new snapshot in; the database answers until the first one is ready. A
+    change can thus take up to ``refresh_interval_seconds``, plus the
+    ``candidates:boolean_search`` cache lifetime, to show in results.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        refresh_interval_seconds: int = 30,
+        full_rebuild_seconds: int = 3600,
+        max_wildcard_terms: int = 5000,
+    ):
+        self.enabled = enabled
+        self.max_wildcard_terms = max_wildcard_terms
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self._candidates: dict[UUID, IndexedCandidate] = {}
+        self._snapshot: _Snapshot | None = None
+        self._watermark: datetime | None = None
+        self._built_at = 0.0
+        self._refresher = BackgroundRefresher(
+            "candidate-search-index",
+            refresh_interval_seconds,
+            lambda: run_in_session(self.update),
+        )
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        page: int = 1,
+        size: int = 10,
+        cursor: str | None = None,
+    ) -> Page | None:
+        """Return one page of candidates, or None when the database must answer."""
+        if not self.enabled or SEARCH_TRGM_ENABLED:
+            return None
+        node = parse_query(query)
+        if node is None:
+            return Page(page=page)
+        self.refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        bits, _ = snapshot.evaluate(node)
+        ids, result = snapshot.page(bits, page, size, cursor)
+        return replace(result, items=CandidateRepository(db).list_by_ids(ids))
+
+    def refresh(self, force: bool = False) -> None:
+        """Start a background refresh when the interval elapsed and none is running."""
+        self._refresher.trigger(force)
+
+    def update(self, db: Session) -> None:
+        """Bring the index up to date with the database, then swap the new snapshot in."""
+        now = time.monotonic()
+        watermark = ChangeLogRepository(db).watermark()
+        repo = CandidateRepository(db)
+        if self._snapshot is None or now - self._built_at >= self.full_rebuild_seconds:
+            candidates = {
+                candidate.id: index_candidate(candidate)
+                for candidate in repo.list_for_search_index()
+            }
+            self._built_at = now
+            changed = candidates != self._candidates
+        else:
+            candidates = dict(self._candidates)
+            current = set(repo.list_ids())
+            removed = set(candidates) - current
+            for candidate_id in removed:
+                candidates.pop(candidate_id, None)
+            updated = set(repo.list_ids_updated_since(self._watermark))
+            stale = list((current - set(candidates)) | (updated & current))
+            changed = bool(removed)
+            for start in range(0, len(stale), _REFRESH_BATCH_SIZE):
+                for candidate in repo.list_for_search_index(stale[start:start + _REFRESH_BATCH_SIZE]):
+                    indexed = index_candidate(candidate)
+                    changed |= candidates.get(candidate.id) != indexed
+                    candidates[candidate.id] = indexed
+
+        if changed or self._snapshot is None:
+            snapshot = _Snapshot(candidates.values(), self.max_wildcard_terms)
+            self._candidates = candidates
+            self._snapshot = snapshot
+            logger.info("Candidate search index holds %d candidates", len(candidates))
+        self._watermark = watermark
+
+
+CANDIDATE_SEARCH_INDEX = CandidateSearchIndex(
+    enabled=os.getenv("CANDIDATE_SEARCH_INDEX_ENABLED", "true").lower() in ("1", "true", "yes"),
+    refresh_interval_seconds=int(os.getenv("CANDIDATE_SEARCH_INDEX_REFRESH_SECONDS", "30")),
+    full_rebuild_seconds=int(os.getenv("CANDIDATE_SEARCH_INDEX_FULL_REBUILD_SECONDS", "3600")),
+    max_wildcard_terms=int(os.getenv("CANDIDATE_SEARCH_WILDCARD_MAX_TERMS", "5000")),
+)
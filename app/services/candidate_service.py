@@ -6,14 +6,17 @@ from uuid import UUID
 from app.schemas.entities import CandidateSearchResponse
 from sqlalchemy.orm import Session
 
+from app.db.session import run_in_session
 from app.models.enums import SearchTarget, SearchType
 from app.repositories.candidate_repository import CandidateRepository
 from app.repositories.recruiter_repository import RecruiterRepository
 from app.repositories.search_repository import SearchRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas import CandidateDto, SearchCreate
+from app.services.candidate_search_index import CANDIDATE_SEARCH_INDEX
 from app.services.dto_mappers import candidate_to_dto
 from app.utils.cache import APP_CACHE, make_cache_key
+from app.utils.pagination import Page
 
 
 class CandidateService:
@@ -21,6 +24,7 @@ class CandidateService:
 
     def __init__(self, db: Session):
         """Wire repositories used by the service."""
+        self.db = db
         self.repo = CandidateRepository(db)
         self.user_repo = UserRepository(db)
         self.recruiter_repo = RecruiterRepository(db)
@@ -28,37 +32,40 @@ class CandidateService:
 
     def list_candidates(self) -> list[CandidateDto]:
         """Return all candidates mapped to read schemas."""
-        cache_key = make_cache_key("candidates:list")
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-        candidates = [candidate_to_dto(candidate) for candidate in self.repo.list()]
-        APP_CACHE.set(cache_key, candidates)
-        return candidates
+        return APP_CACHE.get_or_compute(
+            make_cache_key("candidates:list"),
+            lambda: self._load_candidates(self.db),
+            refresh=lambda: run_in_session(self._load_candidates),
+        )
+
+    @staticmethod
+    def _load_candidates(db: Session) -> list[CandidateDto]:
+        return [candidate_to_dto(candidate) for candidate in CandidateRepository(db).list()]
 
     def get_candidate(self, candidate_id: UUID) -> CandidateDto | None:
         """Retrieve a single candidate by identifier."""
-        cache_key = make_cache_key("candidates:get", candidate_id)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-        candidate = self.repo.get(candidate_id)
-        candidate_dto = candidate_to_dto(candidate) if candidate else None
-        APP_CACHE.set(cache_key, candidate_dto)
-        return candidate_dto
+        def _load() -> CandidateDto | None:
+            candidate = self.repo.get(candidate_id)
+            return candidate_to_dto(candidate) if candidate else None
+
+        return APP_CACHE.get_or_compute(make_cache_key("candidates:get", candidate_id), _load)
     
     def get_candidate_by_user(self, user_id: UUID) -> CandidateDto | None:
         """Return the candidate entity associated with a given user."""
-        cache_key = make_cache_key("candidates:get_by_user", user_id)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-        candidate = self.repo.get_by_user_id(user_id)
-        candidate_dto = candidate_to_dto(candidate) if candidate else None
-        APP_CACHE.set(cache_key, candidate_dto)
-        return candidate_dto
-
-    def search_by_boolean_query(self, query: str, user_id: UUID, page: int, size: int) -> CandidateSearchResponse:
+        def _load() -> CandidateDto | None:
+            candidate = self.repo.get_by_user_id(user_id)
+            return candidate_to_dto(candidate) if candidate else None
+
+        return APP_CACHE.get_or_compute(make_cache_key("candidates:get_by_user", user_id), _load)
+
+    def search_by_boolean_query(
+        self,
+        query: str,
+        user_id: UUID,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+    ) -> CandidateSearchResponse:
         """Execute a boolean search across candidate profiles."""
         user = self.user_repo.get(user_id)
         if user is None:
@@ -76,16 +83,27 @@ class CandidateService:
             type=SearchType.BOOL,
             target=SearchTarget.CANDIDAT,
         )
-        cache_key = make_cache_key("candidates:boolean_search", user_id, query=query, page=page, size=size)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-
-        total_elements, candidates_models = self.repo.search_by_boolean_query(query, page, size)
-        
-        return self._build_paginated_response(candidates_models, page, size, total_elements, cache_key, user_id, query, "BOOL")
+        def _search() -> CandidateSearchResponse:
+            result = CANDIDATE_SEARCH_INDEX.search(self.db, query, page, size, cursor)
+            if result is None:
+                result = self.repo.search_by_boolean_query(query, page, size, cursor)
+            return self._build_paginated_response(result, size, cursor, user_id, query, "BOOL")
+
+        return APP_CACHE.get_or_compute(
+            make_cache_key(
+                "candidates:boolean_search", user_id, query=query, page=page, size=size, cursor=cursor
+            ),
+            _search,
+        )
 
-    def search_by_normal_query(self, query: str, user_id: UUID, page: int, size: int) -> CandidateSearchResponse:
+    def search_by_normal_query(
+        self,
+        query: str,
+        user_id: UUID,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+    ) -> CandidateSearchResponse:
         """Execute a standard keyword search across candidate profiles."""
         user = self.user_repo.get(user_id)
         if user is None:
@@ -105,34 +123,37 @@ class CandidateService:
             target=SearchTarget.CANDIDAT,
         )
         
-        cache_key = make_cache_key("candidates:normal_search", user_id, query=query, page=page, size=size)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-
-        total_elements, candidates_models = self.repo.search_candidates_by_keywords(query, page, size)
-        
-        return self._build_paginated_response(candidates_models, page, size, total_elements, cache_key, user_id, query, SearchType.NOT)
+        def _search() -> CandidateSearchResponse:
+            result = self.repo.search_candidates_by_keywords(query, page, size, cursor)
+            return self._build_paginated_response(result, size, cursor, user_id, query, SearchType.NOT)
+
+        return APP_CACHE.get_or_compute(
+            make_cache_key(
+                "candidates:normal_search", user_id, query=query, page=page, size=size, cursor=cursor
+            ),
+            _search,
+        )
     
-    def _build_paginated_response(self, candidates_models, page, size, total_elements, cache_key, user_id, query, search_type) -> CandidateSearchResponse:
+    def _build_paginated_response(self, result: Page, size, cursor, user_id, query, search_type) -> CandidateSearchResponse:
     
-        candidates_dto = [candidate_to_dto(c) for c in candidates_models]
-        total_pages = math.ceil(total_elements / size) if size > 0 else 0
+        candidates_dto = [candidate_to_dto(c) for c in result.items]
+        total_pages = math.ceil(result.total / size) if size > 0 else 0
         
         response = CandidateSearchResponse(
             content=candidates_dto,
-            page=page,
+            page=result.page,
             size=size,
-            total_elements=total_elements,
+            total_elements=result.total,
             total_pages=total_pages,
-            first=(page == 1),
-            last=(page >= total_pages or total_pages == 0)
+            first=(result.page == 1),
+            last=result.next_cursor is None,
+            next_cursor=result.next_cursor,
+            total_is_estimate=result.total_is_estimate,
         )
         
         # Enregistrer la recherche uniquement sur la première page (pour les stats)
-        if page == 1:
+        if result.page == 1 and not cursor:
             payload = SearchCreate(user_id=user_id, query=query, type=search_type, target=SearchTarget.CANDIDAT)
             self.search_repo.record_search(user_id, payload)
-            
-        APP_CACHE.set(cache_key, response)
+
         return response
\ No newline at end of file
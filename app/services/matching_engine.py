@@ -0,0 +1,722 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.matching_features import (
+    CandidateFeatures,
+    MatchingFeatureStore,
+    OfferFeatures,
+)
+from app.services.matching_similarity import (
+    RATIO_WEIGHT,
+    TITLE_BACKEND,
+    TOKEN_WEIGHT,
+    TitleSimilarityBackend,
+)
+
+
+COMPONENTS = (
+    "coverage",
+    "title_similarity",
+    "geo_fit",
+    "seniority",
+    "language",
+    "salary",
+    "profile_focus",
+)
+
+# Rows whose exact title similarity is computed together before the heap is
+# checked for early termination again.
+_SCORING_BLOCK = 64
+
+
+class _Vocabulary:
+    """Map normalized strings to dense integer codes."""
+
+    MISSING = -1  # value is None / empty
+    UNKNOWN = -2  # value present but never seen while building
+
+    def __init__(self):
+        self._codes: dict[str, int] = {}
+
+    def add(self, value: str | None) -> int:
+        if not value:
+            return self.MISSING
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._codes)
+            self._codes[value] = code
+        return code
+
+    def code(self, value: str | None) -> int:
+        if not value:
+            return self.MISSING
+        return self._codes.get(value, self.UNKNOWN)
+
+    def codes(self, values: Iterable[str]) -> np.ndarray:
+        known = [self._codes[value] for value in values if value in self._codes]
+        return np.asarray(known, dtype=np.int64)
+
+
+class _Incidence:
+    """Row/column (COO) incidence matrix of rows against vocabulary codes."""
+
+    def __init__(self, sets: list[Iterable[str]], vocabulary: _Vocabulary):
+        rows: list[int] = []
+        cols: list[int] = []
+        counts = np.zeros(len(sets), dtype=np.int64)
+        for row, values in enumerate(sets):
+            for value in values:
+                rows.append(row)
+                cols.append(vocabulary.add(value))
+            counts[row] = len(values)
+        self.size = len(sets)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.counts = counts
+
+    def hits(self, codes: np.ndarray) -> np.ndarray:
+        """Count, per row, how many of its columns belong to ``codes``."""
+        if codes.size == 0 or self.cols.size == 0:
+            return np.zeros(self.size, dtype=np.int64)
+        mask = np.isin(self.cols, codes)
+        return np.bincount(self.rows[mask], minlength=self.size)
+
+
+def _salary_array(values: Iterable[float | None]) -> np.ndarray:
+    return np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _ratio(numerator: np.ndarray, denominator, valid) -> np.ndarray:
+    """Element-wise ``numerator / denominator`` where valid, else 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, numerator / denominator, 0.0)
+
+
+def _seniority_fit(candidate_level, offer_level) -> np.ndarray:
+    """Seniority fit: 1.0 for equal levels, 0.3 for different ones, 0.5 when one is missing, 0.4 when both are."""
+    candidate_set = candidate_level != _Vocabulary.MISSING
+    offer_set = offer_level != _Vocabulary.MISSING
+    both = candidate_set & offer_set
+    return np.where(
+        both,
+        np.where(candidate_level == offer_level, 1.0, 0.3),
+        np.where(candidate_set | offer_set, 0.5, 0.4),
+    )
+
+
+def _salary_fit(expectation, offer_min, offer_max) -> np.ndarray:
+    """Salary fit: 1.0 inside the offer range, decreasing with the relative gap outside it.
+
+    ``NaN`` stands for a missing value, and a ``0`` bound is treated like a
+    missing one, as the historical scalar scoring did.
+    """
+    expectation, offer_min, offer_max = np.broadcast_arrays(
+        np.asarray(expectation, dtype=np.float64),
+        np.asarray(offer_min, dtype=np.float64),
+        np.asarray(offer_max, dtype=np.float64),
+    )
+    neutral = np.isnan(expectation) | (np.isnan(offer_min) & np.isnan(offer_max))
+    min_truthy = ~np.isnan(offer_min) & (offer_min != 0)
+    max_truthy = ~np.isnan(offer_max) & (offer_max != 0)
+    min_salary = np.where(min_truthy, offer_min, np.where(max_truthy, offer_max, expectation))
+    max_salary = np.where(max_truthy, offer_max, min_salary)
+
+    with np.errstate(invalid="ignore"):
+        in_range = (min_salary <= expectation) & (expectation <= max_salary)
+        below = expectation < min_salary
+        diff_ratio = np.where(
+            below,
+            (min_salary - expectation) / np.maximum(min_salary, 1),
+            (expectation - max_salary) / np.maximum(max_salary, 1),
+        )
+    fit = np.where(in_range, 1.0, np.maximum(0.0, 1.0 - diff_ratio))
+    return np.where(neutral, 0.5, fit)
+
+
+def weighted_sum(components: np.ndarray, weights: Mapping[str, float]) -> np.ndarray:
+    """Return ``components @ weights`` for a ``(n, len(COMPONENTS))`` matrix.
+
+    The product is accumulated column by column in ``COMPONENTS`` order so
+    every scoring path (batch, top-k, re-ranked components) gets bit-identical
+    scores (a BLAS ``gemv`` may reorder additions and drift by one ulp).
+    """
+    scores = np.zeros(components.shape[0], dtype=np.float64)
+    for column, name in enumerate(COMPONENTS):
+        scores = scores + components[:, column] * weights[name]
+    return scores
+
+
+class _Postings:
+    """Inverted index from vocabulary code to the rows carrying it."""
+
+    def __init__(self, rows: np.ndarray, cols: np.ndarray):
+        keep = cols >= 0
+        rows, cols = rows[keep], cols[keep]
+        order = np.argsort(cols, kind="stable")
+        self._rows = rows[order]
+        self._codes, self._starts = np.unique(cols[order], return_index=True)
+        self._ends = np.append(self._starts[1:], len(self._rows))
+
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        """Return the sorted, unique rows carrying any of ``codes``."""
+        codes = codes[codes >= 0]
+        if codes.size == 0 or self._codes.size == 0:
+            return np.empty(0, dtype=np.int64)
+        positions = np.searchsorted(self._codes, codes)
+        positions = positions[positions < self._codes.size]
+        positions = positions[np.isin(self._codes[positions], codes)]
+        return np.unique(
+            np.concatenate(
+                [self._rows[self._starts[p]:self._ends[p]] for p in positions]
+                or [np.empty(0, dtype=np.int64)]
+            )
+        )
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    """Scores of one entity against every row of the opposite side."""
+
+    scores: np.ndarray
+    components: np.ndarray
+
+
+@dataclass(frozen=True)
+class RankedRows:
+    """Top rows of the opposite side, best first."""
+
+    rows: np.ndarray
+    scores: np.ndarray
+    components: np.ndarray
+
+
+class BatchScoringEngine:
+    """Columnar view of the feature store scoring one entity against all others."""
+
+    def __init__(
+        self,
+        candidates: list[CandidateFeatures],
+        offers: list[OfferFeatures],
+        backend: TitleSimilarityBackend | None = None,
+    ):
+        self.candidates = candidates
+        self.offers = offers
+        self.backend = backend or TITLE_BACKEND
+        self.candidate_rows = {candidate.id: row for row, candidate in enumerate(candidates)}
+        self.offer_rows = {offer.id: row for row, offer in enumerate(offers)}
+
+        self._skills = _Vocabulary()
+        self._languages = _Vocabulary()
+        self._places = _Vocabulary()
+        self._levels = _Vocabulary()
+        self._title_tokens = _Vocabulary()
+
+        self._candidate_skills = _Incidence([c.skills for c in candidates], self._skills)
+        self._candidate_languages = _Incidence([c.languages for c in candidates], self._languages)
+        self._candidate_city = np.asarray([self._places.add(c.city) for c in candidates], dtype=np.int64)
+        self._candidate_country = np.asarray(
+            [self._places.add(c.country) for c in candidates], dtype=np.int64
+        )
+        self._candidate_level = np.asarray(
+            [self._levels.add(c.experience_level) for c in candidates], dtype=np.int64
+        )
+        self._candidate_salary = _salary_array(c.salary_expectation for c in candidates)
+        self._candidate_titles = [c.title_text for c in candidates]
+        self._candidate_has_title = np.asarray([bool(c.title_text) for c in candidates], dtype=bool)
+        self._candidate_title_tokens = _Incidence([c.title_tokens for c in candidates], self._title_tokens)
+
+        self._offer_skills = _Incidence([o.skills for o in offers], self._skills)
+        self._offer_languages = _Incidence([o.languages for o in offers], self._languages)
+        self._offer_cities = _Incidence([o.cities for o in offers], self._places)
+        self._offer_country = np.asarray([self._places.add(o.country) for o in offers], dtype=np.int64)
+        self._offer_level = np.asarray([self._levels.add(o.seniority) for o in offers], dtype=np.int64)
+        self._offer_salary_min = _salary_array(o.salary_min for o in offers)
+        self._offer_salary_max = _salary_array(o.salary_max for o in offers)
+        self._offer_titles = [o.title or "" for o in offers]
+        self._offer_has_title = np.asarray([bool(o.title) for o in offers], dtype=bool)
+        self._offer_title_tokens = _Incidence([o.title_tokens for o in offers], self._title_tokens)
+
+        # Inverted indexes (skill / place -> rows) used to prune before scoring.
+        candidate_range = np.arange(len(candidates), dtype=np.int64)
+        offer_range = np.arange(len(offers), dtype=np.int64)
+        self._candidates_by_skill = _Postings(self._candidate_skills.rows, self._candidate_skills.cols)
+        self._candidates_by_city = _Postings(candidate_range, self._candidate_city)
+        self._candidates_by_country = _Postings(candidate_range, self._candidate_country)
+        self._offers_by_skill = _Postings(self._offer_skills.rows, self._offer_skills.cols)
+        self._offers_by_city = _Postings(self._offer_cities.rows, self._offer_cities.cols)
+        self._offers_by_country = _Postings(offer_range, self._offer_country)
+
+    # ------------------------------------------------------------------
+    # One offer against every candidate
+    # ------------------------------------------------------------------
+    def score_offer(self, offer: OfferFeatures, weights: Mapping[str, float]) -> BatchScores:
+        """Score ``offer`` against every candidate in one pass."""
+        rows = np.arange(len(self.candidates), dtype=np.int64)
+        components, _ = self._offer_components(offer, rows)
+        return BatchScores(scores=weighted_sum(components, weights), components=components)
+
+    def rank_offer(
+        self,
+        offer: OfferFeatures,
+        weights: Mapping[str, float],
+        limit: int,
+        shard: tuple[int, int] | None = None,
+    ) -> RankedRows:
+        """Return the ``limit`` best candidate rows for ``offer``.
+
+        Only candidates sharing a skill, the city or the country of the offer
+        are scored up front; the others are fully scored only when their upper
+        bound could still reach the current ``limit``-th score. ``shard``
+        restricts the ranking to the candidate rows ``[start, stop)``.
+        """
+        start, stop = shard or (0, len(self.candidates))
+        place_codes = self._places.codes(offer.cities)
+        shortlist = np.union1d(
+            self._candidates_by_skill.lookup(self._skills.codes(offer.skills)),
+            np.union1d(
+                self._candidates_by_city.lookup(place_codes),
+                self._candidates_by_country.lookup(
+                    np.asarray([self._places.code(offer.country)], dtype=np.int64)
+                ),
+            ),
+        )
+        if shard is not None:
+            shortlist = shortlist[(shortlist >= start) & (shortlist < stop)]
+        remainder_bound = self._remainder_bound(
+            weights,
+            has_title=bool(offer.title),
+            has_level=offer.seniority is not None,
+            has_salary=offer.salary_min is not None or offer.salary_max is not None,
+        )
+        return self._prune_and_rank(
+            shortlist,
+            start,
+            stop,
+            lambda rows: self._offer_components(offer, rows, exact_title=False),
+            lambda rows, token_similarity: self._titles(
+                offer.title,
+                self._candidate_titles,
+                self._candidate_has_title,
+                rows,
+                token_similarity,
+                exact=True,
+            ),
+            self.backend.bounds_are_exact,
+            remainder_bound,
+            weights,
+            limit,
+        )
+
+    def _offer_components(
+        self,
+        offer: OfferFeatures,
+        rows: np.ndarray,
+        exact_title: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Component matrix of ``offer`` against the given candidate rows.
+
+        Also returns the title token similarity so the exact title can be
+        completed later. With ``exact_title=False`` the title column holds the
+        backend upper bound instead of the real similarity.
+        """
+        components = np.empty((rows.size, len(COMPONENTS)), dtype=np.float64)
+
+        offer_skill_count = len(offer.skills)
+        overlap = self._candidate_skills.hits(self._skills.codes(offer.skills))[rows]
+        union = offer_skill_count + self._candidate_skills.counts[rows] - overlap
+        components[:, 0] = _ratio(overlap, offer_skill_count, offer_skill_count > 0)
+        components[:, 6] = _ratio(overlap, union, union > 0)
+
+        token_similarity = self._token_similarity(
+            offer.title_tokens, self._candidate_title_tokens, rows
+        )
+        components[:, 1] = self._titles(
+            offer.title,
+            self._candidate_titles,
+            self._candidate_has_title,
+            rows,
+            token_similarity,
+            exact=exact_title,
+        )
+
+        candidate_city = self._candidate_city[rows]
+        candidate_country = self._candidate_country[rows]
+        city_hit = (candidate_city >= 0) & np.isin(candidate_city, self._places.codes(offer.cities))
+        offer_country = self._places.code(offer.country)
+        country_hit = (candidate_country >= 0) & (candidate_country == offer_country)
+        components[:, 2] = np.where(city_hit, 1.0, np.where(country_hit, 0.5, 0.0))
+
+        components[:, 3] = _seniority_fit(self._candidate_level[rows], self._levels.code(offer.seniority))
+
+        required = len(offer.languages)
+        if required:
+            matches = self._candidate_languages.hits(self._languages.codes(offer.languages))[rows]
+            components[:, 4] = np.where(
+                self._candidate_languages.counts[rows] > 0, matches / required, 0.0
+            )
+        else:
+            components[:, 4] = 1.0
+
+        components[:, 5] = _salary_fit(
+            self._candidate_salary[rows],
+            np.nan if offer.salary_min is None else offer.salary_min,
+            np.nan if offer.salary_max is None else offer.salary_max,
+        )
+        return components, token_similarity
+
+    # ------------------------------------------------------------------
+    # One candidate against every offer
+    # ------------------------------------------------------------------
+    def score_candidate(
+        self,
+        candidate: CandidateFeatures,
+        weights: Mapping[str, float],
+    ) -> BatchScores:
+        """Score ``candidate`` against every offer in one pass."""
+        rows = np.arange(len(self.offers), dtype=np.int64)
+        components, _ = self._candidate_components(candidate, rows)
+        return BatchScores(scores=weighted_sum(components, weights), components=components)
+
+    def rank_candidate(
+        self,
+        candidate: CandidateFeatures,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> RankedRows:
+        """Return the ``limit`` best offer rows for ``candidate`` (see ``rank_offer``)."""
+        shortlist = np.union1d(
+            self._offers_by_skill.lookup(self._skills.codes(candidate.skills)),
+            np.union1d(
+                self._offers_by_city.lookup(
+                    np.asarray([self._places.code(candidate.city)], dtype=np.int64)
+                ),
+                self._offers_by_country.lookup(
+                    np.asarray([self._places.code(candidate.country)], dtype=np.int64)
+                ),
+            ),
+        )
+        remainder_bound = self._remainder_bound(
+            weights,
+            has_title=bool(candidate.title_text),
+            has_level=candidate.experience_level is not None,
+            has_salary=candidate.salary_expectation is not None,
+        )
+        return self._prune_and_rank(
+            shortlist,
+            0,
+            len(self.offers),
+            lambda rows: self._candidate_components(candidate, rows, exact_title=False),
+            lambda rows, token_similarity: self._titles(
+                candidate.title_text,
+                self._offer_titles,
+                self._offer_has_title,
+                rows,
+                token_similarity,
+                exact=True,
+                query_is_choice=True,
+            ),
+            self.backend.bounds_are_exact,
+            remainder_bound,
+            weights,
+            limit,
+        )
+
+    def _candidate_components(
+        self,
+        candidate: CandidateFeatures,
+        rows: np.ndarray,
+        exact_title: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Component matrix of ``candidate`` against the given offer rows."""
+        components = np.empty((rows.size, len(COMPONENTS)), dtype=np.float64)
+
+        offer_counts = self._offer_skills.counts[rows]
+        overlap = self._offer_skills.hits(self._skills.codes(candidate.skills))[rows]
+        union = offer_counts + len(candidate.skills) - overlap
+        components[:, 0] = _ratio(overlap, offer_counts, offer_counts > 0)
+        components[:, 6] = _ratio(overlap, union, union > 0)
+
+        token_similarity = self._token_similarity(
+            candidate.title_tokens, self._offer_title_tokens, rows
+        )
+        components[:, 1] = self._titles(
+            candidate.title_text,
+            self._offer_titles,
+            self._offer_has_title,
+            rows,
+            token_similarity,
+            exact=exact_title,
+            query_is_choice=True,
+        )
+
+        city = self._places.code(candidate.city)
+        if city >= 0:
+            city_hit = (self._offer_cities.hits(np.asarray([city], dtype=np.int64)) > 0)[rows]
+        else:
+            city_hit = np.zeros(rows.size, dtype=bool)
+        country = self._places.code(candidate.country)
+        offer_country = self._offer_country[rows]
+        country_hit = (country >= 0) & (offer_country >= 0) & (offer_country == country)
+        components[:, 2] = np.where(city_hit, 1.0, np.where(country_hit, 0.5, 0.0))
+
+        components[:, 3] = _seniority_fit(
+            self._levels.code(candidate.experience_level),
+            self._offer_level[rows],
+        )
+
+        required = self._offer_languages.counts[rows]
+        if candidate.languages:
+            matches = self._offer_languages.hits(self._languages.codes(candidate.languages))[rows]
+            language_fit = _ratio(matches, required, required > 0)
+        else:
+            language_fit = np.zeros(rows.size, dtype=np.float64)
+        components[:, 4] = np.where(required == 0, 1.0, language_fit)
+
+        components[:, 5] = _salary_fit(
+            np.nan if candidate.salary_expectation is None else candidate.salary_expectation,
+            self._offer_salary_min[rows],
+            self._offer_salary_max[rows],
+        )
+        return components, token_similarity
+
+    # ------------------------------------------------------------------
+    # Title similarity
+    # ------------------------------------------------------------------
+    def _token_similarity(
+        self,
+        query_tokens: frozenset[str],
+        tokens: _Incidence,
+        rows: np.ndarray,
+    ) -> np.ndarray:
+        """Jaccard similarity between ``query_tokens`` and each row's title tokens."""
+        shared = tokens.hits(self._title_tokens.codes(query_tokens))[rows]
+        union = len(query_tokens) + tokens.counts[rows] - shared
+        return _ratio(shared, union, union > 0)
+
+    def _titles(
+        self,
+        query: str | None,
+        titles: list[str],
+        has_title: np.ndarray,
+        rows: np.ndarray,
+        token_similarity: np.ndarray,
+        exact: bool,
+        query_is_choice: bool = False,
+    ) -> np.ndarray:
+        """Title similarity of ``query`` against the rows' titles in one batch.
+
+        The offer title is always the first sequence handed to the backend, as
+        in ``title_similarity``; ``query_is_choice`` flags the candidate side,
+        where the query is the candidate text and each row is an offer.
+        """
+        present = has_title[rows] & bool(query)
+        ratios = np.zeros(rows.size, dtype=np.float64)
+        positions = np.flatnonzero(present)
+        if positions.size:
+            scorer = self.backend.ratios if exact else self.backend.ratio_bounds
+            choices = [titles[row] for row in rows[positions]]
+            ratios[positions] = scorer(query, choices, reverse=query_is_choice)
+        return np.where(present, RATIO_WEIGHT * ratios + TOKEN_WEIGHT * token_similarity, 0.0)
+
+    # ------------------------------------------------------------------
+    # Pruning
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _remainder_bound(
+        weights: Mapping[str, float],
+        has_title: bool,
+        has_level: bool,
+        has_salary: bool,
+    ) -> float:
+        """Best score reachable by a row sharing no skill and no place.
+
+        Such a row has zero coverage, profile focus and geo fit; every other
+        component is taken at its maximum given what the scored side provides.
+        """
+        return (
+            weights["title_similarity"] * (1.0 if has_title else 0.0)
+            + weights["seniority"] * (1.0 if has_level else 0.5)
+            + weights["language"] * 1.0
+            + weights["salary"] * (1.0 if has_salary else 0.5)
+        )
+
+    @staticmethod
+    def _prune_and_rank(
+        shortlist: np.ndarray,
+        start: int,
+        stop: int,
+        bound_components: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]],
+        exact_titles: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        bounds_are_exact: bool,
+        remainder_bound: float,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> RankedRows:
+        """Select the ``limit`` best rows with a bounded heap and early termination.
+
+        Rows are visited by decreasing upper bound (every component exact except
+        the title, taken at the backend bound). Exact titles are computed block
+        by block, unless the backend bounds already are the exact values. Once
+        the heap holds ``limit`` rows and the next bound is below its minimum,
+        no remaining row can enter and scoring stops. The rows of
+        ``[start, stop)`` outside the shortlist are only visited when
+        ``remainder_bound`` says one of them could still enter the heap.
+        """
+        empty = RankedRows(
+            rows=np.empty(0, dtype=np.int64),
+            scores=np.empty(0, dtype=np.float64),
+            components=np.empty((0, len(COMPONENTS)), dtype=np.float64),
+        )
+        if limit <= 0:
+            return empty
+
+        # (score, -row) keys: the heap top is the current worst winner, and
+        # equal scores favour the lowest row like a stable sort would.
+        heap: list[tuple[float, int, np.ndarray]] = []
+
+        def consume(rows: np.ndarray) -> None:
+            components, token_similarity = bound_components(rows)
+            bounds = weighted_sum(components, weights)
+            order = np.argsort(-bounds, kind="stable")
+            for offset in range(0, order.size, _SCORING_BLOCK):
+                block = order[offset:offset + _SCORING_BLOCK]
+                if len(heap) == limit:
+                    block = block[bounds[block] >= heap[0][0]]
+                    if block.size == 0:
+                        return
+                if not bounds_are_exact:
+                    components[block, 1] = exact_titles(rows[block], token_similarity[block])
+                scores = weighted_sum(components[block], weights)
+                for index, score in zip(block, scores):
+                    item = (float(score), -int(rows[index]), components[index])
+                    if len(heap) < limit:
+                        heapq.heappush(heap, item)
+                    elif item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
+
+        consume(shortlist)
+        if (len(heap) < limit or remainder_bound >= heap[0][0]) and shortlist.size < stop - start:
+            consume(np.setdiff1d(np.arange(start, stop, dtype=np.int64), shortlist, assume_unique=True))
+
+        if not heap:
+            return empty
+        winners = sorted(heap, key=lambda item: item[:2], reverse=True)
+        return RankedRows(
+            rows=np.asarray([-item[1] for item in winners], dtype=np.int64),
+            scores=np.asarray([item[0] for item in winners], dtype=np.float64),
+            components=np.vstack([item[2] for item in winners]),
+        )
+
+
+class BatchEngineCache:
+    """Rebuild the columnar engine only when the feature store version moves."""
+
+    def __init__(self):
+        self._engine: BatchScoringEngine | None = None
+        self._version: int | None = None
+        self._lock = threading.Lock()
+
+    def get(self, store: MatchingFeatureStore, db: Session) -> BatchScoringEngine:
+        """Return the engine matching the current store contents."""
+        version, candidates, offers = store.snapshot(db)
+        with self._lock:
+            if self._engine is None or self._version != version:
+                self._engine = BatchScoringEngine(candidates, offers, TITLE_BACKEND)
+                self._version = version
+            return self._engine
+
+
+ENGINE_CACHE = BatchEngineCache()
+
+
+def rank_components(
+    components: np.ndarray,
+    weights: Mapping[str, float],
+    limit: int,
+) -> RankedRows:
+    """Rank precomputed component rows under ``weights`` (best first, ties by row)."""
+    scores = weighted_sum(components, weights)
+    limit = max(limit, 0)
+    rows = np.arange(scores.size, dtype=np.int64)
+    if 0 < limit < scores.size:
+        # Keep every row tied with the limit-th score, then order them stably.
+        threshold = -np.partition(-scores, limit - 1)[limit - 1]
+        rows = np.flatnonzero(scores >= threshold)
+    rows = rows[np.argsort(-scores[rows], kind="stable")][:limit]
+    return RankedRows(rows=rows, scores=scores[rows], components=components[rows])
+
+
+class ComponentCache:
+    """LRU of full component matrices, keyed by scored entity, for one engine.
+
+    Scores are a weighted sum of components, so ranking the same offer (or
+    candidate) under another weight profile only needs ``rank_components``
+    over the cached matrix instead of a new scoring pass. Entries are dropped
+    when the engine changes and evicted beyond ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._engine: BatchScoringEngine | None = None
+        self._entries: OrderedDict[tuple[str, UUID], np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def offer_components(self, engine: BatchScoringEngine, offer: OfferFeatures) -> np.ndarray:
+        """Components of ``offer`` against every candidate of ``engine``."""
+        return self._get(
+            engine,
+            ("offer", offer.id),
+            lambda: engine._offer_components(offer, np.arange(len(engine.candidates), dtype=np.int64))[0],
+        )
+
+    def candidate_components(
+        self,
+        engine: BatchScoringEngine,
+        candidate: CandidateFeatures,
+    ) -> np.ndarray:
+        """Components of ``candidate`` against every offer of ``engine``."""
+        return self._get(
+            engine,
+            ("candidate", candidate.id),
+            lambda: engine._candidate_components(candidate, np.arange(len(engine.offers), dtype=np.int64))[0],
+        )
+
+    def _get(
+        self,
+        engine: BatchScoringEngine,
+        key: tuple[str, UUID],
+        compute: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        with self._lock:
+            if self._engine is not engine:
+                self._entries.clear()
+                self._bytes = 0
+                self._engine = engine
+            components = self._entries.get(key)
+            if components is not None:
+                self._entries.move_to_end(key)
+                return components
+
+        components = compute()
+        components.setflags(write=False)
+        with self._lock:
+            if self._engine is engine and key not in self._entries:
+                self._entries[key] = components
+                self._bytes += components.nbytes
+                while self._bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+        return components
+
+
+COMPONENT_CACHE = ComponentCache()
@@ -0,0 +1,457 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.repositories.candidate_repository import CandidateRepository
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.repositories.offer_repository import OfferRepository
+from app.utils.background import BackgroundRefresher
+from app.utils.search_filters import LANGUAGE_ALIASES
+
+
+SENIORITY_KEYWORDS = {
+    "intern": "intern",
+    "junior": "junior",
+    "beginner": "beginner",
+    "intermediate": "intermediate",
+    "confirmed": "intermediate",
+    "advanced": "advanced",
+    "senior": "senior",
+    "lead": "senior",
+    "expert": "expert",
+}
+
+_REFRESH_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class CandidateFeatures:
+    """Normalized candidate attributes consumed by the matching scorer."""
+
+    id: UUID
+    skills: frozenset[str] = frozenset()
+    skill_names: tuple[str, ...] = ()
+    title_text: str = ""
+    title_tokens: frozenset[str] = frozenset()
+    languages: frozenset[str] = frozenset()
+    city: str | None = None
+    country: str | None = None
+    experience_level: str | None = None
+    salary_expectation: float | None = None
+    display_name: str = "Profil anonyme"
+    location: str | None = None
+
+
+@dataclass(frozen=True)
+class OfferFeatures:
+    """Normalized offer attributes consumed by the matching scorer."""
+
+    id: UUID
+    skills: frozenset[str] = frozenset()
+    skill_labels: Mapping[str, str] = field(default_factory=dict)
+    title: str | None = None
+    title_tokens: frozenset[str] = frozenset()
+    seniority: str | None = None
+    languages: frozenset[str] = frozenset()
+    cities: frozenset[str] = frozenset()
+    country: str | None = None
+    salary_min: float | None = None
+    salary_max: float | None = None
+
+
+# ----------------------------------------------------------------------
+# Normalization helpers
+# ----------------------------------------------------------------------
+def normalize_text(value: str | None) -> str | None:
+    """Normalize raw text for comparisons."""
+    if value is None:
+        return None
+    normalized = value.strip().lower()
+    return normalized or None
+
+
+def tokenize(value: str) -> list[str]:
+    """Tokenize strings into normalized alphanumeric chunks."""
+    return re.findall(r"[a-z0-9]+", value.lower())
+
+
+def parse_salary_range(raw_value: str | None) -> tuple[float | None, float | None]:
+    """Parse a salary string and return min/max floats."""
+    if not raw_value:
+        return (None, None)
+    digits = re.findall(r"\d+(?:[.,]\d+)?", raw_value.replace(" ", ""))
+    values: list[float] = []
+    for entry in digits[:2]:
+        normalized = entry.replace(",", ".")
+        try:
+            values.append(float(normalized))
+        except ValueError:
+            continue
+    if not values:
+        return (None, None)
+    if len(values) == 1:
+        return (values[0], None)
+    first, second = values[:2]
+    return (min(first, second), max(first, second))
+
+
+def parse_salary_expectation(raw_value: str | None) -> float | None:
+    """Extract a float value from salary expectations."""
+    if not raw_value:
+        return None
+    digits = re.findall(r"\d+(?:[.,]\d+)?", raw_value.replace(" ", ""))
+    if not digits:
+        return None
+    normalized = digits[0].replace(",", ".")
+    try:
+        return float(normalized)
+    except ValueError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Feature builders
+# ----------------------------------------------------------------------
+def _candidate_titles(candidate) -> list[str]:
+    """Gather representative titles from a candidate profile."""
+    titles: list[str] = []
+    pref = getattr(candidate, "job_preferences", None)
+    raw_values = [
+        getattr(candidate, "professional_title", None),
+        getattr(pref, "desired_position", None) if pref else None,
+    ]
+    for exp in getattr(candidate, "experiences", []) or []:
+        if len(titles) >= 3:
+            break
+        raw_values.append(getattr(exp, "position", None))
+
+    for value in raw_values:
+        if not value:
+            continue
+        text = value.strip()
+        if text:
+            titles.append(text)
+    return titles
+
+
+def _candidate_public_name(candidate) -> str:
+    """Return a display-friendly full name for the candidate."""
+    first = (getattr(candidate, "first_name", "") or "").strip()
+    last = (getattr(candidate, "last_name", "") or "").strip()
+    full_name = f"{first} {last}".strip()
+    if full_name:
+        return full_name
+    fallback = getattr(candidate, "professional_title", None)
+    return fallback or "Profil anonyme"
+
+
+def _candidate_location(candidate) -> str | None:
+    """Return the most specific known candidate location."""
+    for part in (
+        getattr(candidate, "city", None),
+        getattr(candidate, "region", None),
+        getattr(candidate, "country", None),
+    ):
+        if part:
+            return part
+    return None
+
+
+def build_candidate_features(candidate) -> CandidateFeatures:
+    """Precompute every normalized attribute the scorer needs for a candidate."""
+    skills: set[str] = set()
+    skill_names: list[str] = []
+    for skill in getattr(candidate, "skills", []) or []:
+        raw_name = getattr(skill, "name", None)
+        if raw_name:
+            skill_names.append(raw_name)
+        name = normalize_text(raw_name)
+        if name:
+            skills.add(name)
+
+    languages: set[str] = set()
+    for language in getattr(candidate, "languages", []) or []:
+        name = normalize_text(getattr(language, "language", None))
+        if not name:
+            continue
+        languages.add(LANGUAGE_ALIASES.get(name, name))
+
+    pref = getattr(candidate, "job_preferences", None)
+    city = normalize_text(getattr(pref, "city", None)) or normalize_text(
+        getattr(candidate, "city", None)
+    )
+    country = normalize_text(getattr(pref, "country", None)) or normalize_text(
+        getattr(candidate, "country", None)
+    )
+
+    title_text = " ".join(_candidate_titles(candidate))
+    return CandidateFeatures(
+        id=candidate.id,
+        skills=frozenset(skills),
+        skill_names=tuple(skill_names),
+        title_text=title_text.lower(),
+        title_tokens=frozenset(tokenize(title_text)),
+        languages=frozenset(languages),
+        city=city,
+        country=country,
+        experience_level=normalize_text(getattr(candidate, "experience_level", None)),
+        salary_expectation=parse_salary_expectation(
+            getattr(pref, "pretentions_salarial", None) if pref is not None else None
+        ),
+        display_name=_candidate_public_name(candidate),
+        location=_candidate_location(candidate),
+    )
+
+
+def _infer_offer_seniority(offer) -> str | None:
+    """Guess the seniority level of an offer using tags and text."""
+    for tag in getattr(offer, "tags", []) or []:
+        normalized = normalize_text(getattr(tag, "name", None))
+        if not normalized:
+            continue
+        mapped = SENIORITY_KEYWORDS.get(normalized)
+        if mapped:
+            return mapped
+
+    for text in (
+        getattr(offer, "title", None),
+        getattr(offer, "instructions", None),
+    ):
+        if not text:
+            continue
+        for token in tokenize(text):
+            mapped = SENIORITY_KEYWORDS.get(token)
+            if mapped:
+                return mapped
+    return None
+
+
+def _offer_languages(offer) -> set[str]:
+    """Identify languages mentioned on the offer."""
+    normalized: set[str] = set()
+    for tag in getattr(offer, "tags", []) or []:
+        name = normalize_text(getattr(tag, "name", None))
+        if not name:
+            continue
+        code = LANGUAGE_ALIASES.get(name)
+        if code:
+            normalized.add(code)
+
+    for entry in getattr(offer, "languages", []) or []:
+        name = normalize_text(getattr(entry, "language", None))
+        if not name:
+            continue
+        normalized.add(LANGUAGE_ALIASES.get(name, name))
+
+    for text in (getattr(offer, "title", None), getattr(offer, "instructions", None)):
+        if not text:
+            continue
+        for token in tokenize(text):
+            code = LANGUAGE_ALIASES.get(token)
+            if code:
+                normalized.add(code)
+    return normalized
+
+
+def build_offer_features(offer) -> OfferFeatures:
+    """Precompute every normalized attribute the scorer needs for an offer."""
+    skill_labels: dict[str, str] = {}
+    for tag in getattr(offer, "tags", []) or []:
+        name = normalize_text(getattr(tag, "name", None))
+        if not name:
+            continue
+        skill_labels[name] = tag.name.strip()
+
+    cities = {
+        normalize_text(getattr(city, "city", None))
+        for city in getattr(offer, "cities", []) or []
+    }
+    cities.discard(None)
+
+    title = normalize_text(getattr(offer, "title", None))
+    salary_min, salary_max = parse_salary_range(getattr(offer, "salary", None))
+    return OfferFeatures(
+        id=offer.id,
+        skills=frozenset(skill_labels),
+        skill_labels=skill_labels,
+        title=title,
+        title_tokens=frozenset(tokenize(title)) if title else frozenset(),
+        seniority=_infer_offer_seniority(offer),
+        languages=frozenset(_offer_languages(offer)),
+        cities=frozenset(cities),
+        country=normalize_text(getattr(offer, "work_country_location", None)),
+        salary_min=salary_min,
+        salary_max=salary_max,
+    )
+
+
+# ----------------------------------------------------------------------
+# Feature store
+# ----------------------------------------------------------------------
+def _chunks(values: list[UUID], size: int) -> Iterable[list[UUID]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _keep_misses(fresh: dict, live: dict, read: dict) -> dict:
+    """``fresh`` plus the records loaded on a miss since ``read`` was taken from ``live``."""
+    if live is read:
+        return fresh
+    return {**{key: value for key, value in live.items() if key not in read}, **fresh}
+
+
+class MatchingFeatureStore:
+    """Process-wide store of candidate and offer features.
+
+    The first access builds every record. Afterwards a background thread
+    reloads, at most once per interval, the rows whose ``updated_at`` (or a
+    child row's) moved past the watermark or that the ``entity_changes`` log
+    lists, plus rows that appeared or disappeared; a periodic full rebuild
+    also runs there. Each refresh builds new maps and swaps them in, and the
+    version only moves when some features actually changed.
+    """
+
+    def __init__(
+        self,
+        refresh_interval_seconds: int = 30,
+        full_rebuild_seconds: int = 3600,
+    ):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self.version = 0
+        self._candidates: dict[UUID, CandidateFeatures] = {}
+        self._offers: dict[UUID, OfferFeatures] = {}
+        self._watermark: datetime | None = None
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+        self._update_lock = threading.Lock()
+        self._refresher = BackgroundRefresher(
+            "matching-feature-store",
+            refresh_interval_seconds,
+            self._refresh_in_background,
+        )
+
+    def candidates(self, db: Session) -> list[CandidateFeatures]:
+        """Return features for every candidate, refreshing when due."""
+        self.refresh(db)
+        with self._lock:
+            return list(self._candidates.values())
+
+    def offers(self, db: Session) -> list[OfferFeatures]:
+        """Return features for every offer, refreshing when due."""
+        self.refresh(db)
+        with self._lock:
+            return list(self._offers.values())
+
+    def snapshot(self, db: Session) -> tuple[int, list[CandidateFeatures], list[OfferFeatures]]:
+        """Return the store version with a consistent copy of both sides."""
+        self.refresh(db)
+        with self._lock:
+            return self.version, list(self._candidates.values()), list(self._offers.values())
+
+    def candidate(self, db: Session, candidate_id: UUID) -> CandidateFeatures | None:
+        """Return features for one candidate, loading it on a store miss."""
+        self.refresh(db)
+        with self._lock:
+            features = self._candidates.get(candidate_id)
+            if features is not None:
+                return features
+            loaded = CandidateRepository(db).list_for_matching([candidate_id])
+            if not loaded:
+                return None
+            features = build_candidate_features(loaded[0])
+            self._candidates = {**self._candidates, candidate_id: features}
+            self.version += 1
+            return features
+
+    def offer(self, db: Session, offer_id: UUID) -> OfferFeatures | None:
+        """Return features for one offer, loading it on a store miss."""
+        self.refresh(db)
+        with self._lock:
+            features = self._offers.get(offer_id)
+            if features is not None:
+                return features
+            loaded = OfferRepository(db).list_for_matching([offer_id])
+            if not loaded:
+                return None
+            features = build_offer_features(loaded[0])
+            self._offers = {**self._offers, offer_id: features}
+            self.version += 1
+            return features
+
+    def invalidate(self) -> None:
+        """Rebuild every record in the background."""
+        with self._lock:
+            self._built_at = float("-inf")
+        self._refresher.trigger(force=True)
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Build the store on first use, then start a background refresh when due."""
+        if self._watermark is None:
+            with self._update_lock:
+                if self._watermark is None:
+                    self._update(db)
+            return
+        self._refresher.trigger(force)
+
+    def _refresh_in_background(self) -> None:
+        # Imported here: the matching engine and its worker processes import
+        # this module without any database configured.
+        from app.db.session import run_in_session
+
+        run_in_session(self.update)
+
+    def update(self, db: Session) -> None:
+        """Bring the store up to date with the database, then swap the new records in."""
+        with self._update_lock:
+            self._update(db)
+
+    def _update(self, db: Session) -> None:
+        now = time.monotonic()
+        change_log = ChangeLogRepository(db)
+        watermark = change_log.watermark()
+        candidate_repo = CandidateRepository(db)
+        offer_repo = OfferRepository(db)
+        with self._lock:
+            current_candidates, current_offers = self._candidates, self._offers
+        if self._watermark is None or now - self._built_at >= self.full_rebuild_seconds:
+            candidates = {
+                candidate.id: build_candidate_features(candidate)
+                for candidate in candidate_repo.list_for_matching()
+            }
+            offers = {offer.id: build_offer_features(offer) for offer in offer_repo.list_for_matching()}
+            change_log.prune()
+            self._built_at = now
+        else:
+            candidates = self._sync(current_candidates, candidate_repo, build_candidate_features)
+            offers = self._sync(current_offers, offer_repo, build_offer_features)
+
+        with self._lock:
+            candidates = _keep_misses(candidates, self._candidates, current_candidates)
+            offers = _keep_misses(offers, self._offers, current_offers)
+            if candidates != self._candidates or offers != self._offers:
+                self._candidates = candidates
+                self._offers = offers
+                self.version += 1
+            self._watermark = watermark
+
+    def _sync(self, records: dict, repo, builder) -> dict:
+        """Copy of ``records`` with new or updated rows reloaded and deleted ones dropped."""
+        current_ids = set(repo.list_ids())
+        synced = {entity_id: features for entity_id, features in records.items() if entity_id in current_ids}
+        stale = (current_ids - set(synced)) | (set(repo.list_ids_updated_since(self._watermark)) & current_ids)
+        for chunk in _chunks(list(stale), _REFRESH_BATCH_SIZE):
+            for entity in repo.list_for_matching(chunk):
+                synced[entity.id] = builder(entity)
+        return synced
+
+
+FEATURE_STORE = MatchingFeatureStore()
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import run_in_session
+from app.models import MatchScore, MatchScoreState
+from app.repositories.candidate_repository import CandidateRepository
+from app.repositories.match_score_repository import (
+    CANDIDATE_SUBJECT,
+    OFFER_SUBJECT,
+    MatchScoreRepository,
+)
+from app.repositories.offer_repository import OfferRepository
+from app.services.matching_engine import COMPONENTS, ENGINE_CACHE, BatchScoringEngine
+from app.services.matching_features import MatchingFeatureStore
+
+
+logger = logging.getLogger(__name__)
+
+# Above this many changed subjects in one sync, dropping the table and letting
+# subjects re-materialize on their next request is cheaper than patching it.
+_MAX_INCREMENTAL_CHANGES = 2000
+
+
+def weights_key(weights: Mapping[str, float]) -> str:
+    """Stable fingerprint of a weight set, stored with each materialization."""
+    return ",".join(f"{name}={weights[name]:.6f}" for name in COMPONENTS)
+
+
+def _changed_ids(before: list, before_rows: Mapping[UUID, int], after: list) -> set[UUID]:
+    """Ids added, removed or whose features differ between two engine snapshots."""
+    changed = {
+        features.id
+        for features in after
+        if (row := before_rows.get(features.id)) is None or before[row] != features
+    }
+    changed |= before_rows.keys() - {features.id for features in after}
+    return changed
+
+
+class MatchScoreMaterializer:
+    """Keep ``match_scores`` in sync with the matching engine.
+
+    A subject (offer or candidate) is materialized after its first request:
+    its ``depth`` best rows of the other side are stored together with a
+    floor, the best score among the rows left out. Top-k reads are then index
+    scans, valid while the k-th stored score is not below the floor.
+
+    Reads never write. Materializations and engine syncs run as jobs on a
+    background thread with their own session; until a subject's rows are
+    current, its requests are ranked in memory.
+
+    Every stored row holds the current score of its pair. When the engine
+    snapshot changes, only the offers and candidates whose features changed
+    are rescored: a changed candidate is scored against every offer in one
+    vectorized pass, and a row is kept when it belongs to the candidate's own
+    top rows or beats the floor of a materialized offer (and symmetrically for
+    a changed offer). Rows that fall to or below a floor can be dropped without
+    breaking the floor invariant.
+    """
+
+    def __init__(self, depth: int = 200, full_refresh_seconds: int = 3600):
+        self.depth = depth
+        self.full_refresh_seconds = full_refresh_seconds
+        self._engine: BatchScoringEngine | None = None
+        self._weights_key: str | None = None
+        self._lock = threading.Lock()
+        self._jobs: ThreadPoolExecutor | None = None
+        self._pending: set[tuple[str, UUID]] = set()
+        self._pending_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def top_candidates(
+        self,
+        db: Session,
+        store: MatchingFeatureStore,
+        engine: BatchScoringEngine,
+        offer_id: UUID,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> list[MatchScore] | None:
+        """Return the ``limit`` best stored candidate scores of an offer.
+
+        Return None, and schedule the offer's materialization, when the stored
+        rows are missing or not current; the caller then ranks in memory.
+        """
+        return self._top(db, store, engine, OFFER_SUBJECT, offer_id, weights, limit)
+
+    def top_offers(
+        self,
+        db: Session,
+        store: MatchingFeatureStore,
+        engine: BatchScoringEngine,
+        candidate_id: UUID,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> list[MatchScore] | None:
+        """Return the ``limit`` best stored offer scores of a candidate, or None (see ``top_candidates``)."""
+        return self._top(db, store, engine, CANDIDATE_SUBJECT, candidate_id, weights, limit)
+
+    def _top(
+        self,
+        db: Session,
+        store: MatchingFeatureStore,
+        engine: BatchScoringEngine,
+        subject: str,
+        subject_id: UUID,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> list[MatchScore] | None:
+        key = weights_key(weights)
+        if self._engine is engine and self._weights_key == key:
+            rows = self._stored(MatchScoreRepository(db), subject, subject_id, key, limit)
+            if rows is not None:
+                return rows
+        self._schedule(store, weights, subject, subject_id, max(self.depth, limit))
+        return None
+
+    def _stored(
+        self,
+        repo: MatchScoreRepository,
+        subject: str,
+        subject_id: UUID,
+        key: str,
+        limit: int,
+    ) -> list[MatchScore] | None:
+        """Stored top rows of a subject when they are the true top ``limit``, else None."""
+        state = repo.get_state(subject, subject_id)
+        if not self._is_fresh(state, key):
+            return None
+        if subject == OFFER_SUBJECT:
+            rows = repo.top_for_offer(subject_id, limit)
+        else:
+            rows = repo.top_for_candidate(subject_id, limit)
+        return rows if self._covers(state, rows, limit) else None
+
+    def _is_fresh(self, state: MatchScoreState | None, key: str) -> bool:
+        """A state is usable when computed with these weights and not too old.
+
+        The age limit catches changes that bypass every timestamp and happened
+        while no process was watching the engine snapshots.
+        """
+        if state is None or state.weights_key != key:
+            return False
+        age = datetime.now(timezone.utc) - state.computed_at
+        return age < timedelta(seconds=self.full_refresh_seconds)
+
+    @staticmethod
+    def _covers(state: MatchScoreState, rows: list[MatchScore], limit: int) -> bool:
+        """Tell whether the stored rows are the true top ``limit`` for the subject."""
+        if state.floor is None:
+            return True
+        return len(rows) == limit and rows[-1].score >= state.floor
+
+    # ------------------------------------------------------------------
+    # Background jobs
+    # ------------------------------------------------------------------
+    def _schedule(
+        self,
+        store: MatchingFeatureStore,
+        weights: Mapping[str, float],
+        subject: str,
+        subject_id: UUID,
+        depth: int,
+    ) -> None:
+        """Queue the materialization of a subject unless it is already queued."""
+        with self._pending_lock:
+            if (subject, subject_id) in self._pending:
+                return
+            self._pending.add((subject, subject_id))
+            if self._jobs is None:
+                self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-scores")
+        self._jobs.submit(self._run, store, dict(weights), subject, subject_id, depth)
+
+    def _run(
+        self,
+        store: MatchingFeatureStore,
+        weights: Mapping[str, float],
+        subject: str,
+        subject_id: UUID,
+        depth: int,
+    ) -> None:
+        try:
+            run_in_session(
+                lambda db: self.materialize(db, ENGINE_CACHE.get(store, db), weights, subject, subject_id, depth)
+            )
+        except Exception:
+            logger.exception("Materializing match scores of %s %s failed", subject, subject_id)
+        finally:
+            with self._pending_lock:
+                self._pending.discard((subject, subject_id))
+
+    def materialize(
+        self,
+        db: Session,
+        engine: BatchScoringEngine,
+        weights: Mapping[str, float],
+        subject: str,
+        subject_id: UUID,
+        depth: int,
+    ) -> None:
+        """Sync with ``engine``, then store the top rows of a subject if they are not current."""
+        key = self.sync(db, engine, weights)
+        with self._lock:
+            repo = MatchScoreRepository(db)
+            if self._stored(repo, subject, subject_id, key, depth) is not None:
+                return
+            self._apply(
+                repo,
+                engine,
+                offer_ids={subject_id} if subject == OFFER_SUBJECT else set(),
+                candidate_ids={subject_id} if subject == CANDIDATE_SUBJECT else set(),
+                weights=weights,
+                materialize=True,
+                depth=depth,
+            )
+            db.commit()
+
+    # ------------------------------------------------------------------
+    # Incremental refresh
+    # ------------------------------------------------------------------
+    def sync(self, db: Session, engine: BatchScoringEngine, weights: Mapping[str, float]) -> str:
+        """Rescore the subjects that changed since the last engine seen; return the weights key."""
+        key = weights_key(weights)
+        with self._lock:
+            if self._engine is engine and self._weights_key == key:
+                return key
+
+            repo = MatchScoreRepository(db)
+            if self._weights_key != key and repo.has_other_weights(key):
+                logger.info("Matching weights changed, clearing match_scores")
+                repo.clear()
+                candidate_ids: set[UUID] = set()
+                offer_ids: set[UUID] = set()
+            elif self._engine is None:
+                repo.delete_orphan_states()
+                candidate_ids, offer_ids = self._recently_updated(db)
+            else:
+                previous = self._engine
+                candidate_ids = _changed_ids(previous.candidates, previous.candidate_rows, engine.candidates)
+                offer_ids = _changed_ids(previous.offers, previous.offer_rows, engine.offers)
+
+            if len(candidate_ids) + len(offer_ids) > _MAX_INCREMENTAL_CHANGES:
+                logger.info(
+                    "%d matching subjects changed, clearing match_scores",
+                    len(candidate_ids) + len(offer_ids),
+                )
+                repo.clear()
+            elif candidate_ids or offer_ids:
+                self._apply(
+                    repo,
+                    engine,
+                    offer_ids=offer_ids,
+                    candidate_ids=candidate_ids,
+                    weights=weights,
+                    materialize=False,
+                    depth=self.depth,
+                )
+            db.commit()
+            self._engine = engine
+            self._weights_key = key
+            return key
+
+    def _recently_updated(self, db: Session) -> tuple[set[UUID], set[UUID]]:
+        """Subjects touched within the freshness window, rescored when a process starts."""
+        since: datetime = db.query(func.now()).scalar() - timedelta(seconds=self.full_refresh_seconds)
+        return (
+            set(CandidateRepository(db).list_ids_updated_since(since)),
+            set(OfferRepository(db).list_ids_updated_since(since)),
+        )
+
+    def _apply(
+        self,
+        repo: MatchScoreRepository,
+        engine: BatchScoringEngine,
+        offer_ids: set[UUID],
+        candidate_ids: set[UUID],
+        weights: Mapping[str, float],
+        materialize: bool,
+        depth: int,
+    ) -> None:
+        """Rescore the given subjects and rewrite their rows and states.
+
+        Offers go first so that candidates are kept against up-to-date offer
+        floors.
+        """
+        key = weights_key(weights)
+        offer_floors = repo.floors(OFFER_SUBJECT, key)
+        candidate_floors = repo.floors(CANDIDATE_SUBJECT, key)
+        offer_floor_array = self._floor_array(offer_floors, engine.offers)
+        candidate_floor_array = self._floor_array(candidate_floors, engine.candidates)
+
+        for offer_id in offer_ids:
+            row = engine.offer_rows.get(offer_id)
+            if row is None:
+                repo.delete_subject(OFFER_SUBJECT, offer_id)
+                continue
+            offer = engine.offers[row]
+            batch = engine.score_offer(offer, weights)
+            keep = batch.scores > candidate_floor_array
+            if materialize or offer_id in offer_floors:
+                floor = self._keep_top(batch.scores, keep, depth)
+                repo.save_state(OFFER_SUBJECT, offer_id, floor, key)
+                offer_floor_array[row] = -np.inf if floor is None else floor
+            rows = np.flatnonzero(keep)
+            repo.replace_for_offer(
+                offer_id,
+                [
+                    self._row(offer, engine.candidates[index], batch.scores[index], batch.components[index])
+                    for index in rows
+                ],
+            )
+
+        for candidate_id in candidate_ids:
+            row = engine.candidate_rows.get(candidate_id)
+            if row is None:
+                repo.delete_subject(CANDIDATE_SUBJECT, candidate_id)
+                continue
+            candidate = engine.candidates[row]
+            batch = engine.score_candidate(candidate, weights)
+            keep = batch.scores > offer_floor_array
+            if materialize or candidate_id in candidate_floors:
+                floor = self._keep_top(batch.scores, keep, depth)
+                repo.save_state(CANDIDATE_SUBJECT, candidate_id, floor, key)
+            rows = np.flatnonzero(keep)
+            repo.replace_for_candidate(
+                candidate_id,
+                [
+                    self._row(engine.offers[index], candidate, batch.scores[index], batch.components[index])
+                    for index in rows
+                ],
+            )
+
+    @staticmethod
+    def _floor_array(floors: Mapping[UUID, float | None], subjects: list) -> np.ndarray:
+        """Per-row floors of the opposite side; +inf where it is not materialized."""
+        values = np.full(len(subjects), np.inf, dtype=np.float64)
+        for row, features in enumerate(subjects):
+            if features.id in floors:
+                floor = floors[features.id]
+                values[row] = -np.inf if floor is None else floor
+        return values
+
+    @staticmethod
+    def _keep_top(scores: np.ndarray, keep: np.ndarray, depth: int) -> float | None:
+        """Mark the ``depth`` best rows in ``keep`` and return the floor left below them."""
+        order = np.argsort(-scores, kind="stable")
+        keep[order[:depth]] = True
+        if order.size <= depth:
+            return None
+        return float(scores[order[depth]])
+
+    @staticmethod
+    def _row(offer, candidate, score: float, components: np.ndarray) -> dict:
+        row = {
+            "offer_id": offer.id,
+            "candidate_id": candidate.id,
+            "score": float(score),
+            "matched_skills": sorted(
+                offer.skill_labels[key] for key in offer.skills & candidate.skills
+            ),
+        }
+        row.update({name: float(value) for name, value in zip(COMPONENTS, components)})
+        return row
+
+
+MATCH_SCORES_ENABLED = os.getenv("MATCH_SCORES_ENABLED", "true").lower() in ("1", "true", "yes")
+MATCH_SCORES = MatchScoreMaterializer(
+    depth=int(os.getenv("MATCH_SCORES_DEPTH", "200")),
+    full_refresh_seconds=int(os.getenv("MATCH_SCORES_FULL_REFRESH_SECONDS", "3600")),
+)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import BrokenExecutor, CancelledError, ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.matching_engine import COMPONENTS, BatchScoringEngine, RankedRows
+from app.services.matching_features import OfferFeatures
+
+
+logger = logging.getLogger(__name__)
+
+# Engine of the worker process, installed once by the pool initializer.
+_WORKER_ENGINE: BatchScoringEngine | None = None
+
+# Longest wait for one worker to start and unpickle its engine, and the
+# delay before starting a pool again after a failed start.
+_START_TIMEOUT_SECONDS = 300
+_RETRY_SECONDS = 60
+
+
+def _install_engine(engine: BatchScoringEngine, started) -> None:
+    """Worker initializer: keep the engine the pool was started for.
+
+    Waiting on ``started`` keeps every worker busy until all of them have
+    their engine, so each warm-up task spawns its own worker.
+    """
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = engine
+    started.wait(timeout=_START_TIMEOUT_SECONDS)
+
+
+def _noop() -> None:
+    """Warm-up task: returns once its worker is ready."""
+
+
+def _rank_shard(
+    offer: OfferFeatures,
+    weights: Mapping[str, float],
+    limit: int,
+    shard: tuple[int, int],
+) -> RankedRows:
+    """Worker entry point: rank one candidate shard of the installed engine."""
+    return _WORKER_ENGINE.rank_offer(offer, weights, limit, shard=shard)
+
+
+def merge_ranked(parts: list[RankedRows], limit: int) -> RankedRows:
+    """Merge per-shard top-k results into the global top-k.
+
+    Ties are broken on the lowest row, exactly like the single-process ranking.
+    """
+    rows = np.concatenate([part.rows for part in parts])
+    scores = np.concatenate([part.scores for part in parts])
+    components = np.concatenate(
+        [part.components.reshape(-1, len(COMPONENTS)) for part in parts]
+    )
+    order = np.lexsort((rows, -scores))[:limit]
+    return RankedRows(rows=rows[order], scores=scores[order], components=components[order])
+
+
+class _Pool:
+    """Worker pool of one engine version and the requests still using it."""
+
+    def __init__(self, engine: BatchScoringEngine, executor: ProcessPoolExecutor):
+        self.engine = engine
+        self.executor = executor
+        self.users = 0
+        self.retired = False
+
+
+class ParallelRanker:
+    """Rank candidates for an offer across a pool of worker processes.
+
+    One pool is started per engine so every worker holds the feature arrays
+    of the current feature store version; the engine is sent to each worker
+    once, by the pool initializer, never per request. Workers come from a
+    forkserver, not from forking the threaded API process, so they never
+    inherit locks held by its other threads. Each request is split into
+    contiguous candidate shards ranked in parallel and merged in the parent.
+    Below ``min_rows`` candidates the single-process path is faster and used.
+
+    Starting a pool (worker startup plus unpickling the engine) takes seconds
+    on large candidate sets, so it runs on a background thread, started by
+    ``prepare`` or by the first request for a new engine. Until every worker
+    of that pool is ready, requests use the single-process path. A pool
+    replaced by a newer engine is shut down once the requests still waiting
+    on it have finished, never while they are in flight.
+    """
+
+    def __init__(self, workers: int = 0, min_rows: int = 50_000):
+        self.workers = workers
+        self.min_rows = min_rows
+        self._pool: _Pool | None = None
+        self._starting: BatchScoringEngine | None = None
+        self._failed_at = float("-inf")
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def prepare(self, engine: BatchScoringEngine) -> None:
+        """Start the pool of ``engine`` in the background if it will be used."""
+        if self.enabled and len(engine.candidates) >= self.min_rows:
+            with self._lock:
+                self._start(engine)
+
+    def ready(self, engine: BatchScoringEngine) -> bool:
+        """Whether the pool holding ``engine`` is started and serving."""
+        pool = self._pool
+        return pool is not None and pool.engine is engine
+
+    def rank_offer(
+        self,
+        engine: BatchScoringEngine,
+        offer: OfferFeatures,
+        weights: Mapping[str, float],
+        limit: int,
+    ) -> RankedRows:
+        """Return the ``limit`` best candidate rows, in parallel when worthwhile."""
+        size = len(engine.candidates)
+        if not self.enabled or size < self.min_rows:
+            return engine.rank_offer(offer, weights, limit)
+
+        pool = self._acquire(engine)
+        if pool is None:
+            return engine.rank_offer(offer, weights, limit)
+        bounds = np.linspace(0, size, self.workers + 1).astype(int)
+        try:
+            futures = [
+                pool.executor.submit(_rank_shard, offer, weights, limit, (int(start), int(stop)))
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            return merge_ranked([future.result() for future in futures], limit)
+        except (BrokenExecutor, CancelledError, RuntimeError):
+            # A worker died, or the pool was shut down underneath the request.
+            logger.warning("Parallel ranking failed, falling back to one process", exc_info=True)
+            self._discard(pool)
+            return engine.rank_offer(offer, weights, limit)
+        finally:
+            self._release(pool)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes once no request uses them any more."""
+        with self._lock:
+            self._closed = True
+            if self._pool is not None:
+                self._retire(self._pool)
+            self._pool = None
+
+    def _acquire(self, engine: BatchScoringEngine) -> _Pool | None:
+        """Ready pool holding ``engine`` marked as in use, or None while it starts."""
+        with self._lock:
+            if self._pool is None or self._pool.engine is not engine:
+                self._start(engine)
+                return None
+            self._pool.users += 1
+            return self._pool
+
+    def _start(self, engine: BatchScoringEngine) -> None:
+        """Start a pool for ``engine`` in the background unless one is starting. Caller holds the lock."""
+        if (
+            self._closed
+            or self._starting is not None
+            or (self._pool is not None and self._pool.engine is engine)
+            or time.monotonic() - self._failed_at < _RETRY_SECONDS
+        ):
+            return
+        self._starting = engine
+        threading.Thread(target=self._start_pool, args=(engine,), name="matching-pool", daemon=True).start()
+
+    def _start_pool(self, engine: BatchScoringEngine) -> None:
+        """Start every worker of a pool for ``engine``, then make it the serving pool."""
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_install_engine,
+            initargs=(engine, context.Barrier(self.workers)),
+        )
+        try:
+            # Workers are spawned on demand, one per task while none is idle.
+            for future in [executor.submit(_noop) for _ in range(self.workers)]:
+                future.result()
+        except Exception:
+            logger.exception("Could not start the matching workers")
+            executor.shutdown(wait=False, cancel_futures=True)
+            with self._lock:
+                self._starting = None
+                self._failed_at = time.monotonic()
+            return
+
+        with self._lock:
+            self._starting = None
+            if self._closed:
+                executor.shutdown(wait=False)
+                return
+            if self._pool is not None:
+                self._retire(self._pool)
+            self._pool = _Pool(engine, executor)
+        logger.info("Started %d matching workers for %d candidates", self.workers, len(engine.candidates))
+
+    def _release(self, pool: _Pool) -> None:
+        with self._lock:
+            pool.users -= 1
+            if pool.retired and pool.users == 0:
+                pool.executor.shutdown(wait=False)
+
+    def _discard(self, pool: _Pool) -> None:
+        """Stop handing out a failed pool; the next request starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._retire(pool)
+                self._pool = None
+
+    @staticmethod
+    def _retire(pool: _Pool) -> None:
+        """Shut ``pool`` down now if idle, else when its last request releases it. Caller holds the lock."""
+        pool.retired = True
+        if pool.users == 0:
+            pool.executor.shutdown(wait=False)
+
+
+PARALLEL_RANKER = ParallelRanker(
+    workers=int(os.getenv("MATCHING_WORKERS", "0")),
+    min_rows=int(os.getenv("MATCHING_PARALLEL_MIN_ROWS", "50000")),
+)
@@ -1,66 +1,57 @@
 from __future__ import annotations
 
-import re
+from collections.abc import Iterable
 from dataclasses import dataclass
-from difflib import SequenceMatcher
 from uuid import UUID
-from fastapi import HTTPException
 
 from sqlalchemy.orm import Session
 
-import json
-
-
 from app.repositories.candidate_repository import CandidateRepository
 from app.repositories.offer_repository import OfferRepository
 from app.schemas import (
     CandidateMatch,
     CandidateRecommendationsResponse,
     JobOfferMatch,
-    JobOfferDto,
+    MatchingBatchResponse,
+    MatchingExplanation,
+    MatchingPairScore,
     MatchingScoreResponse,
     SourcingSearchResponse,
 )
 from app.services.dto_mappers import offer_to_dto
-from app.utils.offer_management import extract_text_from_rich_json
+from app.services.matching_engine import (
+    COMPONENT_CACHE,
+    COMPONENTS,
+    ENGINE_CACHE,
+    BatchScoringEngine,
+    RankedRows,
+    rank_components,
+)
+from app.services.matching_features import (
+    FEATURE_STORE,
+    CandidateFeatures,
+    MatchingFeatureStore,
+    OfferFeatures,
+    build_candidate_features,
+    build_offer_features,
+)
+from app.services.matching_materialized import (
+    MATCH_SCORES,
+    MATCH_SCORES_ENABLED,
+    MatchScoreMaterializer,
+)
+from app.services.matching_parallel import PARALLEL_RANKER
 from app.utils.cache import APP_CACHE, make_cache_key
 
 
-LANGUAGE_ALIASES = {
-    "french": "fr",
-    "francais": "fr",
-    "français": "fr",
-    "anglais": "en",
-    "english": "en",
-    "espagnol": "es",
-    "spanish": "es",
-    "allemand": "de",
-    "german": "de",
-    "portugais": "pt",
-    "portuguese": "pt",
-}
-
-SENIORITY_KEYWORDS = {
-    "intern": "intern",
-    "junior": "junior",
-    "beginner": "beginner",
-    "intermediate": "intermediate",
-    "confirmed": "intermediate",
-    "advanced": "advanced",
-    "senior": "senior",
-    "lead": "senior",
-    "expert": "expert",
-}
-
-
 @dataclass(frozen=True)
 class MatchingWeights:
     coverage: float = 0.30
     title_similarity: float = 0.20
-    geo_fit: float = 0.25
+    geo_fit: float = 0.15
     seniority: float = 0.10
     language: float = 0.10
-    salary: float = 0.00
+    salary: float = 0.10
     profile_focus: float = 0.05
 
     def as_dict(self) -> dict[str, float]:
@@ -70,81 +61,194 @@ class MatchingWeights:
         return {key: weight / total for key, weight in values.items()}
 
 
+WEIGHT_PROFILES = {
+    "default": MatchingWeights(),
+    # Local hiring: being in the offer's city matters more than the salary fit.
+    "local": MatchingWeights(
+        coverage=0.25,
+        title_similarity=0.15,
+        geo_fit=0.30,
+        seniority=0.10,
+        language=0.10,
+        salary=0.05,
+        profile_focus=0.05,
+    ),
+    # Remote roles: location is irrelevant, shared languages matter more.
+    "remote": MatchingWeights(
+        coverage=0.35,
+        title_similarity=0.20,
+        geo_fit=0.00,
+        seniority=0.10,
+        language=0.15,
+        salary=0.15,
+        profile_focus=0.05,
+    ),
+}
+
+DEFAULT_WEIGHTS = WEIGHT_PROFILES["default"].as_dict()
+
+
+def get_weight_profile(name: str | None) -> MatchingWeights:
+    """Return the weights of a named profile (the default one when ``name`` is empty)."""
+    if not name:
+        return WEIGHT_PROFILES["default"]
+    try:
+        return WEIGHT_PROFILES[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Profil de pondération inconnu : {name}. "
+            f"Valeurs possibles : {', '.join(WEIGHT_PROFILES)}."
+        ) from None
+
+
 class MatchingService:
     """Compute compatibility scores between candidates and job offers."""
 
-    def __init__(self, db: Session, weights: MatchingWeights | None = None):
+    def __init__(
+        self,
+        db: Session,
+        weights: MatchingWeights | None = None,
+        feature_store: MatchingFeatureStore | None = None,
+        match_scores: MatchScoreMaterializer | None = None,
+    ):
         """Wire repositories and optionally override component weights."""
+        self.db = db
         self.candidates = CandidateRepository(db)
         self.offers = OfferRepository(db)
+        self.features = feature_store or FEATURE_STORE
+        self.match_scores = match_scores or (MATCH_SCORES if MATCH_SCORES_ENABLED else None)
         self.weights = (weights or MatchingWeights()).as_dict()
         self.stop_words = {
             "le", "la", "les", "un", "une", "des", "et", "ou", "de", "du", "en", "au", "aux", 
             "ce", "cette", "pour", "par", "dans", "sur", "avec", "sans", "est", "sont", "a", 
             "the", "and", "of", "to", "in", "on", "with", "for", "is", "are", "it", "that", "this"
         }
-        # Define weights
-        self.weights = {
-            "coverage": 0.30,
-            "title_similarity": 0.20,
-            "geo_fit": 0.15,
-            "seniority": 0.10,
-            "language": 0.10,
-            "salary": 0.10,
-            "profile_focus": 0.05
-        } 
     #?========================================================================================================
     #? HERE IS just for a simple score
     #?========================================================================================================
 
+
     def score_candidate_for_offer(
         self,
         candidate_id: UUID,
         offer_id: UUID,
+        explain: bool = False,
     ) :
         #-> MatchingScoreResponse | None
         """Compute matching metrics for a candidate/offer pair."""
-        candidate = self.candidates.get(candidate_id)
-        offer = self.offers.get(offer_id)
-        
-        if candidate is None or offer is None:
+        batch = self.score_pairs([candidate_id], [offer_id], explain=explain)
+        if not batch.results:
             return None
-        score, matched_skills = self._score_candidate(candidate, offer)
-        response = MatchingScoreResponse(score=round(score, 4), matched_skills=matched_skills)
+        result = batch.results[0]
+        response = MatchingScoreResponse(
+            score=result.score,
+            matched_skills=result.matched_skills,
+            explanation=result.explanation,
+        )
         # APP_CACHE.set(cache_key, response)
         return response
+
+    def score_pairs(
+        self,
+        candidate_ids: Iterable[UUID],
+        offer_ids: Iterable[UUID],
+        explain: bool = False,
+    ) -> MatchingBatchResponse:
+        """Score every candidate against every offer, loading each side in one query."""
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        offer_ids = list(dict.fromkeys(offer_ids))
+        candidates = {
+            candidate.id: build_candidate_features(candidate)
+            for candidate in self.candidates.list_for_matching(candidate_ids)
+        }
+        offers = {
+            offer.id: build_offer_features(offer)
+            for offer in self.offers.list_for_matching(offer_ids)
+        }
+        found_candidates = [candidates[key] for key in candidate_ids if key in candidates]
+        found_offers = [offers[key] for key in offer_ids if key in offers]
+
+        engine = BatchScoringEngine(found_candidates, found_offers)
+        results: list[MatchingPairScore] = []
+        for offer in found_offers:
+            batch = engine.score_offer(offer, self.weights)
+            for candidate, score, components in zip(found_candidates, batch.scores, batch.components):
+                results.append(
+                    MatchingPairScore(
+                        candidate_id=candidate.id,
+                        offer_id=offer.id,
+                        score=round(float(score), 4),
+                        matched_skills=sorted(
+                            offer.skill_labels[key] for key in offer.skills & candidate.skills
+                        ),
+                        explanation=self._explain(components) if explain else None,
+                    )
+                )
+
+        return MatchingBatchResponse(
+            results=results,
+            missing_candidate_ids=[key for key in candidate_ids if key not in candidates],
+            missing_offer_ids=[key for key in offer_ids if key not in offers],
+        )
     
     
     def rank_candidates_for_offer(
         self,
         offer_id: UUID,
         limit: int = 10,
+        explain: bool = False,
     ) -> SourcingSearchResponse | None:
         """Rank candidates for a given offer and return a sourcing response."""
         # cache_key = make_cache_key("matching:rank_candidates", offer_id, limit=limit)
         # found, cached = APP_CACHE.get(cache_key)
         # if found:
         #     return cached
-        offer = self.offers.get(offer_id)
+        offer = self.features.offer(self.db, offer_id)
         if offer is None:
             return None
 
-        candidates = self.candidates.list()
-        matches: list[CandidateMatch] = []
-        for candidate in candidates:
-            score, matched_skills = self._score_candidate(candidate, offer)
-            matches.append(
-                CandidateMatch(
-                    id=candidate.id,
-                    name=self._candidate_public_name(candidate),
-                    score=round(score, 4),
-                    location=self._candidate_location(candidate),
-                    skills=matched_skills or self._candidate_skill_names(candidate),
+        engine = ENGINE_CACHE.get(self.features, self.db)
+        stored = None
+        if self.match_scores is not None and self.weights == DEFAULT_WEIGHTS:
+            stored = self.match_scores.top_candidates(
+                self.db, self.features, engine, offer_id, self.weights, limit
+            )
+        if stored is not None:
+            winners = [
+                (
+                    engine.candidates[engine.candidate_rows[row.candidate_id]],
+                    row.score,
+                    row.matched_skills,
+                    [getattr(row, name) for name in COMPONENTS],
                 )
+                for row in stored
+                if row.candidate_id in engine.candidate_rows
+            ]
+        else:
+            ranked = self._rank_offer(engine, offer, limit)
+            winners = [
+                (
+                    engine.candidates[row],
+                    score,
+                    sorted(offer.skill_labels[key] for key in offer.skills & engine.candidates[row].skills),
+                    components,
+                )
+                for row, score, components in zip(ranked.rows, ranked.scores, ranked.components)
+            ]
+
+        matches = [
+            CandidateMatch(
+                id=candidate.id,
+                name=candidate.display_name,
+                score=round(float(score), 4),
+                location=candidate.location,
+                skills=matched_skills or list(candidate.skill_names),
+                explanation=self._explain(components) if explain else None,
             )
+            for candidate, score, matched_skills, components in winners
+        ]
 
-        matches.sort(key=lambda match: match.score, reverse=True)
-        response = SourcingSearchResponse(candidates=matches[:limit])
+        response = SourcingSearchResponse(candidates=matches)
         # APP_CACHE.set(cache_key, response)
         return response
 
@@ -152,349 +256,82 @@ class MatchingService:
         self,
         candidate_id: UUID,
         limit: int = 10,
+        explain: bool = False,
     ) -> CandidateRecommendationsResponse | None:
         """Rank offers for a candidate and return a recommendation payload."""
         # cache_key = make_cache_key("matching:recommend_offers", candidate_id, limit=limit)
         # found, cached = APP_CACHE.get(cache_key)
         # if found:
         #     return cached
-        candidate = self.candidates.get(candidate_id)
+        candidate = self.features.candidate(self.db, candidate_id)
         if candidate is None:
             return None
 
-        offers = self.offers.list()
-        ranked_offers: list[JobOfferMatch] = []
-        for offer in offers:
-            score, matched_skills = self._score_candidate(candidate, offer)
-            ranked_offers.append(
-                JobOfferMatch(
-                    offer=offer_to_dto(offer),
-                    score=round(score, 4),
-                    matched_skills=matched_skills,
+        engine = ENGINE_CACHE.get(self.features, self.db)
+        stored = None
+        if self.match_scores is not None and self.weights == DEFAULT_WEIGHTS:
+            stored = self.match_scores.top_offers(
+                self.db, self.features, engine, candidate_id, self.weights, limit
+            )
+        if stored is not None:
+            winners = [
+                (
+                    round(row.score, 4),
+                    row.offer_id,
+                    list(row.matched_skills),
+                    [getattr(row, name) for name in COMPONENTS],
                 )
+                for row in stored
+            ]
+        else:
+            ranked = self._rank_candidate(engine, candidate, limit)
+            winners = []
+            for row, score, components in zip(ranked.rows, ranked.scores, ranked.components):
+                offer = engine.offers[row]
+                matched_skills = sorted(offer.skill_labels[key] for key in offer.skills & candidate.skills)
+                winners.append((round(float(score), 4), offer.id, matched_skills, components))
+
+        offers_by_id = {
+            offer.id: offer for offer in self.offers.list_by_ids(offer_id for _, offer_id, _, _ in winners)
+        }
+        ranked_offers = [
+            JobOfferMatch(
+                offer=offer_to_dto(offers_by_id[offer_id]),
+                score=score,
+                matched_skills=matched_skills,
+                explanation=self._explain(components) if explain else None,
             )
-
-        ranked_offers.sort(key=lambda item: item.score, reverse=True)
-        response = CandidateRecommendationsResponse(offers=ranked_offers[:limit])
+            for score, offer_id, matched_skills, components in winners
+            if offer_id in offers_by_id
+        ]
+        response = CandidateRecommendationsResponse(offers=ranked_offers)
         # APP_CACHE.set(cache_key, response)
         return response
 
-    # ------------------------------------------------------------------
-    # Component builders
-    # ------------------------------------------------------------------
-    def _compute_components(self, candidate, offer) -> tuple[dict[str, float], list[str]]:
-        """Break down the final matching score into weighted components."""
-        offer_skills, offer_skill_map = self._extract_offer_skills(offer)
-        candidate_skills = self._extract_candidate_skills(candidate)
-
-        overlap = offer_skills & candidate_skills
-        matched_skills = sorted(offer_skill_map[key] for key in overlap)
-
-        coverage = len(overlap) / len(offer_skills) if offer_skills else 0.0
-        profile_focus = (
-            len(overlap) / len(offer_skills | candidate_skills)
-            if offer_skills or candidate_skills
-            else 0.0
-        )
-
-        components = {
-            "coverage": coverage,
-            "title_similarity": self._title_similarity(candidate, offer),
-            "geo_fit": self._geo_fit(candidate, offer),
-            "seniority": self._seniority_fit(candidate, offer),
-            "language": self._language_fit(candidate, offer),
-            "salary": self._salary_fit(candidate, offer),
-            "profile_focus": profile_focus,
-        }
-        return components, matched_skills
-    
-
-    def _score_candidate(self, candidate, offer) -> tuple[float, list[str]]:
-        """Aggregate component scores into a final weighted score."""
-        components, matched_skills = self._compute_components(candidate, offer)
-        score = sum(self.weights[name] * value for name, value in components.items())
-        return score, matched_skills
-    
-
-    # ------------------------------------------------------------------
-    # Helpers
-    # ------------------------------------------------------------------
-    @staticmethod
-    def _normalize(value: str | None) -> str | None:
-        """Normalize raw text for comparisons."""
-        if value is None:
-            return None
-        normalized = value.strip().lower()
-        return normalized or None
-
-    def _extract_candidate_skills(self, candidate) -> set[str]:
-        """Return normalized skill names from a candidate entity."""
-        normalized: set[str] = set()
-        for skill in getattr(candidate, "skills", []) or []:
-            name = self._normalize(getattr(skill, "name", None))
-            if not name:
-                continue
-            normalized.add(name)
-        return normalized
-
-    def _extract_offer_skills(self, offer) -> tuple[set[str], dict[str, str]]:
-        """Return normalized offer skills and keep original labels."""
-        skill_map: dict[str, str] = {}
-        for tag in getattr(offer, "tags", []) or []:
-            name = self._normalize(getattr(tag, "nom", None))
-            if not name:
-                continue
-            skill_map[name] = tag.nom.strip()
-        return set(skill_map.keys()), skill_map
-
-    # --- coverage & similarity ---
-    def _title_similarity(self, candidate, offer) -> float:
-        """Score how similar candidate and offer titles/texts are."""
-        
-        offer_title = self._normalize(getattr(offer, "title", None))
-        candidate_titles = self._candidate_titles(candidate)
-        
-        candidate_text = " ".join(candidate_titles)
-        if not offer_title or not candidate_text:
-            return 0.0
-
-        ratio = SequenceMatcher(None, offer_title, candidate_text.lower()).ratio()
-
-        offer_tokens = set(self._tokenize(offer_title))
-        candidate_tokens = set(self._tokenize(candidate_text))
-        union = offer_tokens | candidate_tokens
-        
-        
-        
-        token_similarity = (len(offer_tokens & candidate_tokens) / len(union)) if union else 0.0
-        
-        result = 0.7 * ratio + 0.3 * token_similarity
-        
-        return result
+    def _rank_offer(self, engine: BatchScoringEngine, offer: OfferFeatures, limit: int) -> RankedRows:
+        """Rank candidates in memory; custom weights re-rank cached component vectors."""
+        if self.weights != DEFAULT_WEIGHTS:
+            return rank_components(COMPONENT_CACHE.offer_components(engine, offer), self.weights, limit)
+        return PARALLEL_RANKER.rank_offer(engine, offer, self.weights, limit)
 
-    def _candidate_titles(self, candidate) -> list[str]:
-        """Gather representative titles from a candidate profile."""
-        titles: list[str] = []
-        pref = getattr(candidate, "job_preferences", None)
-        raw_values = [
-            getattr(candidate, "professional_title", None),
-            getattr(pref, "desired_position", None) if pref else None,
-        ]
-        for exp in getattr(candidate, "experiences", []) or []:
-            if len(titles) >= 3:
-                break
-            raw_values.append(getattr(exp, "position", None))
-
-        for value in raw_values:
-            if not value:
-                continue
-            text = value.strip()
-            if text:
-                titles.append(text)
-        return titles
-
-    @staticmethod
-    def _tokenize(value: str) -> list[str]:
-        """Tokenize strings into normalized alphanumeric chunks."""
-        return re.findall(r"[a-z0-9]+", value.lower())
-
-    # --- geographic fit ---
-    def _geo_fit(self, candidate, offer) -> float:
-        """Evaluate geographic compatibility between candidate and offer."""
-        offer_country = self._normalize(getattr(offer, "work_country_location", None))
-        offer_cities = {
-            self._normalize(getattr(city, "city", None))
-            for city in getattr(offer, "cities", []) or []
-        }
-        offer_cities.discard(None)
+    def _rank_candidate(
+        self,
+        engine: BatchScoringEngine,
+        candidate: CandidateFeatures,
+        limit: int,
+    ) -> RankedRows:
+        """Rank offers in memory; custom weights re-rank cached component vectors."""
+        if self.weights != DEFAULT_WEIGHTS:
+            return rank_components(
+                COMPONENT_CACHE.candidate_components(engine, candidate),
+                self.weights,
+                limit,
+            )
+        return engine.rank_candidate(candidate, self.weights, limit)
 
-        pref = getattr(candidate, "job_preferences", None)
-        cand_country = self._normalize(getattr(pref, "country", None)) or self._normalize(
-            getattr(candidate, "country", None)
-        )
-        # cand_region = self._normalize(getattr(pref, "region", None)) or self._normalize(
-        #     getattr(candidate, "region", None)
-        # )
-        cand_city = self._normalize(getattr(pref, "city", None)) or self._normalize(
-            getattr(candidate, "city", None)
+    def _explain(self, components: Iterable[float]) -> MatchingExplanation:
+        """Expose the component values behind a score with the weights applied to them."""
+        return MatchingExplanation(
+            components={name: round(float(value), 4) for name, value in zip(COMPONENTS, components)},
+            weights=dict(self.weights),
         )
-        score = 0.0
-        if cand_city and cand_city in offer_cities:
-            score = 1.0
-        elif offer_country and cand_country and offer_country.lower() == cand_country.lower():
-            score = 0.5
-        
-        return score
-
-    # --- seniority / experience ---
-    def _seniority_fit(self, candidate, offer) -> float:
-        """Compare seniority expectations between the two profiles."""
-        candidate_level = self._normalize(getattr(candidate, "experience_level", None))
-        offer_level = self._infer_offer_seniority(offer)
-        if candidate_level and offer_level:
-            return 1.0 if candidate_level == offer_level else 0.3
-        if candidate_level or offer_level:
-            return 0.5
-        return 0.4
-
-    def _infer_offer_seniority(self, offer) -> str | None:
-        """Guess the seniority level of an offer using tags and text."""
-        for tag in getattr(offer, "tags", []) or []:
-            normalized = self._normalize(getattr(tag, "name", None))
-            if not normalized:
-                continue
-            mapped = SENIORITY_KEYWORDS.get(normalized)
-            if mapped:
-                return mapped
-
-        for text in (
-            getattr(offer, "title", None),
-            getattr(offer, "instructions", None),
-        ):
-            if not text:
-                continue
-            for token in self._tokenize(text):
-                mapped = SENIORITY_KEYWORDS.get(token)
-                if mapped:
-                    return mapped
-        return None
-
-    # --- languages ---
-    def _language_fit(self, candidate, offer) -> float:
-        """Compute how well a candidate's languages match offer requirements."""
-        candidate_languages = self._candidate_languages(candidate)
-        required_languages = self._offer_languages(offer)
-        
-        if not required_languages:
-            return 1.0
-        if not candidate_languages:
-            return 0.0
-        matches = candidate_languages & required_languages
-        
-        return len(matches) / len(required_languages)
-
-    def _candidate_languages(self, candidate) -> set[str]:
-        """Return normalized languages present on the candidate profile."""
-        normalized: set[str] = set()
-        for language in getattr(candidate, "languages", []) or []:
-            name = self._normalize(getattr(language, "language", None))
-            if not name:
-                continue
-            normalized_code = LANGUAGE_ALIASES.get(name, name)
-            normalized.add(normalized_code)
-        return normalized
-
-    def _offer_languages(self, offer) -> set[str]:
-        """Identify languages mentioned on the offer."""
-        normalized: set[str] = set()
-        for tag in getattr(offer, "tags", []) or []:
-            name = self._normalize(getattr(tag, "name", None))
-            if not name:
-                continue
-            code = LANGUAGE_ALIASES.get(name)
-            if code:
-                normalized.add(code)
-
-        for entry in getattr(offer, "languages", []) or []:
-            name = self._normalize(getattr(entry, "language", None))
-            if not name:
-                continue
-            normalized.add(LANGUAGE_ALIASES.get(name, name))
-
-        title = getattr(offer, "title", None)
-        instructions = getattr(offer, "instructions", None)
-        for text in (title, instructions):
-            if not text:
-                continue
-            for token in self._tokenize(text):
-                code = LANGUAGE_ALIASES.get(token)
-                if code:
-                    normalized.add(code)
-        return normalized
-
-    # --- salary fit ---
-    def _salary_fit(self, candidate, offer) -> float:
-        """Compare salary expectations to offer salary range."""
-        expectation = self._parse_salary_expectation(candidate)
-        offer_min, offer_max = self._parse_salary_range(getattr(offer, "salary", None))
-        if expectation is None or (offer_min is None and offer_max is None):
-            return 0.5
-
-        min_salary = offer_min or offer_max or expectation
-        max_salary = offer_max or min_salary
-        if min_salary <= expectation <= max_salary:
-            return 1.0
-
-        if expectation < min_salary:
-            diff_ratio = (min_salary - expectation) / max(min_salary, 1)
-        else:
-            diff_ratio = (expectation - max_salary) / max(max_salary, 1)
-
-        return max(0.0, 1.0 - diff_ratio)
-
-    def _parse_salary_expectation(self, candidate) -> float | None:
-        """Extract a float value from salary expectations."""
-        pref = getattr(candidate, "job_preferences", None)
-        if pref is None:
-            return None
-        raw_value = getattr(pref, "pretentions_salarial", None)
-        if not raw_value:
-            return None
-        digits = re.findall(r"\d+(?:[.,]\d+)?", raw_value.replace(" ", ""))
-        if not digits:
-            return None
-        normalized = digits[0].replace(",", ".")
-        try:
-            return float(normalized)
-        except ValueError:
-            return None
-
-    @staticmethod
-    def _parse_salary_range(raw_value: str | None) -> tuple[float | None, float | None]:
-        """Parse a salary string and return min/max floats."""
-        if not raw_value:
-            return (None, None)
-        digits = re.findall(r"\d+(?:[.,]\d+)?", raw_value.replace(" ", ""))
-        values: list[float] = []
-        for entry in digits[:2]:
-            normalized = entry.replace(",", ".")
-            try:
-                values.append(float(normalized))
-            except ValueError:
-                continue
-        if not values:
-            return (None, None)
-        if len(values) == 1:
-            return (values[0], None)
-        first, second = values[:2]
-        return (min(first, second), max(first, second))
-
-    # --- candidate helpers for responses ---
-    def _candidate_public_name(self, candidate) -> str:
-        """Return a display-friendly full name for the candidate."""
-        first = (getattr(candidate, "first_name", "") or "").strip()
-        last = (getattr(candidate, "last_name", "") or "").strip()
-        full_name = f"{first} {last}".strip()
-        if full_name:
-            return full_name
-        fallback = getattr(candidate, "professional_title", None)
-        return fallback or "Profil anonyme"
-
-    def _candidate_location(self, candidate) -> str | None:
-        """Return the most specific known candidate location."""
-        city = getattr(candidate, "city", None)
-        region = getattr(candidate, "region", None)
-        country = getattr(candidate, "country", None)
-        for part in (city, region, country):
-            if part:
-                return part
-        return None
-
-    def _candidate_skill_names(self, candidate) -> list[str]:
-        """Return human-readable candidate skill names."""
-        names: list[str] = []
-        for skill in getattr(candidate, "skills", []) or []:
-            title = getattr(skill, "name", None)
-            if title:
-                names.append(title)
-        return names
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Sequence
+from difflib import SequenceMatcher
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+logger = logging.getLogger(__name__)
+
+# Weight of the character ratio vs. the token Jaccard in the title similarity.
+RATIO_WEIGHT = 0.7
+TOKEN_WEIGHT = 0.3
+
+# rapidfuzz's ``fuzz.ratio`` is the normalized Indel (LCS) similarity while
+# difflib uses Ratcliff/Obershelp matching blocks. Both use 2*M/T, and the
+# matching blocks are a common subsequence, so the rapidfuzz ratio is never
+# lower than difflib's. On our title corpus the gap is 0 at the median, about
+# 0.08 at p90 and at most 0.26. That moves the title similarity by at most
+# 0.7 * 0.26 and, with the default 0.20 title weight, the final score by less
+# than this tolerance:
+RAPIDFUZZ_SCORE_TOLERANCE = 0.04
+
+# Float slack added when a rapidfuzz ratio is used as an upper bound of difflib.
+_BOUND_EPSILON = 1e-9
+
+
+class DifflibBackend:
+    """Reference backend: ``difflib.SequenceMatcher`` pair by pair."""
+
+    name = "difflib"
+    bounds_are_exact = False
+
+    def ratio(self, query: str, choice: str) -> float:
+        return SequenceMatcher(None, query, choice).ratio()
+
+    def ratios(self, query: str, choices: Sequence[str], reverse: bool = False) -> np.ndarray:
+        """Ratio of ``query`` against each choice (``choice`` first if ``reverse``)."""
+        pairs = ((choice, query) if reverse else (query, choice) for choice in choices)
+        return np.fromiter(
+            (SequenceMatcher(None, first, second).ratio() for first, second in pairs),
+            dtype=np.float64,
+            count=len(choices),
+        )
+
+    def ratio_bounds(self, query: str, choices: Sequence[str], reverse: bool = False) -> np.ndarray:
+        return np.ones(len(choices), dtype=np.float64)
+
+
+class CompatBackend(DifflibBackend):
+    """difflib scores, with batched rapidfuzz ratios as pruning upper bounds.
+
+    Scores are identical to ``DifflibBackend``; rapidfuzz only tightens the
+    bound used by the top-k early termination so fewer difflib calls run.
+    """
+
+    name = "compat"
+
+    def ratio_bounds(self, query: str, choices: Sequence[str], reverse: bool = False) -> np.ndarray:
+        # The Indel ratio is symmetric and bounds difflib in either order.
+        if not choices:
+            return np.empty(0, dtype=np.float64)
+        scores = process.cdist([query], choices, scorer=fuzz.ratio, dtype=np.float64)[0]
+        return np.minimum(scores / 100 + _BOUND_EPSILON, 1.0)
+
+
+class RapidfuzzBackend:
+    """rapidfuzz Indel ratio computed in one C-level ``cdist`` call per batch.
+
+    Scores stay within ``RAPIDFUZZ_SCORE_TOLERANCE`` of the difflib values.
+    """
+
+    name = "rapidfuzz"
+    bounds_are_exact = True
+
+    def ratio(self, query: str, choice: str) -> float:
+        return fuzz.ratio(query, choice) / 100
+
+    def ratios(self, query: str, choices: Sequence[str], reverse: bool = False) -> np.ndarray:
+        # The Indel ratio is symmetric, so ``reverse`` does not change the result.
+        if not choices:
+            return np.empty(0, dtype=np.float64)
+        return process.cdist([query], choices, scorer=fuzz.ratio, dtype=np.float64)[0] / 100
+
+    def ratio_bounds(self, query: str, choices: Sequence[str], reverse: bool = False) -> np.ndarray:
+        return self.ratios(query, choices)
+
+
+TitleSimilarityBackend = DifflibBackend | CompatBackend | RapidfuzzBackend
+
+_BACKENDS = {
+    backend.name: backend
+    for backend in (DifflibBackend, CompatBackend, RapidfuzzBackend)
+}
+
+
+def get_title_backend(name: str | None) -> TitleSimilarityBackend:
+    """Instantiate a backend by name, defaulting to rapidfuzz."""
+    backend = _BACKENDS.get((name or "").strip().lower())
+    if backend is None:
+        if name:
+            logger.warning("Unknown title similarity backend %r, using rapidfuzz", name)
+        backend = RapidfuzzBackend
+    return backend()
+
+
+TITLE_BACKEND = get_title_backend(os.getenv("MATCHING_TITLE_BACKEND"))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.repositories.change_log_repository import WATERMARK_MARGIN, ChangeLogRepository
+from app.repositories.offer_repository import OfferRepository
+from app.repositories.offer_search_repository import OfferSearchRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class OfferDocumentIndexer:
+    """Keep the ``job_offer_search`` documents in step with the offers.
+
+    Like the matching feature store, a refresh runs at most once per interval
+    and only rebuilds the documents of offers updated since the previous one,
+    plus offers that have no document yet. A periodic full rebuild catches
+    changes that bypass every timestamp (e.g. a rewritten description large
+    object). Offers whose tags changed are found through the
+    ``entity_changes`` log. Offers created between two refreshes are found
+    by the search once the next refresh has indexed them.
+    """
+
+    def __init__(
+        self,
+        refresh_interval_seconds: int = 30,
+        full_rebuild_seconds: int = 3600,
+    ):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self._watermark: datetime | None = None
+        self._checked_at = 0.0
+        self._built_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Bring the documents up to date when the interval elapsed."""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._watermark is not None
+                and now - self._checked_at < self.refresh_interval_seconds
+            ):
+                return
+
+            watermark = ChangeLogRepository(db).watermark()
+            repo = OfferSearchRepository(db)
+            if now - self._built_at >= self.full_rebuild_seconds:
+                repo.upsert_documents()
+                self._built_at = now
+            else:
+                # On process start, resume from the last document written by
+                # any process; offers without a document are caught below.
+                since = self._watermark
+                if since is None and (last_indexed_at := repo.last_indexed_at()) is not None:
+                    since = last_indexed_at - WATERMARK_MARGIN
+                if since is not None:
+                    repo.upsert_documents(OfferRepository(db).list_ids_updated_since(since))
+                repo.index_missing()
+            db.commit()
+            self._watermark = watermark
+            self._checked_at = now
+
+
+OFFER_DOCUMENTS = OfferDocumentIndexer(
+    refresh_interval_seconds=int(os.getenv("OFFER_SEARCH_REFRESH_SECONDS", "30")),
+    full_rebuild_seconds=int(os.getenv("OFFER_SEARCH_FULL_REBUILD_SECONDS", "86400")),
+)
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.db.session import run_in_session
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.repositories.offer_repository import OfferRepository
+from app.repositories.search_repository import FACETS, SearchRepository
+from app.schemas import SearchCreate
+from app.services.dto_mappers import offer_to_dto
+from app.utils.background import BackgroundRefresher
+from app.utils.pagination import Page, decode_cursor, encode_cursor
+from app.utils.search_filters import (
+    OFFER_SEARCH_ENGINE,
+    SEARCH_TRGM_ENABLED,
+    as_list,
+    enum_to_str,
+    normalize,
+    parse_datetime,
+    split_terms,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_BATCH_SIZE = 1000
+
+# Substring lookups memoized per snapshot before the memo is reset.
+_MAX_MEMO_ENTRIES = 10_000
+
+
+@dataclass(frozen=True)
+class IndexedOffer:
+    """Normalized search fields of one published offer."""
+
+    id: UUID
+    title: str | None
+    title_tokens: frozenset[str]
+    tag_tokens: frozenset[str]
+    contract_type: str | None
+    country: str | None
+    cities: frozenset[str]
+    languages: frozenset[str]
+    published_at: datetime | None
+    facet_labels: tuple[tuple[str, str, str], ...] = ()
+
+
+def index_offer(offer) -> IndexedOffer:
+    """Extract the searchable fields of an offer loaded with its relationships."""
+    title = normalize(offer.title)
+    tag_tokens = set()
+    for tag in offer.tags or []:
+        tag_tokens.update((normalize(tag.name) or "").split())
+    # (facet, posting key, displayed value) triples.
+    facet_labels = [("contract_type", offer.contract_type, offer.contract_type)]
+    facet_labels.append(
+        ("country", normalize(offer.work_country_location), offer.work_country_location)
+    )
+    facet_labels.extend(("city", normalize(city.city), city.city) for city in offer.cities or [])
+    facet_labels.extend(
+        ("language", normalize(language.language), language.language)
+        for language in offer.languages or []
+    )
+    return IndexedOffer(
+        id=offer.id,
+        title=title,
+        title_tokens=frozenset((title or "").split()),
+        tag_tokens=frozenset(tag_tokens),
+        contract_type=offer.contract_type,
+        country=normalize(offer.work_country_location),
+        cities=frozenset(filter(None, (normalize(city.city) for city in offer.cities or []))),
+        languages=frozenset(
+            filter(None, (normalize(language.language) for language in offer.languages or []))
+        ),
+        published_at=offer.published_at,
+        facet_labels=tuple(label for label in facet_labels if label[1]),
+    )
+
+
+def _order_key(published_at: datetime | None, offer_id: UUID) -> tuple:
+    """Publication date descending (missing dates last), then id: the database order."""
+    age = datetime.max - published_at if published_at is not None else timedelta(0)
+    return (published_at is None, age, offer_id)
+
+
+def _rows(bits: int) -> Iterator[int]:
+    """Set bits of a bitset, lowest (best ranked) first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def _bitset(rows: Iterable[int]) -> int:
+    """Bitset of ``rows``, built in one pass rather than by repeated big-int ORs."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    buffer = bytearray(max(rows) // 8 + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _postings(values: Iterable[tuple[int, Iterable[str]]]) -> dict[str, int]:
+    """Bitset per key, each converted once from its row list."""
+    rows: dict[str, list[int]] = {}
+    for row, keys in values:
+        for key in keys:
+            rows.setdefault(key, []).append(row)
+    return {key: _bitset(key_rows) for key, key_rows in rows.items()}
+
+
+class _Snapshot:
+    """Immutable bitset index over the published offers.
+
+    Row ``i`` is the ``i``-th offer in the database order (publication date
+    descending, then id), so a bitset iterated from its lowest bit is already
+    sorted, and the publication date filter is a prefix of the rows.
+    """
+
+    def __init__(self, offers: Iterable[IndexedOffer]):
+        self.offers = sorted(offers, key=lambda offer: _order_key(offer.published_at, offer.id))
+        self.keys = [_order_key(offer.published_at, offer.id) for offer in self.offers]
+        self.all = (1 << len(self.offers)) - 1
+        rows = list(enumerate(self.offers))
+        self.title_postings = _postings((row, offer.title_tokens) for row, offer in rows)
+        self.tag_postings = _postings((row, offer.tag_tokens) for row, offer in rows)
+        self.contract_postings = _postings(
+            (row, [offer.contract_type]) for row, offer in rows if offer.contract_type
+        )
+        self.country_postings = _postings((row, [offer.country]) for row, offer in rows if offer.country)
+        self.city_postings = _postings((row, offer.cities) for row, offer in rows)
+        self.language_postings = _postings((row, offer.languages) for row, offer in rows)
+        self.untitled = _bitset(row for row, offer in rows if offer.title is None)
+        # Ages of the dated offers, ascending: they are the first rows.
+        self.ages = [datetime.max - offer.published_at for offer in self.offers if offer.published_at]
+        self.facet_postings = {
+            "contract_type": self.contract_postings,
+            "country": self.country_postings,
+            "city": self.city_postings,
+            "language": self.language_postings,
+        }
+        # Like the database facets, a group is shown under its smallest spelling.
+        self.facet_labels: dict[str, dict[str, str]] = {name: {} for name in FACETS}
+        for offer in self.offers:
+            for name, key, label in offer.facet_labels:
+                labels = self.facet_labels[name]
+                if key not in labels or label < labels[key]:
+                    labels[key] = label
+        self._memo: dict[tuple[int, str], int] = {}
+
+    def _containing(self, postings: dict[str, int], text: str) -> int:
+        """Rows with a posting key containing ``text`` (the LIKE '%text%' of one token)."""
+        memo_key = (id(postings), text)
+        bits = self._memo.get(memo_key)
+        if bits is None:
+            bits = 0
+            for key, rows in postings.items():
+                if text in key:
+                    bits |= rows
+            if len(self._memo) >= _MAX_MEMO_ENTRIES:
+                self._memo.clear()
+            self._memo[memo_key] = bits
+        return bits
+
+    def _title_containing(self, text: str) -> int:
+        """Rows whose normalized title contains ``text``."""
+        if len(text.split()) > 1:
+            return _bitset(
+                row
+                for row, offer in enumerate(self.offers)
+                if offer.title and text in offer.title
+            )
+        return self._containing(self.title_postings, text)
+
+    def match(self, payload: SearchCreate, date_publication: datetime | None) -> int:
+        """Bitset of the offers ``SearchRepository.search_by_payload`` would return."""
+        bits = self.all
+
+        terms = [term for term in (normalize(term) for term in split_terms(payload.query or "")) if term]
+        if terms:
+            text_bits = 0
+            for term in terms:
+                text_bits |= self._title_containing(term) | self._containing(self.tag_postings, term)
+            bits &= text_bits
+
+        if payload.country:
+            bits &= self.country_postings.get(normalize(payload.country), 0)
+
+        if payload.city:
+            bits &= self.city_postings.get(normalize(payload.city), 0)
+
+        contract_values = as_list(getattr(payload, "type_contrat", None) or payload.contract_type)
+        if contract_values:
+            contract_bits = 0
+            for value in contract_values:
+                contract_bits |= self.contract_postings.get(enum_to_str(value), 0)
+            bits &= contract_bits
+
+        language = normalize(payload.language)
+        if language:
+            bits &= self._title_containing(language) | self._containing(self.language_postings, language)
+
+        if date_publication is not None:
+            dated = bisect.bisect_right(self.ages, datetime.max - date_publication)
+            bits &= (1 << dated) - 1
+
+        return bits
+
+    def facets(self, bits: int) -> dict[str, list[tuple[str, int]]]:
+        """Count the matches per facet value in one pass over the facet postings."""
+        counts: dict[str, list[tuple[str, int]]] = {}
+        for name in FACETS:
+            labels = self.facet_labels[name]
+            values = [
+                (labels[key], count)
+                for key, rows in self.facet_postings[name].items()
+                if (count := (rows & bits).bit_count())
+            ]
+            values.sort(key=lambda item: (-item[1], item[0]))
+            counts[name] = values
+        return counts
+
+    def groups(self, payload: SearchCreate, bits: int) -> list[tuple[bool | None, int]]:
+        """Split matches by the LIKE relevance key, in its sort order (true, false, null)."""
+        phrase = normalize(" ".join(split_terms(payload.query or "")))
+        if not phrase:
+            return [(None, bits)]
+        relevant = self._title_containing(phrase) & bits
+        untitled = self.untitled & bits
+        return [(True, relevant), (False, bits & ~relevant & ~untitled), (None, untitled)]
+
+    def page(
+        self,
+        groups: list[tuple[bool | None, int]],
+        has_relevance: bool,
+        page: int,
+        size: int,
+        cursor: str | None,
+    ) -> Page:
+        """Slice the ordered matches exactly like ``paginate`` does on the database.
+
+        The items of the returned page are offer ids, in order.
+        """
+        total = sum(bits.bit_count() for _, bits in groups)
+        if cursor is None:
+            served_before = page * size
+            skip = served_before
+            remaining = [bits for _, bits in groups]
+        elif not cursor:
+            served_before = 0
+            page = 0
+            skip = 0
+            remaining = [bits for _, bits in groups]
+        else:
+            served_before, values = decode_cursor(cursor, 3 if has_relevance else 2)
+            page = served_before // size
+            skip = 0
+            relevance = values[0] if has_relevance else None
+            position = bisect.bisect_right(self.keys, _order_key(*values[-2:]))
+            after = ~((1 << position) - 1)
+            labels = [label for label, _ in groups]
+            current = labels.index(relevance) if relevance in labels else len(labels)
+            remaining = [
+                0 if index < current else bits & after if index == current else bits
+                for index, (_, bits) in enumerate(groups)
+            ]
+
+        items: list[IndexedOffer] = []
+        item_labels: list[bool | None] = []
+        for (label, _), bits in zip(groups, remaining):
+            count = bits.bit_count()
+            if skip >= count:
+                skip -= count
+                continue
+            for row in _rows(bits):
+                if skip:
+                    skip -= 1
+                    continue
+                if len(items) == size:
+                    break
+                items.append(self.offers[row])
+                item_labels.append(label)
+            if len(items) == size:
+                break
+
+        served = served_before + len(items)
+        remaining_count = sum(bits.bit_count() for bits in remaining)
+        next_cursor = None
+        if items and (served < total if cursor is None else len(items) < remaining_count):
+            last = items[-1]
+            values = [last.published_at, last.id]
+            if has_relevance:
+                values.insert(0, item_labels[-1])
+            next_cursor = encode_cursor(served, values)
+        return Page(
+            items=[offer.id for offer in items],
+            total=total,
+            page=page,
+            next_cursor=next_cursor,
+        )
+
+
+class OfferSearchIndex:
+    """In-process search index over the published offers.
+
+    Answers ``search_by_payload`` requests from bitsets (one per contract
+    type, country, city and language, plus substring lookups over title and
+    tag token postings) without querying the database, with the same
+    results, order and cursors as the database path. Only the offers of the
+    requested page are then loaded, so their DTOs (recruiter and company
+    fields included) are always current. Requests whose semantics it cannot
+    reproduce (ranked full-text or trigram search, fuzzy locations, time-zone
+    aware dates) return None and use the database.
+
+    Like the matching feature store, the index polls ``updated_at`` and the
+    ``entity_changes`` log at most once per interval and reloads only changed
+    offers; a periodic full rebuild catches what neither records (e.g. a
+    renamed city). Refreshes run on a background thread with their own
+    session and swap the new snapshot in when built; the database answers
+    until the first one is ready.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        refresh_interval_seconds: int = 30,
+        full_rebuild_seconds: int = 3600,
+    ):
+        self.enabled = enabled
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self._offers: dict[UUID, IndexedOffer] = {}
+        self._snapshot: _Snapshot | None = None
+        self._watermark: datetime | None = None
+        self._built_at = 0.0
+        self._refresher = BackgroundRefresher(
+            "offer-search-index",
+            refresh_interval_seconds,
+            lambda: run_in_session(self.update),
+        )
+
+    def supports(self, payload: SearchCreate | None) -> bool:
+        """Tell whether the index reproduces the database search for ``payload``.
+
+        Text queries are only answered with the "like" engine: the "fts" and
+        "trgm" engines match and rank differently, so the database answers them.
+        """
+        if not self.enabled or payload is None or SEARCH_TRGM_ENABLED:
+            return False
+        if OFFER_SEARCH_ENGINE != "like" and split_terms(payload.query or ""):
+            return False
+        date_publication = parse_datetime(payload.date_publication)
+        return date_publication is None or date_publication.tzinfo is None
+
+    def search(
+        self,
+        db: Session,
+        payload: SearchCreate | None,
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page | None:
+        """Return one page of offer DTOs, or None when the database must answer."""
+        if not self.supports(payload):
+            return None
+        self.refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        bits = snapshot.match(payload, parse_datetime(payload.date_publication))
+        groups = snapshot.groups(payload, bits)
+        result = snapshot.page(groups, groups[0][0] is not None, page, size, cursor)
+        offers = {offer.id: offer for offer in SearchRepository(db).list_published(result.items)}
+        result = replace(
+            result,
+            items=[offer_to_dto(offers[offer_id]) for offer_id in result.items if offer_id in offers],
+        )
+        if facets:
+            result = replace(result, facets=snapshot.facets(bits))
+        return result
+
+    def refresh(self, force: bool = False) -> None:
+        """Start a background refresh when the interval elapsed and none is running."""
+        self._refresher.trigger(force)
+
+    def update(self, db: Session) -> None:
+        """Bring the index up to date with the database, then swap the new snapshot in."""
+        now = time.monotonic()
+        watermark = ChangeLogRepository(db).watermark()
+        repo = SearchRepository(db)
+        if self._snapshot is None or now - self._built_at >= self.full_rebuild_seconds:
+            offers = {offer.id: index_offer(offer) for offer in repo.list_published()}
+            self._built_at = now
+            changed = offers != self._offers
+        else:
+            offers = dict(self._offers)
+            current = set(repo.list_published_ids())
+            removed = set(offers) - current
+            for offer_id in removed:
+                offers.pop(offer_id, None)
+            updated = set(OfferRepository(db).list_ids_updated_since(self._watermark))
+            stale = list((current - set(offers)) | (updated & current))
+            changed = bool(removed)
+            for start in range(0, len(stale), _REFRESH_BATCH_SIZE):
+                for offer in repo.list_published(stale[start:start + _REFRESH_BATCH_SIZE]):
+                    indexed = index_offer(offer)
+                    changed |= offers.get(offer.id) != indexed
+                    offers[offer.id] = indexed
+
+        if changed or self._snapshot is None:
+            snapshot = _Snapshot(offers.values())
+            self._offers = offers
+            self._snapshot = snapshot
+            logger.info("Offer search index holds %d published offers", len(offers))
+        self._watermark = watermark
+
+
+OFFER_SEARCH_INDEX = OfferSearchIndex(
+    enabled=os.getenv("OFFER_SEARCH_INDEX_ENABLED", "true").lower() in ("1", "true", "yes"),
+    refresh_interval_seconds=int(os.getenv("OFFER_SEARCH_INDEX_REFRESH_SECONDS", "30")),
+    full_rebuild_seconds=int(os.getenv("OFFER_SEARCH_INDEX_FULL_REBUILD_SECONDS", "3600")),
+)
@@ -4,6 +4,7 @@ from uuid import UUID
 
 from sqlalchemy.orm import Session
 
+from app.db.session import run_in_session
 from app.repositories.recruiter_repository import RecruiterRepository
 from app.schemas import RecruiterRead
 from app.utils.cache import APP_CACHE, make_cache_key
@@ -14,25 +15,25 @@ class RecruiterService:
 
     def __init__(self, db: Session):
         """Inject dependencies."""
+        self.db = db
         self.repo = RecruiterRepository(db)
 
     def list_recruiters(self) -> list[RecruiterRead]:
         """Return every recruiter profile mapped to schema."""
-        cache_key = make_cache_key("recruiters:list")
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-        recruiters = [RecruiterRead.model_validate(rec) for rec in self.repo.list()]
-        APP_CACHE.set(cache_key, recruiters)
-        return recruiters
+        return APP_CACHE.get_or_compute(
+            make_cache_key("recruiters:list"),
+            lambda: self._load_recruiters(self.db),
+            refresh=lambda: run_in_session(self._load_recruiters),
+        )
+
+    @staticmethod
+    def _load_recruiters(db: Session) -> list[RecruiterRead]:
+        return [RecruiterRead.model_validate(rec) for rec in RecruiterRepository(db).list()]
 
     def get_recruiter(self, recruiter_id: UUID) -> RecruiterRead | None:
         """Retrieve a single recruiter by identifier."""
-        cache_key = make_cache_key("recruiters:get", recruiter_id)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-        recruiter = self.repo.get(recruiter_id)
-        recruiter_read = RecruiterRead.model_validate(recruiter) if recruiter else None
-        APP_CACHE.set(cache_key, recruiter_read)
-        return recruiter_read
+        def _load() -> RecruiterRead | None:
+            recruiter = self.repo.get(recruiter_id)
+            return RecruiterRead.model_validate(recruiter) if recruiter else None
+
+        return APP_CACHE.get_or_compute(make_cache_key("recruiters:get", recruiter_id), _load)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from uuid import UUID
 
 from sqlalchemy.orm import Session
@@ -7,10 +8,13 @@ from sqlalchemy.orm import Session
 from app.models.enums import SearchTarget, SearchType
 from app.repositories.search_repository import SearchRepository
 from app.repositories.user_repository import UserRepository
-from app.schemas import JobOfferDto, SearchCreate
+from app.schemas import SearchCreate
 from app.services.dto_mappers import offer_to_dto
+from app.services.offer_fulltext import OFFER_DOCUMENTS
+from app.services.offer_search_index import OFFER_SEARCH_INDEX
 from app.utils.cache import APP_CACHE, make_cache_key
-from app.utils.search_filters import as_list
+from app.utils.pagination import Page
+from app.utils.search_filters import OFFER_SEARCH_ENGINE, as_list
 
 
 class SearchService:
@@ -18,25 +22,35 @@ class SearchService:
 
     def __init__(self, db: Session):
         """Initialize repositories used for search workflows."""
+        self.db = db
         self.repo = SearchRepository(db)
         self.user_repo = UserRepository(db)
 
-    def search_by_payload(self, payload: SearchCreate) -> list[JobOfferDto]:
-        """Search offers with explicit payload filters."""
+    def search_by_payload(
+        self,
+        payload: SearchCreate,
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page:
+        """Search offers with explicit payload filters; return one page of DTOs."""
         # cache_key = make_cache_key("search:payload", payload)
         # found, cached = APP_CACHE.get(cache_key)
         # if found:
         #     return cached
-        offers = [offer_to_dto(offer) for offer in self.repo.search_by_payload(payload)]
-        # APP_CACHE.set(cache_key, offers)
-        return offers
+        return self._search_payload(payload, page, size, cursor, facets)
 
 
     def search_for_candidate_by_user(
         self,
         user_id: UUID,
         payload: SearchCreate | None = None,
-    ) -> list[JobOfferDto] | None:
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page | None:
         """Search offers for a given user, enriching filters with candidate data."""
         candidate = self.user_repo.get_candidate_by_user_id(user_id)
         
@@ -45,40 +59,42 @@ class SearchService:
             if user is None: 
                 return None
             else:
-                cache_key = make_cache_key("search:by_user", user_id, payload=payload)
-                found, cached = APP_CACHE.get(cache_key)
-                if found:
-                    self.repo.record_search(user_id, payload)
-                    return cached
-                offers = [offer_to_dto(offer) for offer in self.repo.search_by_payload(payload)]
+                result = APP_CACHE.get_or_compute(
+                    make_cache_key("search:by_user", user_id, page, size, cursor, facets, payload=payload),
+                    lambda: self._search_payload(payload, page, size, cursor, facets),
+                )
                 self.repo.record_search(user_id, payload)
-                APP_CACHE.set(cache_key, offers)
-                return offers
+                return result
 
         filters = payload.model_dump(exclude_none=True) if payload else None
-        cache_key = make_cache_key("search:by_candidate", user_id, filters=filters)
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            self.repo.record_search(user_id, payload)
-            return cached
-        offers = [offer_to_dto(offer) for offer in self.repo.search_for_candidate(candidate, payload,filters)]
+        def _search() -> Page:
+            self._refresh_documents()
+            return self._to_dtos(
+                self.repo.search_for_candidate(candidate, payload, filters, page, size, cursor, facets)
+            )
+
+        result = APP_CACHE.get_or_compute(
+            make_cache_key("search:by_candidate", user_id, page, size, cursor, facets, filters=filters),
+            _search,
+        )
         self.repo.record_search(user_id, payload)
-        APP_CACHE.set(cache_key, offers)
-        return offers
+        return result
 
     def recommend_offers_from_search_history(
         self,
         user_id: UUID,
         history_limit: int = 5,
-    ) -> list[JobOfferDto] | None:
-        """Recommend offers using the user's recent search history."""
+        page: int = 0,
+        size: int = 10,
+    ) -> Page | None:
+        """Recommend offers using the user's recent search history; return one page of DTOs."""
         user = self.user_repo.get(user_id)
         if user is None:
             return None
 
         searches = self.repo.list_recent_searches_by_user(user_id, history_limit)
         if not searches:
-            return []
+            return Page(page=page)
 
         search_ids = [search.id for search in searches]
         cache_key = make_cache_key(
@@ -86,15 +102,38 @@ class SearchService:
             user_id,
             history_limit,
             search_ids,
+            page,
+            size,
+        )
+        return APP_CACHE.get_or_compute(
+            cache_key,
+            lambda: self._search_payload(self._build_payload_from_history(searches), page, size),
         )
-        found, cached = APP_CACHE.get(cache_key)
-        if found:
-            return cached
-
-        payload = self._build_payload_from_history(searches)
-        offers = [offer_to_dto(offer) for offer in self.repo.search_by_payload(payload)]
-        APP_CACHE.set(cache_key, offers)
-        return offers
+
+    def _search_payload(
+        self,
+        payload: SearchCreate,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+        facets: bool = False,
+    ) -> Page:
+        """Answer a payload search from the in-memory index, or from the database."""
+        result = OFFER_SEARCH_INDEX.search(self.db, payload, page, size, cursor, facets)
+        if result is not None:
+            return result
+        self._refresh_documents()
+        return self._to_dtos(self.repo.search_by_payload(payload, page, size, cursor, facets))
+
+    def _refresh_documents(self) -> None:
+        """Index recently changed offers before a full-text search."""
+        if OFFER_SEARCH_ENGINE == "fts":
+            OFFER_DOCUMENTS.refresh(self.db)
+
+    @staticmethod
+    def _to_dtos(page: Page) -> Page:
+        """Map the offers of a page to DTOs."""
+        return replace(page, items=[offer_to_dto(offer) for offer in page.items])
 
     def _build_payload_from_history(self, searches) -> SearchCreate:
         """Build a search payload from recent search entries."""
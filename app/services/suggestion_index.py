@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.db.session import run_in_session
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.repositories.offer_repository import OfferRepository
+from app.repositories.search_repository import SearchRepository
+from app.repositories.suggestion_repository import SuggestionRepository
+from app.utils.background import BackgroundRefresher
+from app.utils.search_filters import normalize
+
+
+logger = logging.getLogger(__name__)
+
+TITLE = "title"
+TAG = "tag"
+SKILL = "skill"
+CITY = "city"
+SUGGESTION_TYPES = (TITLE, TAG, SKILL, CITY)
+
+_REFRESH_BATCH_SIZE = 1000
+
+# Prefixes up to this length match too many keys to scan per keystroke;
+# their best suggestions are precomputed instead.
+_SHORT_PREFIX_LENGTH = 2
+_SHORT_PREFIX_DEPTH = 50
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """One completion with the frequencies it is ranked by."""
+
+    value: str
+    type: str
+    key: str
+    documents: int
+    searches: int
+
+
+def _rank(suggestion: Suggestion) -> tuple:
+    """Most searched first, then most used, then alphabetical."""
+    return (-suggestion.searches, -suggestion.documents, suggestion.value)
+
+
+def _word_suffixes(key: str) -> list[str]:
+    """The key from each word start, so "python" completes "developpeur python"."""
+    return [key[index:] for index in range(len(key)) if index == 0 or key[index - 1] == " "]
+
+
+class _Snapshot:
+    """Immutable prefix index: suggestions in rank order and their sorted word suffixes."""
+
+    def __init__(self, suggestions: Iterable[Suggestion]):
+        self.suggestions = sorted(suggestions, key=_rank)
+        pairs = sorted(
+            (suffix, index)
+            for index, suggestion in enumerate(self.suggestions)
+            for suffix in _word_suffixes(suggestion.key)
+        )
+        self.keys = [suffix for suffix, _ in pairs]
+        self.indices = [index for _, index in pairs]
+        self.short: dict[str, list[int]] = {}
+        for index, suggestion in enumerate(self.suggestions):
+            prefixes = {
+                suffix[:length]
+                for suffix in _word_suffixes(suggestion.key)
+                for length in range(1, min(len(suffix), _SHORT_PREFIX_LENGTH) + 1)
+            }
+            for prefix in prefixes:
+                best = self.short.setdefault(prefix, [])
+                if len(best) < _SHORT_PREFIX_DEPTH:
+                    best.append(index)
+
+    def lookup(self, prefix: str, limit: int, types: set[str] | None) -> list[Suggestion]:
+        """Best ``limit`` suggestions with a word starting with ``prefix``."""
+        best = self.short.get(prefix) if len(prefix) <= _SHORT_PREFIX_LENGTH else None
+        if best is not None:
+            found = self._select(best, limit, types)
+            if len(found) == limit or len(best) < _SHORT_PREFIX_DEPTH:
+                return found
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        # Indices are rank positions: sorting them ranks the matches.
+        return self._select(sorted(set(self.indices[start:stop])), limit, types)
+
+    def _select(self, indices: Iterable[int], limit: int, types: set[str] | None) -> list[Suggestion]:
+        """Keep the first suggestion of each value, of the requested types."""
+        found: list[Suggestion] = []
+        seen: set[str] = set()
+        for index in indices:
+            suggestion = self.suggestions[index]
+            if (types and suggestion.type not in types) or suggestion.key in seen:
+                continue
+            seen.add(suggestion.key)
+            found.append(suggestion)
+            if len(found) == limit:
+                break
+        return found
+
+
+class SuggestionIndex:
+    """In-process autocomplete over offer titles, tags, skills and cities.
+
+    Suggestions are ranked by how often they were searched (the ``searches``
+    table), then by how many offers or candidates use them. Frequencies are
+    maintained incrementally on a background thread, at most once per
+    interval: each refresh reloads the offers, skills and searches changed
+    since the previous one, drops deleted offers and skills, and swaps in
+    new sorted prefix arrays built from the counters. Lookups only read the
+    current snapshot and return nothing until the first one is built.
+    """
+
+    def __init__(self, refresh_interval_seconds: int = 60, full_rebuild_seconds: int = 3600):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self._snapshot: _Snapshot | None = None
+        self._watermark: datetime | None = None
+        self._built_at = 0.0
+        self._refresher = BackgroundRefresher(
+            "search-suggestions",
+            refresh_interval_seconds,
+            lambda: run_in_session(self.update),
+        )
+        self._reset()
+
+    def _reset(self) -> None:
+        self._offer_terms: dict[UUID, tuple[tuple[str, str, str], ...]] = {}
+        self._skill_terms: dict[UUID, tuple[tuple[str, str, str], ...]] = {}
+        self._documents: Counter[tuple[str, str]] = Counter()
+        self._labels: dict[tuple[str, str], Counter[str]] = {}
+        self._searches: Counter[tuple[str, str]] = Counter()
+        # Searches after the watermark already counted: the next poll reads them again.
+        self._recent_searches: set[UUID] = set()
+
+    def suggest(
+        self,
+        prefix: str,
+        limit: int = 10,
+        types: Iterable[str] | None = None,
+    ) -> list[Suggestion]:
+        """Return the best completions of ``prefix``, optionally of some types only."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        self.refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return []
+        return snapshot.lookup(key, limit, set(types) if types else None)
+
+    def refresh(self, force: bool = False) -> None:
+        """Start a background refresh when the interval elapsed and none is running."""
+        self._refresher.trigger(force)
+
+    def update(self, db: Session) -> None:
+        """Bring the frequencies up to date, then swap the new snapshot in."""
+        now = time.monotonic()
+        watermark = ChangeLogRepository(db).watermark()
+        repo = SuggestionRepository(db)
+        if self._snapshot is None or now - self._built_at >= self.full_rebuild_seconds:
+            self._reset()
+            offers = repo.published_offers()
+            skills = repo.skill_names()
+            for text, city, count in repo.search_counts(watermark):
+                self._count_search(text, city, count)
+            searches = repo.searches_since(watermark)
+            self._built_at = now
+            changed = True
+        else:
+            current = set(SearchRepository(db).list_published_ids())
+            removed = set(self._offer_terms) - current
+            for offer_id in removed:
+                self._count(self._offer_terms.pop(offer_id), -1)
+            removed_skills = set(self._skill_terms) - set(repo.skill_ids())
+            for skill_id in removed_skills:
+                self._count(self._skill_terms.pop(skill_id), -1)
+            updated = set(OfferRepository(db).list_ids_updated_since(self._watermark))
+            stale = list((current - set(self._offer_terms)) | (updated & current))
+            offers = []
+            for start in range(0, len(stale), _REFRESH_BATCH_SIZE):
+                offers.extend(repo.published_offers(stale[start:start + _REFRESH_BATCH_SIZE]))
+            skills = repo.skill_names(self._watermark)
+            searches = repo.searches_since(self._watermark)
+            changed = bool(removed or removed_skills)
+
+        for offer in offers:
+            changed |= self._set_terms(self._offer_terms, offer.id, self._offer_terms_of(offer))
+        for skill_id, name in skills:
+            key = normalize(name)
+            changed |= self._set_terms(self._skill_terms, skill_id, ((SKILL, key, name),) if key else ())
+        for search_id, text, city in searches:
+            if search_id not in self._recent_searches:
+                self._count_search(text, city, 1)
+                changed = True
+        self._recent_searches = {search_id for search_id, _, _ in searches}
+
+        if changed:
+            self._snapshot = _Snapshot(self._suggestions())
+            logger.info("Suggestion index holds %d values", len(self._snapshot.suggestions))
+        self._watermark = watermark
+
+    @staticmethod
+    def _offer_terms_of(offer) -> tuple[tuple[str, str, str], ...]:
+        """``(type, key, label)`` of the title, tags and cities of an offer."""
+        values = [(TITLE, offer.title)]
+        values.extend((TAG, tag.name) for tag in offer.tags or [])
+        values.extend((CITY, city.city) for city in offer.cities or [])
+        return tuple(
+            (kind, key, label)
+            for kind, label in values
+            if (key := normalize(label))
+        )
+
+    def _set_terms(self, terms: dict, owner: UUID, new_terms: tuple) -> bool:
+        """Replace the contribution of one offer or skill to the counters; return True on change."""
+        if terms.get(owner, ()) == new_terms:
+            return False
+        self._count(terms.pop(owner, ()), -1)
+        if new_terms:
+            terms[owner] = new_terms
+            self._count(new_terms, 1)
+        return True
+
+    def _count_search(self, text: str, city: str | None, count: int) -> None:
+        if key := normalize(text):
+            self._searches[("query", key)] += count
+        if key := normalize(city):
+            self._searches[(CITY, key)] += count
+
+    def _count(self, terms: Iterable[tuple[str, str, str]], delta: int) -> None:
+        for kind, key, label in terms:
+            self._documents[(kind, key)] += delta
+            labels = self._labels.setdefault((kind, key), Counter())
+            labels[label] += delta
+            if labels[label] <= 0:
+                del labels[label]
+            if self._documents[(kind, key)] <= 0:
+                del self._documents[(kind, key)]
+                self._labels.pop((kind, key), None)
+
+    def _suggestions(self) -> list[Suggestion]:
+        """Current suggestions, shown under their most common spelling."""
+        return [
+            Suggestion(
+                value=self._labels[(kind, key)].most_common(1)[0][0],
+                type=kind,
+                key=key,
+                documents=documents,
+                searches=self._searches[(CITY if kind == CITY else "query", key)],
+            )
+            for (kind, key), documents in self._documents.items()
+        ]
+
+
+SUGGESTIONS = SuggestionIndex(
+    refresh_interval_seconds=int(os.getenv("SEARCH_SUGGEST_REFRESH_SECONDS", "60")),
+    full_rebuild_seconds=int(os.getenv("SEARCH_SUGGEST_FULL_REBUILD_SECONDS", "3600")),
+)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """Run ``work`` on a daemon thread, at most once per interval and never twice at a time."""
+
+    def __init__(self, name: str, interval_seconds: float, work: Callable[[], None]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self._work = work
+        self._started_at = float("-inf")
+        self._running = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a refresh is in progress."""
+        return self._running
+
+    def trigger(self, force: bool = False) -> bool:
+        """Start a refresh when the interval elapsed (or ``force``); return whether one started."""
+        with self._lock:
+            now = time.monotonic()
+            if self._running or (not force and now - self._started_at < self.interval_seconds):
+                return False
+            self._running = True
+            self._started_at = now
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
+        return True
+
+    def _run(self) -> None:
+        try:
+            self._work()
+        except Exception:
+            logger.exception("Background refresh %s failed", self.name)
+        finally:
+            with self._lock:
+                self._running = False
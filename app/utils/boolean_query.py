@@ -1,40 +1,130 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, Union
 
 from sqlalchemy import and_, not_, or_
 from sqlalchemy.sql.elements import ClauseElement
 
 
+@dataclass(frozen=True)
+class Term:
+    """A keyword or quoted phrase, lower-cased with its spaces collapsed.
+
+    ``field`` restricts the term to one attribute (``skill:python``); None
+    matches it anywhere.
+    """
+
+    text: str
+    field: str | None = None
+
+    def __str__(self) -> str:
+        text = json.dumps(self.text, ensure_ascii=False)
+        return f"{self.field}:{text}" if self.field else text
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a term or group."""
+
+    operand: Node
+
+    def __str__(self) -> str:
+        return f"NOT {self.operand}"
+
+
+@dataclass(frozen=True)
+class And:
+    """Conjunction of two or more operands."""
+
+    operands: tuple[Node, ...]
+
+    def __str__(self) -> str:
+        return "(" + " AND ".join(str(operand) for operand in self.operands) + ")"
+
+
+@dataclass(frozen=True)
+class Or:
+    """Disjunction of two or more operands."""
+
+    operands: tuple[Node, ...]
+
+    def __str__(self) -> str:
+        return "(" + " OR ".join(str(operand) for operand in self.operands) + ")"
+
+
+# ``str(node)`` is the canonical form of a query: equivalent spellings
+# ("Python -stage", "python AND NOT stage") share it.
+Node = Union[Term, Not, And, Or]
+
+
 class BooleanQueryParser:
     """Parse human friendly boolean queries into SQLAlchemy expressions."""
 
     OPERATORS = {"AND", "OR", "NOT"}
     PRECEDENCE = {"OR": 1, "AND": 2, "NOT": 3}
     RIGHT_ASSOC = {"NOT"}
+    # Qualifiers accepted before a term ("skill:python", 'title:"data analyst"').
+    FIELDS = frozenset({"title", "skill", "city", "country", "lang", "company", "school"})
 
     def build_expression(
         self,
         query: str,
-        term_factory: Callable[[str], ClauseElement | None],
+        term_factory: Callable[[str, str | None], ClauseElement | None],
     ) -> ClauseElement | None:
         """Return a SQL expression matching the provided boolean query."""
 
+        return self.to_expression(optimize(self.parse(query)), term_factory)
+
+    def parse(self, query: str) -> Node | None:
+        """Return the syntax tree of the query, or None when it has no term."""
+
         tokens = self._tokenize(query)
         if not tokens:
             return None
 
         normalized_tokens = self._apply_implicit_and(tokens)
         postfix = self._to_postfix(normalized_tokens)
-        return self._postfix_to_expression(postfix, term_factory)
+        return self._postfix_to_tree(postfix)
+
+    def to_expression(
+        self,
+        node: Node | None,
+        term_factory: Callable[[str, str | None], ClauseElement | None],
+    ) -> ClauseElement | None:
+        """Construct the SQLAlchemy expression of a syntax tree; terms without clause are dropped.
 
-    def _tokenize(self, query: str) -> list[str]:
-        """Split the query into keywords, operators, and parentheses."""
+        ``term_factory`` receives the text and the field of each term.
+        """
+
+        if node is None:
+            return None
+        if isinstance(node, Term):
+            return term_factory(node.text, node.field)
+        if isinstance(node, Not):
+            operand = self.to_expression(node.operand, term_factory)
+            return None if operand is None else not_(operand)
+
+        clauses = [
+            clause
+            for clause in (self.to_expression(operand, term_factory) for operand in node.operands)
+            if clause is not None
+        ]
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return and_(*clauses) if isinstance(node, And) else or_(*clauses)
+
+    def _tokenize(self, query: str) -> list[str | Term]:
+        """Split the query into terms, operators, and parentheses."""
 
         if not query:
             return []
 
-        tokens: list[str] = []
+        tokens: list[str | Term] = []
         length = len(query)
         index = 0
 
@@ -47,7 +137,7 @@ class BooleanQueryParser:
 
             if char == '"':
                 phrase, index = self._consume_phrase(query, index + 1)
-                tokens.append(phrase)
+                tokens.append(self._term(phrase))
                 continue
 
             if char in "()":
@@ -75,11 +165,25 @@ class BooleanQueryParser:
             upper_word = word.upper()
             if upper_word in self.OPERATORS:
                 tokens.append(upper_word)
-            else:
-                tokens.append(word)
+                continue
+
+            name, separator, value = word.partition(":")
+            field = name.lower()
+            if not separator or field not in self.FIELDS:
+                tokens.append(self._term(word))
+                continue
+            if not value and index < length and query[index] == '"':
+                value, index = self._consume_phrase(query, index + 1)
+            if not value.strip():
+                raise ValueError(f"Le champ {field} doit être suivi d'une valeur.")
+            tokens.append(self._term(value, field))
 
         return tokens
 
+    @staticmethod
+    def _term(text: str, field: str | None = None) -> Term:
+        return Term(" ".join(text.lower().split()), field)
+
     def _consume_phrase(self, query: str, index: int) -> tuple[str, int]:
         """Consume a quoted expression starting at the given index."""
 
@@ -110,10 +214,10 @@ class BooleanQueryParser:
 
         return True
 
-    def _apply_implicit_and(self, tokens: Iterable[str]) -> list[str]:
+    def _apply_implicit_and(self, tokens: Iterable[str | Term]) -> list[str | Term]:
         """Insert explicit AND operators where the user omitted them."""
 
-        normalized: list[str] = []
+        normalized: list[str | Term] = []
         prev_type: str | None = None
 
         for token in tokens:
@@ -125,16 +229,14 @@ class BooleanQueryParser:
             ):
                 normalized.append("AND")
 
-            if token.upper() in self.OPERATORS:
-                normalized.append(token.upper())
-            else:
-                normalized.append(token)
-
+            normalized.append(token)
             prev_type = current_type
 
         return normalized
 
-    def _token_type(self, token: str) -> str:
+    def _token_type(self, token: str | Term) -> str:
+        if isinstance(token, Term):
+            return "TERM"
         if token == "(":
             return "("
         if token == ")":
@@ -143,13 +245,17 @@ class BooleanQueryParser:
             return "OP"
         return "TERM"
 
-    def _to_postfix(self, tokens: Iterable[str]) -> list[str]:
+    def _to_postfix(self, tokens: Iterable[str | Term]) -> list[str | Term]:
         """Convert infix tokens to postfix (Reverse Polish) notation."""
 
-        output: list[str] = []
+        output: list[str | Term] = []
         stack: list[str] = []
 
         for token in tokens:
+            if isinstance(token, Term):
+                output.append(token)
+                continue
+
             upper_token = token.upper()
 
             if upper_token in self.OPERATORS:
@@ -189,28 +295,22 @@ class BooleanQueryParser:
 
         return output
 
-    def _postfix_to_expression(
-        self,
-        postfix: Iterable[str],
-        term_factory: Callable[[str], ClauseElement | None],
-    ) -> ClauseElement | None:
-        """Construct the SQLAlchemy expression from postfix tokens."""
+    def _postfix_to_tree(self, postfix: Iterable[str | Term]) -> Node | None:
+        """Construct the syntax tree from postfix tokens."""
 
-        stack: list[ClauseElement] = []
+        stack: list[Node] = []
 
         for token in postfix:
-            upper_token = token.upper()
-            if upper_token not in self.OPERATORS:
-                clause = term_factory(token)
-                if clause is not None:
-                    stack.append(clause)
+            if isinstance(token, Term):
+                stack.append(token)
                 continue
 
+            upper_token = token.upper()
+
             if upper_token == "NOT":
                 if not stack:
                     raise ValueError("L'opérateur NOT doit précéder un terme ou un groupe.")
-                operand = stack.pop()
-                stack.append(not_(operand))
+                stack.append(Not(stack.pop()))
                 continue
 
             if len(stack) < 2:
@@ -218,19 +318,99 @@ class BooleanQueryParser:
 
             right = stack.pop()
             left = stack.pop()
-            if upper_token == "AND":
-                stack.append(and_(left, right))
-            else:
-                stack.append(or_(left, right))
+            stack.append(And((left, right)) if upper_token == "AND" else Or((left, right)))
 
         if not stack:
             return None
-
-        expression = stack.pop()
-        while stack:
-            expression = and_(stack.pop(), expression)
-
-        return expression
-
-
-__all__ = ["BooleanQueryParser"]
+        if len(stack) == 1:
+            return stack[0]
+        return And(tuple(stack))
+
+
+def estimate_selectivity(node: Node) -> float:
+    """Rough share of rows matched by ``node``: longer terms are rarer, wildcards widen them.
+
+    A qualified term looks at one attribute instead of all of them.
+    """
+    if isinstance(node, Term):
+        wildcards = node.text.count("*")
+        length = len(node.text) - wildcards
+        estimate = min(1.0, (1 + wildcards) / (1 + length))
+        return estimate / 4 if node.field else estimate
+    if isinstance(node, Not):
+        return 1.0 - estimate_selectivity(node.operand)
+    estimates = [estimate_selectivity(operand) for operand in node.operands]
+    if isinstance(node, And):
+        product = 1.0
+        for estimate in estimates:
+            product *= estimate
+        return product
+    return min(1.0, sum(estimates))
+
+
+def optimize(
+    node: Node | None,
+    selectivity: Callable[[Node], float] = estimate_selectivity,
+) -> Node | None:
+    """Simplify a syntax tree without changing what it matches.
+
+    Nested AND/OR are flattened into n-ary nodes, repeated operands and
+    double negations removed, and empty terms dropped (a group left without
+    operand disappears with them). OR operands are sorted canonically and
+    AND operands by increasing ``selectivity``, so the most restrictive
+    condition is evaluated first and equivalent queries share one form.
+    """
+    if node is None:
+        return None
+    if isinstance(node, Term):
+        return node if node.text else None
+    if isinstance(node, Not):
+        operand = optimize(node.operand, selectivity)
+        if operand is None:
+            return None
+        return operand.operand if isinstance(operand, Not) else Not(operand)
+
+    kind = type(node)
+    operands: dict[Node, None] = {}
+    for operand in node.operands:
+        operand = optimize(operand, selectivity)
+        if operand is None:
+            continue
+        for flat in operand.operands if isinstance(operand, kind) else (operand,):
+            operands.setdefault(flat)
+
+    if not operands:
+        return None
+    if len(operands) == 1:
+        return next(iter(operands))
+    if kind is And:
+        return And(tuple(sorted(operands, key=lambda operand: (selectivity(operand), str(operand)))))
+    return Or(tuple(sorted(operands, key=str)))
+
+
+def term_pattern(text: str) -> str:
+    """LIKE pattern of a term: ``*`` is a wildcard, a term without one matches anywhere."""
+    pattern = text.replace("*", "%")
+    if "%" not in pattern:
+        pattern = f"%{pattern}%"
+    return pattern.replace("%%", "%")
+
+
+@lru_cache(maxsize=1024)
+def parse_query(query: str) -> Node | None:
+    """Cached, optimized :meth:`BooleanQueryParser.parse`; syntax trees are immutable and can be shared."""
+    return optimize(BooleanQueryParser().parse(query))
+
+
+__all__ = [
+    "And",
+    "BooleanQueryParser",
+    "Node",
+    "Not",
+    "Or",
+    "Term",
+    "estimate_selectivity",
+    "optimize",
+    "parse_query",
+    "term_pattern",
+]
@@ -1,51 +1,239 @@
 from __future__ import annotations
 
 import hashlib
+import itertools
 import json
+import logging
+import os
+import sys
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date, datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 from uuid import UUID
 
+from sqlalchemy.orm import InstanceState
+
+
+logger = logging.getLogger(__name__)
+
+_SIZE_SAMPLE = 32
+_SIZE_DEPTH = 8
+
+
+def approximate_size(value: Any, depth: int = 0) -> int:
+    """Rough deep size of ``value`` in bytes; large containers are sampled."""
+    size = sys.getsizeof(value)
+    if depth >= _SIZE_DEPTH or isinstance(value, (str, bytes, int, float, date, UUID, Enum)):
+        return size
+    if isinstance(value, dict):
+        items = list(itertools.islice(value.items(), _SIZE_SAMPLE))
+        sampled = sum(approximate_size(key, depth + 1) + approximate_size(val, depth + 1) for key, val in items)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(itertools.islice(value, _SIZE_SAMPLE))
+        sampled = sum(approximate_size(item, depth + 1) for item in items)
+    elif isinstance(value, InstanceState):
+        return size
+    elif hasattr(value, "__dict__"):
+        # Pydantic models and plain objects keep their fields in __dict__. The
+        # state SQLAlchemy attaches to mapped instances points at the session
+        # and its identity map, which the cached value does not own.
+        fields = vars(value)
+        if "_sa_instance_state" in fields:
+            fields = {key: field for key, field in fields.items() if key != "_sa_instance_state"}
+        return size + approximate_size(fields, depth + 1)
+    else:
+        return size
+    if not items:
+        return size
+    return size + sampled * len(value) // len(items)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    expires_at: float
+    size: int
+    slot: int
+
+
+class _Flight:
+    """One in-progress computation of a key, awaited by concurrent callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
 
 class TTLCache:
-    """Simple in-memory cache with time-based eviction."""
+    """In-memory LRU cache with per-entry TTL and a memory budget.
 
-    def __init__(self, default_ttl_seconds: int = 60, max_entries: int = 1024):
+    Entries are kept in recency order, so reads, writes and evictions of the
+    least recently used entry are O(1). Beyond ``max_entries`` entries or
+    ``max_bytes`` (estimated by ``approximate_size``) the least recently used
+    entries are evicted. Expired entries are dropped when read, and swept by
+    a timer wheel of one-second slots: as the clock advances, only the slots
+    of the elapsed seconds are visited.
+
+    An entry is fresh for ``ttl_seconds``, then stale for ``stale_seconds``
+    before it expires. ``get`` only returns fresh values. ``get_or_compute``
+    lets a single caller recompute a missing key while concurrent callers
+    wait for its result; a stale value is served at once instead, and when
+    a ``refresh`` callable is given it recomputes the key on a worker thread.
+    """
+
+    def __init__(
+        self,
+        default_ttl_seconds: int = 60,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        wheel_slots: int = 512,
+        default_stale_seconds: int = 0,
+        refresh_workers: int = 2,
+    ):
         self.default_ttl_seconds = default_ttl_seconds
+        self.default_stale_seconds = default_stale_seconds
         self.max_entries = max_entries
-        self._store: dict[str, tuple[float, Any]] = {}
+        self.max_bytes = max_bytes
+        self.refresh_workers = refresh_workers
+        self._store: OrderedDict[str, _Entry] = OrderedDict()
+        self._slots: list[set[str]] = [set() for _ in range(wheel_slots)]
+        self._tick = int(time.monotonic())
+        self._bytes = 0
+        self._flights: dict[str, _Flight] = {}
+        self._refresher: ThreadPoolExecutor | None = None
         self._lock = threading.Lock()
 
     def get(self, key: str) -> tuple[bool, Any]:
-        now = time.time()
+        now = time.monotonic()
         with self._lock:
-            entry = self._store.get(key)
-            if entry is None:
-                return False, None
-            expires_at, value = entry
-            if expires_at < now:
-                self._store.pop(key, None)
+            entry = self._lookup(key, now)
+            if entry is None or entry.fresh_until <= now:
                 return False, None
-            return True, value
+            self._store.move_to_end(key)
+            return True, entry.value
 
-    def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int | None = None,
+        stale_seconds: int | None = None,
+    ) -> None:
         ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
-        expires_at = time.time() + max(ttl, 0)
+        stale = self.default_stale_seconds if stale_seconds is None else stale_seconds
+        size = approximate_size(value)
+        now = time.monotonic()
+        fresh_until = now + max(ttl, 0)
+        expires_at = fresh_until + max(stale, 0)
+        with self._lock:
+            self._advance(now)
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            slot = (int(expires_at) + 1) % len(self._slots)
+            self._store[key] = _Entry(value, fresh_until, expires_at, size, slot)
+            self._slots[slot].add(key)
+            self._bytes += size
+            while len(self._store) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._store)))
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl_seconds: int | None = None,
+        stale_seconds: int | None = None,
+        refresh: Callable[[], Any] | None = None,
+    ) -> Any:
+        """Return the cached value of ``key``, computing and caching it once if missing.
+
+        ``refresh`` recomputes the value on a worker thread while the stale
+        one is served; it must not use the caller's database session.
+        """
+        now = time.monotonic()
         with self._lock:
-            if len(self._store) >= self.max_entries:
-                self._prune()
-            self._store[key] = (expires_at, value)
+            entry = self._lookup(key, now)
+            if entry is not None and entry.fresh_until > now:
+                self._store.move_to_end(key)
+                return entry.value
+            flight = self._flights.get(key)
+            if entry is not None and (flight is not None or refresh is not None):
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    self._background().submit(
+                        self._refresh, key, flight, refresh, ttl_seconds, stale_seconds
+                    )
+                return entry.value
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._fly(key, flight, compute, ttl_seconds, stale_seconds)
+
+    def _fly(self, key, flight: _Flight, compute, ttl_seconds, stale_seconds) -> Any:
+        """Run the computation of ``flight``, cache its value and release its waiters."""
+        try:
+            flight.value = compute()
+            self.set(key, flight.value, ttl_seconds, stale_seconds)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh(self, key, flight: _Flight, refresh, ttl_seconds, stale_seconds) -> None:
+        try:
+            self._fly(key, flight, refresh, ttl_seconds, stale_seconds)
+        except Exception:
+            # The stale value stays until it expires; the next read retries.
+            logger.exception("Background refresh of cache key %s failed", key)
+
+    def _background(self) -> ThreadPoolExecutor:
+        if self._refresher is None:
+            self._refresher = ThreadPoolExecutor(
+                max_workers=self.refresh_workers, thread_name_prefix="cache-refresh"
+            )
+        return self._refresher
+
+    def _lookup(self, key: str, now: float) -> _Entry | None:
+        """Entry of ``key`` unless it expired (fresh or stale)."""
+        self._advance(now)
+        entry = self._store.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self._slots[entry.slot].discard(key)
+            self._bytes -= entry.size
 
-    def _prune(self) -> None:
-        now = time.time()
-        expired = [key for key, (exp, _) in self._store.items() if exp < now]
-        for key in expired:
-            self._store.pop(key, None)
-        while len(self._store) >= self.max_entries and self._store:
-            self._store.pop(next(iter(self._store)))
+    def _advance(self, now: float) -> None:
+        """Drop the entries due in the slots of the seconds elapsed since the last call."""
+        tick = int(now)
+        # After a long idle period, one turn of the wheel visits every slot.
+        for second in range(self._tick + 1, min(tick, self._tick + len(self._slots)) + 1):
+            slot = self._slots[second % len(self._slots)]
+            for key in [key for key in slot if self._store[key].expires_at <= now]:
+                self._remove(key)
+        self._tick = max(self._tick, tick)
 
 
 def _serialize_cache_value(value: Any) -> Any:
@@ -80,4 +268,9 @@ def make_cache_key(prefix: str, *parts: Any, **kwargs: Any) -> str:
     return f"{prefix}:{digest}"
 
 
-APP_CACHE = TTLCache(default_ttl_seconds=60, max_entries=1024)
+APP_CACHE = TTLCache(
+    default_ttl_seconds=60,
+    max_entries=1024,
+    max_bytes=int(os.getenv("APP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    default_stale_seconds=int(os.getenv("APP_CACHE_STALE_SECONDS", "300")),
+)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_
+
+
+_INVALID_CURSOR = "Curseur de pagination invalide"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a keyset order; NULLs always sort last."""
+
+    expression: Any
+    descending: bool = False
+
+    def order_by(self):
+        """ORDER BY clause for this key."""
+        if self.descending:
+            return self.expression.desc().nulls_last()
+        return self.expression.asc().nulls_last()
+
+    def equal_to(self, value):
+        """Rows tied with ``value`` on this key."""
+        if value is None or isinstance(value, bool):
+            return self.expression.is_(value)
+        return self.expression == value
+
+    def after(self, value):
+        """Rows sorted strictly after ``value`` on this key, or None if there are none."""
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            # Booleans only support IS comparisons; FALSE sorts before TRUE.
+            if value is not self.descending:
+                return self.expression.is_(None)
+            beyond = self.expression.is_(not value)
+        elif self.descending:
+            beyond = self.expression < value
+        else:
+            beyond = self.expression > value
+        return or_(beyond, self.expression.is_(None))
+
+
+@dataclass(frozen=True)
+class Page:
+    """One page of results with what a client needs to fetch the next one."""
+
+    items: list = field(default_factory=list)
+    total: int = 0
+    page: int = 0
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
+    facets: dict[str, list[tuple[str, int]]] | None = None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError(_INVALID_CURSOR)
+    return value
+
+
+def encode_cursor(seen: int, values: Sequence) -> str:
+    """Opaque cursor holding the rows already served and the last sort key values."""
+    payload = json.dumps({"n": seen, "k": [_encode_value(value) for value in values]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_count: int) -> tuple[int, list]:
+    """Return ``(seen, values)`` from a cursor; raise ValueError when it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        seen = int(payload["n"])
+        values = [_decode_value(value) for value in payload["k"]]
+    except (binascii.Error, TypeError, KeyError, ValueError) as exc:
+        raise ValueError(_INVALID_CURSOR) from exc
+    if seen < 0 or len(values) != key_count:
+        raise ValueError(_INVALID_CURSOR)
+    return seen, values
+
+
+def seek_clause(keys: Sequence[SortKey], values: Sequence):
+    """Predicate selecting the rows that sort after ``values`` in the ``keys`` order."""
+    branches = []
+    for index, key in enumerate(keys):
+        after = key.after(values[index])
+        if after is not None:
+            ties = [keys[prior].equal_to(values[prior]) for prior in range(index)]
+            branches.append(and_(*ties, after))
+    return or_(*branches) if branches else None
+
+
+def estimate_count(query) -> int:
+    """Planner estimate of the rows matched by ``query``, read from EXPLAIN."""
+    session = query.session
+    statement = query.order_by(None).statement
+    compiled = statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(
+    query,
+    keys: Sequence[SortKey],
+    size: int,
+    page: int = 0,
+    cursor: str | None = None,
+    first_page: int = 0,
+    options: Sequence = (),
+) -> Page:
+    """Load one page of ``query`` ordered on ``keys``.
+
+    Without a cursor, ``page`` is read with OFFSET and the total is an exact
+    count. With a cursor, the query seeks past the last row served, so deep
+    pages cost the same as the first one, and the total is the planner
+    estimate (exact once the last page is reached). An empty cursor starts
+    cursor mode on the first page, skipping the exact count. ``keys`` must
+    end with a unique column. ``options`` are loader options applied to the
+    page only.
+    """
+    sort_columns = [key.expression for key in keys]
+    ordered = query.order_by(None).order_by(*(key.order_by() for key in keys))
+
+    if cursor is None:
+        seen = (page - first_page) * size
+        total = query.with_entities(func.count()).order_by(None).scalar() or 0
+        if seen >= total:
+            return Page(total=total, page=page)
+        rows = ordered.options(*options).add_columns(*sort_columns).offset(seen).limit(size).all()
+        has_more = seen + len(rows) < total
+        total_is_estimate = False
+    else:
+        if cursor:
+            seen, values = decode_cursor(cursor, len(keys))
+            seek = seek_clause(keys, values)
+            if seek is None:
+                return Page(total=seen, page=first_page + seen // size)
+            ordered = ordered.filter(seek)
+        else:
+            seen = 0
+        page = first_page + seen // size
+        rows = ordered.options(*options).add_columns(*sort_columns).limit(size + 1).all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if has_more:
+            total = max(estimate_count(query), seen + len(rows) + 1)
+        else:
+            total = seen + len(rows)
+        total_is_estimate = has_more
+
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor(seen + len(rows), list(rows[-1][1:]))
+    return Page(
+        items=[row[0] for row in rows],
+        total=total,
+        page=page,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
@@ -1,12 +1,52 @@
 from __future__ import annotations
 
+import os
+import re
 from datetime import datetime
 from typing import Iterable
 from unidecode import unidecode
 
-from sqlalchemy import or_, func, literal
+from sqlalchemy import and_, or_, func, literal
 
-from app.models import JobOffer, Tag
+from app.models import JobOffer, JobOfferSearchDocument, Tag
+
+
+# Opt-in pg_trgm mode: init_db creates trigram indexes, location filters
+# tolerate typos and the "trgm" offer search engine becomes the default.
+SEARCH_TRGM_ENABLED = os.getenv("SEARCH_TRGM_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# "like" (the default) keeps the historical substring scan, "fts" (opt-in)
+# searches the job_offer_search tsvector documents by word prefix, "trgm"
+# ranks titles and tags by trigram word similarity.
+OFFER_SEARCH_ENGINE = os.getenv(
+    "OFFER_SEARCH_ENGINE", "trgm" if SEARCH_TRGM_ENABLED else "like"
+).lower()
+SEARCH_TRGM_ENABLED = SEARCH_TRGM_ENABLED or OFFER_SEARCH_ENGINE == "trgm"
+
+# Text search configuration of the offer documents. "simple" does no stemming,
+# so prefix queries behave like the LIKE search on French and English titles.
+TS_CONFIG = "simple"
+
+# ISO 639-1 code of the language names entered on profiles and offers.
+LANGUAGE_ALIASES = {
+    "french": "fr",
+    "francais": "fr",
+    "français": "fr",
+    "anglais": "en",
+    "english": "en",
+    "espagnol": "es",
+    "spanish": "es",
+    "allemand": "de",
+    "german": "de",
+    "portugais": "pt",
+    "portuguese": "pt",
+}
+
+
+def language_names(value: str) -> set[str]:
+    """Lower-cased names designating the same language as ``value`` ("en", "anglais", ...)."""
+    code = LANGUAGE_ALIASES.get(value, value)
+    return {value, code, *(name for name, alias in LANGUAGE_ALIASES.items() if alias == code)}
 
 
 def normalize(value: str | None) -> str | None:
@@ -86,11 +126,8 @@ def get_search_clauses(terms: list[str], raw_terms: str):
     return search_clauses
 
 
-def apply_text_search(query, raw_terms):
-    """Apply LIKE-based search over multiple offer fields."""
-    if not raw_terms:
-        return query
-
+def split_terms(raw_terms) -> list[str]:
+    """Split a free-text query (string or list of strings) into terms."""
     if isinstance(raw_terms, str):
         terms = [term.strip() for term in raw_terms.split() if term.strip()]
     elif isinstance(raw_terms, Iterable):
@@ -102,10 +139,124 @@ def apply_text_search(query, raw_terms):
     else:
         value = str(raw_terms).strip()
         terms = [value] if value else []
+    return terms
+
 
+def apply_text_search(query, raw_terms):
+    """Apply LIKE-based search over multiple offer fields."""
+    if not raw_terms:
+        return query
+
+    terms = split_terms(raw_terms)
     if not terms:
         return query
 
     search_clauses = get_search_clauses(terms, raw_terms)
 
     return query.filter(or_(*search_clauses))
+
+
+def like_relevance(raw_terms):
+    """LIKE-engine ordering key: whether the offer title contains the whole query."""
+    normalized = normalize(" ".join(split_terms(raw_terms))) if raw_terms else None
+    if not normalized:
+        return None
+    return func.lower(func.unaccent(JobOffer.title)).like(f"%{normalized}%")
+
+
+def to_tsquery_text(raw_terms) -> str | None:
+    """Prefix ``tsquery`` source matching any of the words of a free-text query."""
+    if not raw_terms:
+        return None
+    words = re.findall(r"\w+", " ".join(split_terms(raw_terms)).lower())
+    if not words:
+        return None
+    # Single letters (elided articles such as "d'" or "l'") would match
+    # almost every document as prefixes.
+    words = [word for word in words if len(word) > 1] or words
+    return " | ".join(f"{word}:*" for word in dict.fromkeys(words))
+
+
+def apply_fulltext_search(query, raw_terms):
+    """Filter offers on their search document; return ``(query, rank)``.
+
+    ``rank`` is the ``ts_rank`` ordering key, or None when the text holds no
+    searchable word (the query is then returned unfiltered). Offers not
+    indexed yet are matched with the LIKE clauses and ranked after the others.
+    """
+    text = to_tsquery_text(raw_terms)
+    if text is None:
+        return query, None
+    tsquery = func.to_tsquery(TS_CONFIG, func.unaccent(text))
+    document = JobOfferSearchDocument.document
+    query = query.outerjoin(
+        JobOfferSearchDocument,
+        JobOfferSearchDocument.offer_id == JobOffer.id,
+    ).filter(
+        or_(
+            document.op("@@")(tsquery),
+            and_(
+                JobOfferSearchDocument.offer_id.is_(None),
+                or_(*get_search_clauses(split_terms(raw_terms), raw_terms)),
+            ),
+        )
+    )
+    return query, func.ts_rank(document, tsquery)
+
+
+def trigram_text(column):
+    """Column as indexed by the trigram indexes created in ``init_db``."""
+    return func.lower(func.immutable_unaccent(column))
+
+
+def fuzzy_equals(column, value: str):
+    """Typo-tolerant equality served by a trigram index (``%`` operator)."""
+    return trigram_text(column).op("%")(normalize(value))
+
+
+def fuzzy_contains(column, value: str):
+    """Substring or close word match, both served by a trigram index."""
+    normalized = normalize(value)
+    text = trigram_text(column)
+    return or_(text.like(f"%{normalized}%"), literal(normalized).op("<%")(text))
+
+
+def word_similarity(value: str, column):
+    """Trigram word similarity of ``value`` within ``column``, in [0, 1]."""
+    return func.word_similarity(normalize(value), trigram_text(column))
+
+
+def location_matches(column, value: str):
+    """Compare a city or country column with a filter value, ignoring accents.
+
+    In pg_trgm mode near spellings match too ("yaunde" finds "Yaoundé").
+    """
+    if SEARCH_TRGM_ENABLED:
+        return fuzzy_equals(column, value)
+    return func.lower(func.unaccent(column)) == normalize(value)
+
+
+def apply_trigram_search(query, raw_terms):
+    """Filter offers whose title or a tag is close to the query; return ``(query, rank)``.
+
+    The rank is the word similarity of the query within the title.
+    """
+    text = normalize(" ".join(split_terms(raw_terms))) if raw_terms else None
+    if not text:
+        return query, None
+    query = query.filter(
+        or_(
+            fuzzy_contains(JobOffer.title, text),
+            JobOffer.tags.any(fuzzy_contains(Tag.name, text)),
+        )
+    )
+    return query, word_similarity(text, JobOffer.title)
+
+
+def apply_offer_text_search(query, raw_terms):
+    """Apply the configured text search engine; return ``(query, relevance)``."""
+    if OFFER_SEARCH_ENGINE == "trgm":
+        return apply_trigram_search(query, raw_terms)
+    if OFFER_SEARCH_ENGINE == "fts" and to_tsquery_text(raw_terms) is not None:
+        return apply_fulltext_search(query, raw_terms)
+    return apply_text_search(query, raw_terms), like_relevance(raw_terms)
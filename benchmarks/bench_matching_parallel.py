@@ -0,0 +1,149 @@
+"""Compare single-process and parallel sourcing ranking on synthetic features.
+
+Usage::
+
+    python -m benchmarks.bench_matching_parallel --workers 4 --sizes 10000 50000 200000
+
+For each candidate set size the script prints the mean ranking latency of both
+paths and how long the worker pool took to start. The crossover is the first
+size where the parallel path wins; set ``MATCHING_PARALLEL_MIN_ROWS`` to it on
+the API nodes. A pool is started again on each feature store change, and
+requests use the single-process path meanwhile: if the startup time is close
+to how often features change, the parallel path rarely serves.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+
+import numpy as np
+
+from app.services.matching_engine import BatchScoringEngine
+from app.services.matching_features import CandidateFeatures, OfferFeatures, tokenize
+from app.services.matching_parallel import ParallelRanker
+
+
+SKILLS = [f"skill{i}" for i in range(400)]
+CITIES = [f"city{i}" for i in range(60)]
+COUNTRIES = ["cameroun", "france", "senegal", "cote d'ivoire", "canada"]
+LEVELS = ["junior", "intermediate", "senior", "expert", None]
+TITLES = [
+    "developpeur backend python",
+    "data scientist senior",
+    "ingenieur devops cloud",
+    "chef de projet digital",
+    "developpeur fullstack javascript",
+    "analyste financier",
+    "comptable general",
+    "responsable marketing",
+]
+WEIGHTS = {
+    "coverage": 0.30,
+    "title_similarity": 0.20,
+    "geo_fit": 0.15,
+    "seniority": 0.10,
+    "language": 0.10,
+    "salary": 0.10,
+    "profile_focus": 0.05,
+}
+
+
+def _candidate(rng: random.Random) -> CandidateFeatures:
+    title = f"{rng.choice(TITLES)} {rng.choice(CITIES)}"
+    return CandidateFeatures(
+        id=uuid.UUID(int=rng.getrandbits(128)),
+        skills=frozenset(rng.sample(SKILLS, rng.randint(0, 12))),
+        title_text=title,
+        title_tokens=frozenset(tokenize(title)),
+        languages=frozenset(rng.sample(["fr", "en", "es", "de"], rng.randint(0, 2))),
+        city=rng.choice(CITIES),
+        country=rng.choice(COUNTRIES),
+        experience_level=rng.choice(LEVELS),
+        salary_expectation=rng.choice([None, float(rng.randint(200, 3000) * 1000)]),
+    )
+
+
+def _offer(rng: random.Random) -> OfferFeatures:
+    title = rng.choice(TITLES)
+    skills = frozenset(rng.sample(SKILLS, rng.randint(3, 8)))
+    salary_min = float(rng.randint(200, 2000) * 1000)
+    return OfferFeatures(
+        id=uuid.UUID(int=rng.getrandbits(128)),
+        skills=skills,
+        skill_labels={skill: skill for skill in skills},
+        title=title,
+        title_tokens=frozenset(tokenize(title)),
+        seniority=rng.choice(LEVELS),
+        languages=frozenset(rng.sample(["fr", "en"], rng.randint(0, 2))),
+        cities=frozenset(rng.sample(CITIES, 1)),
+        country=rng.choice(COUNTRIES),
+        salary_min=salary_min,
+        salary_max=salary_min * 1.5,
+    )
+
+
+def _mean_latency(rank, offers: list[OfferFeatures]) -> float:
+    start = time.perf_counter()
+    for offer in offers:
+        rank(offer)
+    return (time.perf_counter() - start) / len(offers)
+
+
+def _start_pool(ranker: ParallelRanker, engine: BatchScoringEngine) -> float:
+    """Start the pool of ``engine`` and return the seconds until every worker is ready."""
+    start = time.perf_counter()
+    ranker.prepare(engine)
+    while not ranker.ready(engine):
+        if time.perf_counter() - start > 600:
+            raise RuntimeError("matching workers did not start")
+        time.sleep(0.01)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000, 50_000, 100_000, 200_000])
+    parser.add_argument("--offers", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    offers = [_offer(rng) for _ in range(args.offers)]
+    candidates = [_candidate(rng) for _ in range(max(args.sizes))]
+
+    print(f"{'candidates':>10} {'single ms':>10} {'parallel ms':>12} {'speedup':>8} {'startup s':>10}")
+    crossover = None
+    for size in sorted(args.sizes):
+        engine = BatchScoringEngine(candidates[:size], offers)
+        ranker = ParallelRanker(workers=args.workers, min_rows=0)
+        try:
+            startup = _start_pool(ranker, engine)
+            single = _mean_latency(lambda offer: engine.rank_offer(offer, WEIGHTS, args.limit), offers)
+            parallel = _mean_latency(
+                lambda offer: ranker.rank_offer(engine, offer, WEIGHTS, args.limit), offers
+            )
+            for offer in offers:
+                expected = engine.rank_offer(offer, WEIGHTS, args.limit)
+                actual = ranker.rank_offer(engine, offer, WEIGHTS, args.limit)
+                assert np.array_equal(expected.rows, actual.rows)
+                assert np.array_equal(expected.scores, actual.scores)
+        finally:
+            ranker.shutdown()
+        if crossover is None and parallel < single:
+            crossover = size
+        print(
+            f"{size:>10} {single * 1000:>10.2f} {parallel * 1000:>12.2f} "
+            f"{single / parallel:>8.2f} {startup:>10.2f}"
+        )
+
+    if crossover is None:
+        print("No crossover: the single-process path wins at every size tested.")
+    else:
+        print(f"Crossover at about {crossover} candidates (MATCHING_PARALLEL_MIN_ROWS).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+
+# The background refreshers import the session module, which needs a URL even
+# though the tests build their own SQLite engines.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
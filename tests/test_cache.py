@@ -0,0 +1,171 @@
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import Candidate
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache, approximate_size
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted_first(clock):
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_byte_budget_evicts_until_the_entries_fit(clock):
+    value = "x" * 1000
+    cache = TTLCache(max_bytes=approximate_size(value) * 2)
+    cache.set("a", value)
+    cache.set("b", value)
+
+    cache.set("c", value)
+    cache.set("huge", value * 10)
+
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, value)
+    assert cache.get("c") == (True, value)
+    assert cache.get("huge") == (False, None)
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache(default_ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=100)
+
+    clock.now += 11
+
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+
+
+def test_size_of_mapped_instances_skips_the_sqlalchemy_state():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables["candidates"]])
+    with Session(engine) as session:
+        candidate = Candidate(professional_title="developpeur", created_at=datetime(2024, 1, 1))
+        session.add(candidate)
+        session.commit()
+        session.refresh(candidate)
+        fields = {key: value for key, value in vars(candidate).items() if key != "_sa_instance_state"}
+
+        assert approximate_size(candidate) == sys.getsizeof(candidate) + approximate_size(fields, 1)
+
+
+def test_concurrent_misses_compute_once_and_share_the_value():
+    cache = TTLCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+        for _ in range(4)
+    ]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.1)  # let the followers reach the in-flight computation
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+
+
+def test_a_failed_computation_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("key", compute)
+        except ValueError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    assert cache.get_or_compute("key", lambda: "recovered") == "recovered"
+
+
+def test_stale_value_is_served_while_refreshed_in_the_background(clock):
+    cache = TTLCache(default_ttl_seconds=10, default_stale_seconds=100)
+    cache.set("key", "old")
+    clock.now += 11
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return "new"
+
+    served = cache.get_or_compute("key", lambda: "computed", refresh=refresh)
+
+    assert served == "old"
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if cache.get("key") == (True, "new"):
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == (True, "new")
+
+
+def test_expired_value_is_recomputed_in_the_caller(clock):
+    cache = TTLCache(default_ttl_seconds=10, default_stale_seconds=100)
+    cache.set("key", "old")
+    clock.now += 111
+
+    assert cache.get_or_compute("key", lambda: "computed", refresh=lambda: "refreshed") == "computed"
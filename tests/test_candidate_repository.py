@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import Candidate
+from app.repositories.candidate_repository import CandidateRepository
+
+
+# Tables read by the boolean search and the relationships loaded with a page.
+_TABLES = (
+    "candidates",
+    "education",
+    "experience",
+    "skill",
+    "language",
+    "job_preferences",
+    "job_preferences_contract_types",
+    "job_preferences_sectors",
+    "sector",
+    "applications",
+    "saved_job_offers",
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in _TABLES])
+    with Session(engine) as session:
+        yield session
+
+
+def test_boolean_search_cursor_pages_of_an_or_query_do_not_repeat_rows(db):
+    created = datetime(2024, 1, 1)
+    for day, title in enumerate(["alpha", "beta", "alpha", "beta"]):
+        db.add(Candidate(professional_title=title, created_at=created - timedelta(days=day)))
+    db.commit()
+    repository = CandidateRepository(db)
+    query = 'alpha OR "beta"'
+
+    first = repository.search_by_boolean_query(query, page=1, size=2)
+    second = repository.search_by_boolean_query(query, page=1, size=2, cursor=first.next_cursor)
+
+    served = [candidate.id for candidate in first.items + second.items]
+    assert len(first.items) == len(second.items) == 2
+    assert len(set(served)) == 4
+    assert second.page == 2
+    assert second.next_cursor is None
+
+
+def test_boolean_search_empty_cursor_starts_cursor_mode_without_an_exact_count(db, monkeypatch):
+    created = datetime(2024, 1, 1)
+    for day in range(5):
+        db.add(Candidate(professional_title="alpha", created_at=created - timedelta(days=day)))
+    db.commit()
+    monkeypatch.setattr("app.utils.pagination.estimate_count", lambda query: 42)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    repository = CandidateRepository(db)
+
+    first = repository.search_by_boolean_query("alpha", page=1, size=2, cursor="")
+    second = repository.search_by_boolean_query("alpha", page=1, size=2, cursor=first.next_cursor)
+
+    assert not any("count(" in statement.lower() for statement in statements)
+    assert (first.page, first.total, first.total_is_estimate) == (1, 42, True)
+    assert second.page == 2
+    assert len({candidate.id for candidate in first.items + second.items}) == 4
@@ -0,0 +1,160 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models import (
+    Candidate,
+    Education,
+    Experience,
+    JobPreferences,
+    JobPreferencesContractType,
+    JobPreferencesSector,
+    Language,
+    Sector,
+    Skill,
+)
+from app.repositories.candidate_repository import CandidateRepository
+from app.services.candidate_search_index import CandidateSearchIndex
+
+
+_TABLES = (
+    "candidates",
+    "education",
+    "experience",
+    "skill",
+    "language",
+    "job_preferences",
+    "job_preferences_contract_types",
+    "job_preferences_sectors",
+    "sector",
+    "applications",
+    "saved_job_offers",
+)
+WORDS = [
+    "python", "java", "douala", "yaounde", "data analyst", "devops", "stage", "orange", "france",
+    "excel", "vente", "design", "marketing", "comptable", "figma", "rust", "linux", "sql", "react",
+]
+QUERIES = [
+    "python",
+    "dev*",
+    "*ops",
+    '"data analyst"',
+    "python -stage",
+    "-stage",
+    "NOT title:java",
+    "title:java OR -city:douala",
+    "NOT (country:france OR stage)",
+    "lang:en",
+    "lang:fr -python",
+    "skill:py* AND -company:orange",
+    "school:douala OR d*a",
+    "*",
+]
+
+
+def _value(rng: random.Random, missing: float = 0.15) -> str | None:
+    return None if rng.random() < missing else " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    event.listen(
+        engine,
+        "connect",
+        lambda connection, _: connection.create_function(
+            "clock_timestamp", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        ),
+    )
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in _TABLES])
+    with Session(engine) as session:
+        rng = random.Random(3)
+        sectors = [Sector(name=name) for name in ("devops", "data analyst", "commerce")]
+        for index in range(80):
+            candidate = Candidate(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                created_at=None if index % 9 == 0 else datetime(2024, 1, 1) - timedelta(days=index % 13),
+                first_name=_value(rng, 0.02),
+                last_name=_value(rng, 0.02),
+                professional_title=_value(rng),
+                presentation=_value(rng, 0.02),
+                pitch_mail="Bonjour",
+                city=_value(rng),
+                country=_value(rng),
+                phone_number="+237 600 000 000",
+                portfolio_url="https://example.cm",
+                linked_in_url="https://linkedin.com/in/example",
+            )
+            candidate.skills = [Skill(name=_value(rng)) for _ in range(rng.randint(0, 3))]
+            candidate.languages = [
+                Language(language=rng.choice(["Anglais", " english ", "Francais", None]))
+                for _ in range(rng.randint(0, 2))
+            ]
+            candidate.experiences = [
+                Experience(position=_value(rng), company_name=_value(rng), start_date=datetime(2020, 1, 1))
+                for _ in range(rng.randint(0, 2))
+            ]
+            candidate.educations = [
+                Education(institution=_value(rng), city=_value(rng)) for _ in range(rng.randint(0, 2))
+            ]
+            if rng.random() < 0.6:
+                preferences = JobPreferences(desired_position=_value(rng), city=_value(rng))
+                preferences.sectors = [JobPreferencesSector(sector=rng.choice(sectors))]
+                preferences.contract_types = [JobPreferencesContractType(contract_type="CDI")]
+                candidate.job_preferences = preferences
+            session.add(candidate)
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def index(db, monkeypatch):
+    index = CandidateSearchIndex()
+    # Build synchronously on the test session instead of the background thread.
+    monkeypatch.setattr(index, "refresh", lambda force=False: None)
+    index.update(db)
+    return index
+
+
+def _pages(search, size: int) -> list[list]:
+    pages, page = [], 1
+    while True:
+        result = search(page=page, size=size)
+        pages.append((result.total, [candidate.id for candidate in result.items]))
+        if result.next_cursor is None:
+            return pages
+        page += 1
+
+
+def _cursor_pages(search, size: int) -> list[list]:
+    pages, cursor = [], ""
+    while cursor is not None:
+        result = search(page=1, size=size, cursor=cursor)
+        pages.append((result.page, [candidate.id for candidate in result.items], result.next_cursor))
+        cursor = result.next_cursor
+    return pages
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_pages_equal_the_database_pages(db, index, query):
+    repository = CandidateRepository(db)
+
+    expected = _pages(lambda **kwargs: repository.search_by_boolean_query(query, **kwargs), 7)
+
+    assert _pages(lambda **kwargs: index.search(db, query, **kwargs), 7) == expected
+    assert sum(len(ids) for _, ids in expected) == expected[0][0]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_cursor_pages_equal_the_database_cursor_pages(db, index, query, monkeypatch):
+    monkeypatch.setattr("app.utils.pagination.estimate_count", lambda query: 0)
+    repository = CandidateRepository(db)
+
+    expected = _cursor_pages(lambda **kwargs: repository.search_by_boolean_query(query, **kwargs), 7)
+
+    assert _cursor_pages(lambda **kwargs: index.search(db, query, **kwargs), 7) == expected
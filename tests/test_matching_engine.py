@@ -0,0 +1,214 @@
+import random
+import uuid
+from difflib import SequenceMatcher
+
+import numpy as np
+import pytest
+
+from app.services.matching_engine import BatchScoringEngine
+from app.services.matching_features import CandidateFeatures, OfferFeatures, tokenize
+from app.services.matching_similarity import (
+    RAPIDFUZZ_SCORE_TOLERANCE,
+    RATIO_WEIGHT,
+    TOKEN_WEIGHT,
+    CompatBackend,
+    DifflibBackend,
+    RapidfuzzBackend,
+)
+
+
+WEIGHTS = {
+    "coverage": 0.30,
+    "title_similarity": 0.20,
+    "geo_fit": 0.15,
+    "seniority": 0.10,
+    "language": 0.10,
+    "salary": 0.10,
+    "profile_focus": 0.05,
+}
+SKILLS = [f"skill{index}" for index in range(30)]
+CITIES = ["yaounde", "douala", "buea", "dakar"]
+COUNTRIES = ["cameroun", "senegal", None]
+LEVELS = ["junior", "intermediate", "senior", None]
+TITLES = [
+    "developpeur backend python",
+    "data scientist senior",
+    "ingenieur devops cloud",
+    "developpeur fullstack javascript",
+    "comptable general",
+    "",
+]
+SALARIES = [None, 0.0, 150_000.0, 400_000.0, 900_000.0]
+
+
+def _candidates(rng: random.Random, count: int) -> list[CandidateFeatures]:
+    candidates = []
+    for _ in range(count):
+        title = rng.choice(TITLES)
+        candidates.append(
+            CandidateFeatures(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                skills=frozenset(rng.sample(SKILLS, rng.randint(0, 6))),
+                title_text=title,
+                title_tokens=frozenset(tokenize(title)),
+                languages=frozenset(rng.sample(["fr", "en"], rng.randint(0, 2))),
+                city=rng.choice(CITIES + [None]),
+                country=rng.choice(COUNTRIES),
+                experience_level=rng.choice(LEVELS),
+                salary_expectation=rng.choice(SALARIES),
+            )
+        )
+    return candidates
+
+
+def _offers(rng: random.Random, count: int) -> list[OfferFeatures]:
+    offers = []
+    for _ in range(count):
+        title = rng.choice(TITLES) or None
+        skills = frozenset(rng.sample(SKILLS, rng.randint(0, 5)))
+        salary_min = rng.choice(SALARIES)
+        offers.append(
+            OfferFeatures(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                skills=skills,
+                skill_labels={skill: skill.upper() for skill in skills},
+                title=title,
+                title_tokens=frozenset(tokenize(title or "")),
+                seniority=rng.choice(LEVELS),
+                languages=frozenset(rng.sample(["fr", "en"], rng.randint(0, 2))),
+                cities=frozenset(rng.sample(CITIES, rng.randint(0, 2))),
+                country=rng.choice(COUNTRIES),
+                salary_min=salary_min,
+                salary_max=rng.choice([None, (salary_min or 0.0) * 1.5]),
+            )
+        )
+    return offers
+
+
+@pytest.fixture(scope="module")
+def fixture():
+    rng = random.Random(7)
+    return _candidates(rng, 300), _offers(rng, 40)
+
+
+# ----------------------------------------------------------------------
+# Scalar reference: the per-pair scoring the batch engine replaced.
+# ----------------------------------------------------------------------
+def _scalar_score(candidate: CandidateFeatures, offer: OfferFeatures) -> float:
+    overlap = offer.skills & candidate.skills
+    coverage = len(overlap) / len(offer.skills) if offer.skills else 0.0
+    union = offer.skills | candidate.skills
+    profile_focus = len(overlap) / len(union) if union else 0.0
+
+    title_similarity = 0.0
+    if offer.title and candidate.title_text:
+        ratio = SequenceMatcher(None, offer.title, candidate.title_text).ratio()
+        tokens = offer.title_tokens | candidate.title_tokens
+        token_similarity = len(offer.title_tokens & candidate.title_tokens) / len(tokens) if tokens else 0.0
+        title_similarity = RATIO_WEIGHT * ratio + TOKEN_WEIGHT * token_similarity
+
+    if candidate.city and candidate.city in offer.cities:
+        geo_fit = 1.0
+    elif offer.country and candidate.country and offer.country == candidate.country:
+        geo_fit = 0.5
+    else:
+        geo_fit = 0.0
+
+    if candidate.experience_level and offer.seniority:
+        seniority = 1.0 if candidate.experience_level == offer.seniority else 0.3
+    elif candidate.experience_level or offer.seniority:
+        seniority = 0.5
+    else:
+        seniority = 0.4
+
+    if not offer.languages:
+        language = 1.0
+    elif not candidate.languages:
+        language = 0.0
+    else:
+        language = len(candidate.languages & offer.languages) / len(offer.languages)
+
+    expectation = candidate.salary_expectation
+    if expectation is None or (offer.salary_min is None and offer.salary_max is None):
+        salary = 0.5
+    else:
+        low = offer.salary_min or offer.salary_max or expectation
+        high = offer.salary_max or low
+        if low <= expectation <= high:
+            salary = 1.0
+        elif expectation < low:
+            salary = max(0.0, 1.0 - (low - expectation) / max(low, 1))
+        else:
+            salary = max(0.0, 1.0 - (expectation - high) / max(high, 1))
+
+    components = {
+        "coverage": coverage,
+        "title_similarity": title_similarity,
+        "geo_fit": geo_fit,
+        "seniority": seniority,
+        "language": language,
+        "salary": salary,
+        "profile_focus": profile_focus,
+    }
+    return sum(WEIGHTS[name] * value for name, value in components.items())
+
+
+def test_batch_scores_equal_the_scalar_reference(fixture):
+    candidates, offers = fixture
+    engine = BatchScoringEngine(candidates, offers, backend=DifflibBackend())
+
+    for offer in offers:
+        expected = [_scalar_score(candidate, offer) for candidate in candidates]
+        np.testing.assert_allclose(engine.score_offer(offer, WEIGHTS).scores, expected, rtol=0, atol=1e-12)
+    for candidate in candidates[:50]:
+        expected = [_scalar_score(candidate, offer) for offer in offers]
+        np.testing.assert_allclose(engine.score_candidate(candidate, WEIGHTS).scores, expected, rtol=0, atol=1e-12)
+
+
+def _top_rows(scores: np.ndarray, limit: int) -> np.ndarray:
+    """Best rows by score, ties on the lowest row, as the engine ranks them."""
+    return np.lexsort((np.arange(len(scores)), -scores))[:limit]
+
+
+@pytest.mark.parametrize("backend", [DifflibBackend(), CompatBackend(), RapidfuzzBackend()], ids=lambda b: b.name)
+@pytest.mark.parametrize("limit", [1, 5, 40, 1000])
+def test_pruning_never_changes_the_top_rows(fixture, backend, limit):
+    candidates, offers = fixture
+    engine = BatchScoringEngine(candidates, offers, backend=backend)
+
+    for offer in offers:
+        scores = engine.score_offer(offer, WEIGHTS).scores
+        ranked = engine.rank_offer(offer, WEIGHTS, limit)
+        np.testing.assert_array_equal(ranked.rows, _top_rows(scores, limit))
+        np.testing.assert_array_equal(ranked.scores, scores[ranked.rows])
+    for candidate in candidates[:50]:
+        scores = engine.score_candidate(candidate, WEIGHTS).scores
+        ranked = engine.rank_candidate(candidate, WEIGHTS, limit)
+        np.testing.assert_array_equal(ranked.rows, _top_rows(scores, limit))
+        np.testing.assert_array_equal(ranked.scores, scores[ranked.rows])
+
+
+def test_compat_scores_equal_difflib(fixture):
+    candidates, offers = fixture
+    reference = BatchScoringEngine(candidates, offers, backend=DifflibBackend())
+    compat = BatchScoringEngine(candidates, offers, backend=CompatBackend())
+
+    for offer in offers:
+        np.testing.assert_array_equal(
+            compat.score_offer(offer, WEIGHTS).scores, reference.score_offer(offer, WEIGHTS).scores
+        )
+
+
+def test_rapidfuzz_scores_stay_within_the_tolerance_of_difflib(fixture):
+    candidates, offers = fixture
+    reference = BatchScoringEngine(candidates, offers, backend=DifflibBackend())
+    fast = BatchScoringEngine(candidates, offers, backend=RapidfuzzBackend())
+
+    for offer in offers:
+        gap = fast.score_offer(offer, WEIGHTS).scores - reference.score_offer(offer, WEIGHTS).scores
+        assert gap.min() >= -1e-12
+        assert gap.max() <= RAPIDFUZZ_SCORE_TOLERANCE
+    for candidate in candidates[:50]:
+        gap = fast.score_candidate(candidate, WEIGHTS).scores - reference.score_candidate(candidate, WEIGHTS).scores
+        assert gap.min() >= -1e-12
+        assert gap.max() <= RAPIDFUZZ_SCORE_TOLERANCE
@@ -0,0 +1,145 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import OID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from unidecode import unidecode
+
+from app.db.base import Base
+from app.models import JobOffer, JobOfferCity, JobOfferLanguage, Recruiter, Tag
+from app.models.enums import ContractType, JobOfferStatus
+from app.repositories.search_repository import SearchRepository
+from app.schemas import SearchCreate
+from app.services.offer_search_index import OfferSearchIndex
+
+
+_TABLES = (
+    "sector",
+    "recruiters",
+    "job_offer",
+    "tag",
+    "job_offer_tags",
+    "job_offer_cities",
+    "job_offer_languages",
+    "applications",
+    "required_documents",
+)
+TITLES = [
+    "Développeur Python",
+    "Data Analyst",
+    "Comptable senior",
+    "Lead Developer Java",
+    "Stagiaire marketing",
+    "Développeur Python senior",
+    None,
+]
+TAGS = ["Python", "Django", "SQL", "Excel", "Java", "Marketing", "Comptabilité", "English"]
+CITIES = ["Douala", "Yaoundé", "yaounde", "Garoua"]
+COUNTRIES = ["Cameroun", "cameroun", "France", None]
+LANGUAGES = ["Français", "English", "anglais"]
+PAYLOADS = [
+    SearchCreate(),
+    SearchCreate(query="python"),
+    SearchCreate(query="developpeur python"),
+    SearchCreate(query="sql excel"),
+    SearchCreate(query="senior", country="cameroun"),
+    SearchCreate(city="Yaounde"),
+    SearchCreate(contract_type=[ContractType.CDI, ContractType.FREELANCE]),
+    SearchCreate(language="english"),
+    SearchCreate(query="java", date_publication=datetime(2024, 1, 20)),
+]
+
+
+@compiles(OID, "sqlite")
+def _compile_oid(type_, compiler, **kw):
+    return "INTEGER"
+
+
+def _install_functions(connection, _):
+    connection.create_function(
+        "clock_timestamp", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    )
+    connection.create_function("unaccent", 1, lambda value: None if value is None else unidecode(value))
+    connection.create_function("lo_get", 1, lambda oid: oid)
+    connection.create_function("convert_from", 2, lambda data, encoding: data)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", _install_functions)
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in _TABLES])
+    with Session(engine) as session:
+        rng = random.Random(5)
+        recruiter = Recruiter(company_name="Acme")
+        tags = [Tag(name=name) for name in TAGS]
+        for index in range(70):
+            offer = JobOffer(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                recruiter=recruiter,
+                title=rng.choice(TITLES),
+                contract_type=rng.choice([contract.value for contract in ContractType] + [None]),
+                status=JobOfferStatus.PUBLISHED.value if index % 6 else JobOfferStatus.PENDING.value,
+                work_country_location=rng.choice(COUNTRIES),
+                published_at=None if index % 11 == 0 else datetime(2024, 1, 1) + timedelta(days=index % 29),
+            )
+            offer.tags = rng.sample(tags, rng.randint(0, 3))
+            offer.cities = [JobOfferCity(city=city) for city in rng.sample(CITIES, rng.randint(0, 2))]
+            offer.languages = [
+                JobOfferLanguage(language=language) for language in rng.sample(LANGUAGES, rng.randint(0, 2))
+            ]
+            session.add(offer)
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def index(db, monkeypatch):
+    index = OfferSearchIndex()
+    # Build synchronously on the test session instead of the background thread.
+    monkeypatch.setattr(index, "refresh", lambda force=False: None)
+    index.update(db)
+    return index
+
+
+def _pages(search, size: int) -> list[tuple]:
+    pages, page = [], 0
+    while True:
+        result = search(page=page, size=size, facets=page == 0)
+        pages.append((result.total, [offer.id for offer in result.items], result.facets))
+        if result.next_cursor is None:
+            return pages
+        page += 1
+
+
+def _cursor_pages(search, size: int) -> list[tuple]:
+    pages, cursor = [], ""
+    while cursor is not None:
+        result = search(page=0, size=size, cursor=cursor)
+        pages.append((result.page, [offer.id for offer in result.items]))
+        cursor = result.next_cursor
+    return pages
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_index_pages_equal_the_database_pages(db, index, payload):
+    repository = SearchRepository(db)
+
+    expected = _pages(lambda **kwargs: repository.search_by_payload(payload, **kwargs), 6)
+
+    assert _pages(lambda **kwargs: index.search(db, payload, **kwargs), 6) == expected
+    assert sum(len(ids) for _, ids, _ in expected) == expected[0][0]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_index_cursor_pages_equal_the_database_cursor_pages(db, index, payload, monkeypatch):
+    monkeypatch.setattr("app.utils.pagination.estimate_count", lambda query: 0)
+    repository = SearchRepository(db)
+
+    expected = _cursor_pages(lambda **kwargs: repository.search_by_payload(payload, **kwargs), 6)
+
+    assert _cursor_pages(lambda **kwargs: index.search(db, payload, **kwargs), 6) == expected